@@ -0,0 +1,214 @@
+"""
+Benchmark für den Tk-freien Kern (todo_store.py).
+
+Erzeugt synthetische Datensätze (Standard: 1k / 10k / 100k To-Dos über viele Listen)
+und misst Laden, Speichern und die häufigsten Aktionen – ohne Fenster/Display.
+
+Beispiel:
+    python bench_todo_store.py
+    python bench_todo_store.py --sizes 10000 100000 --backend sqlite --json ergebnis.json
+    python bench_todo_store.py --sizes 100000 --backend json binary   # Formate vergleichen
+    python bench_todo_store.py --sizes 100000 --backend json shards   # Speichern nach Änderung in einer Liste
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+
+from todo_store import (
+    ALL_LISTS, BinaryStorage, JsonStorage, ShardedStorage, SqliteStorage, TodoStore, write_snapshot
+)
+
+OPS_PER_ACTION = 500             # Wiederholungen pro gemessener Aktion
+
+
+def make_dataset(size, list_count, seed=1):
+    """Synthetischer Datenbestand im Format von todo_data.json (ca. die Hälfte erledigt)."""
+    rnd = random.Random(seed)
+    lists = [{"id": i, "name": f"Liste {i}", "description": ""} for i in range(1, list_count + 1)]
+    start = date(2024, 1, 1).toordinal()
+    todos = []
+    for todo_id in range(1, size + 1):
+        deadline = date.fromordinal(start + rnd.randrange(1000)).strftime("%d.%m.%Y") if rnd.random() < 0.9 else ""
+        todos.append({
+            "id": todo_id,
+            "text": f"Aufgabe {todo_id} " + "x" * rnd.randrange(10, 60),
+            "done": rnd.random() < 0.5,
+            "created_at": "01.01.2024",
+            "deadline": deadline,
+            "list_id": rnd.randrange(1, list_count + 1)
+        })
+    return {"todos": todos, "lists": lists, "current_list_id": 1}
+
+
+def open_storage(backend, directory):
+    snapshot = os.path.join(directory, "todo_data.json")
+    journal = os.path.join(directory, "todo_data.journal")
+    if backend == "sqlite":
+        return SqliteStorage(os.path.join(directory, "todo_data.sqlite3"), legacy_storage=JsonStorage(snapshot, journal))
+    if backend == "binary":
+        path = os.path.join(directory, "todo_data.bin")
+        return BinaryStorage(path, path + ".journal", legacy_storage=JsonStorage(snapshot, journal))
+    if backend == "shards":
+        return ShardedStorage(os.path.join(directory, "todo_data.shards"), legacy_storage=JsonStorage(snapshot, journal))
+    return JsonStorage(snapshot, journal)
+
+
+def storage_size(storage):
+    """Größe des Snapshots (JSON/Binär), der Datenbank bzw. aller Listen-Dateien nach der Umstellung."""
+    path = getattr(storage, "snapshot_path", None) or storage.path
+    if os.path.isdir(path):
+        return sum(entry.stat().st_size for entry in os.scandir(path))
+    return os.path.getsize(path)
+
+
+def timed(results, name, count, func):
+    """Führt func aus und speichert Gesamtzeit sowie Zeit pro Einzeloperation."""
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    results[name] = {"total_ms": elapsed * 1000, "per_op_us": elapsed / max(count, 1) * 1e6, "count": count}
+
+
+def measure_memory(func):
+    """
+    Speicher nach und Spitzenwert während func in Bytes (tracemalloc).
+    Separat von der Zeitmessung, da tracemalloc stark bremst.
+    """
+    gc.collect()
+    tracemalloc.start()
+    func()
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, peak
+
+
+def run_size(size, list_count, backend):
+    results = {}
+    directory = tempfile.mkdtemp(prefix="todo_bench_")
+    try:
+        snapshot = os.path.join(directory, "todo_data.json")
+        write_snapshot(snapshot, make_dataset(size, list_count))
+        file_size = os.path.getsize(snapshot)
+
+        # Einmalige Umstellung gehört nicht zur Ladezeit
+        # (JSON: Aufteilung in Snapshot + Archiv, SQLite: Import)
+        migrate = TodoStore(open_storage(backend, directory))
+        timed(results, "migration", size, lambda: (migrate.load_data(), migrate.writer.flush()))
+        migrate.close_data()
+        snapshot_size = storage_size(migrate.storage)
+
+        store = TodoStore(open_storage(backend, directory))
+        timed(results, "load", size, store.load_data)
+        results["load"]["todos_per_s"] = size / (results["load"]["total_ms"] / 1000)
+        results["load"]["file_mb"] = file_size / 2**20
+        results["load"]["snapshot_mb"] = snapshot_size / 2**20
+        probe = TodoStore(open_storage(backend, directory))
+        resident, peak = measure_memory(probe.load_data)
+        results["load"]["peak_mb"] = peak / 2**20
+        results["load"]["bytes_per_todo"] = resident / size
+        probe.close_data()
+
+        # Erstes Stück = erste Bildschirmseite der History, danach der Rest
+        timed(results, "history_first", 1, store.load_more_done)
+        timed(results, "history_load", size, store.ensure_done_loaded)
+
+        list_ids = [lst["id"] for lst in store.lists]
+        rnd = random.Random(2)
+        ops = min(OPS_PER_ACTION, size)
+
+        def views():
+            for list_id in list_ids:
+                page = store.open_todos(list_id)
+                [page[i] for i in range(min(30, len(page)))]
+            history = store.done_todos(ALL_LISTS)
+            [history[i] for i in range(min(30, len(history)))]
+
+        timed(results, "views", len(list_ids) + 1, views)
+        timed(results, "search_index", size, lambda: store.search("aufgabe"))
+        queries = ["a", "auf", "aufgabe 12", "xxxxx", "aufgabe 99999"]
+        timed(results, "search", len(queries), lambda: [store.search(q) for q in queries])
+
+        added = []
+        timed(results, "add_todo", ops, lambda: added.extend(
+            store.add_todo("Neu", "05.11.2025", rnd.choice(list_ids)) for _ in range(ops)
+        ))
+        timed(results, "toggle_done", ops, lambda: [store.toggle_done(t.id) for t in added])
+        timed(results, "delete_todo", ops, lambda: [store.delete_todo(t.id) for t in added])
+        timed(results, "undo", 3 * ops, lambda: [store.undo() for _ in range(3 * ops)])
+        # Die Aktionen oben messen nur den GUI-Thread; hier das Schreiben im Hintergrund
+        timed(results, "flush", 1, store.writer.flush)
+
+        timed(results, "save_blocking", size, store.save_data)       # Anteil im GUI-Thread
+        store.writer.flush()
+        timed(results, "save", size, lambda: (store.save_data(), store.writer.flush()))
+        results["save"]["todos_per_s"] = size / (results["save"]["total_ms"] / 1000)
+        results["save"]["peak_mb"] = measure_memory(lambda: (store.save_data(), store.writer.flush()))[1] / 2**20
+        store.close_data()
+
+        # Direkt nach dem Start (History noch nicht geladen), wie in der App:
+        # ein To-Do in einer Liste erledigt und gespeichert, dann eine Liste gelöscht
+        store = TodoStore(open_storage(backend, directory))
+        store.load_data()
+        todo = store.open_todos(list_ids[0])[0]
+        timed(results, "save_one_list", 1, lambda: (
+            store.toggle_done(todo.id), store.save_data(), store.writer.flush()
+        ))
+        victim = list_ids[-1]
+        timed(results, "delete_list", 1, lambda: (store.delete_list(victim), store.writer.flush()))
+        timed(results, "undo_delete_list", 1, lambda: (store.undo(), store.writer.flush()))
+        store.close_data()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def print_results(size, backend, results):
+    print(f"\n=== {size} To-Dos ({backend}) ===")
+    print(f"{'Aktion':<18}{'gesamt ms':>12}{'pro Op µs':>12}  Zusatz")
+    for name, r in results.items():
+        extra = []
+        if "todos_per_s" in r:
+            extra.append(f"{r['todos_per_s']:,.0f} To-Dos/s")
+        if "file_mb" in r:
+            extra.append(f"Datei {r['file_mb']:.1f} MB")
+        if "snapshot_mb" in r:
+            extra.append(f"Snapshot {r['snapshot_mb']:.1f} MB")
+        if "peak_mb" in r:
+            extra.append(f"Peak {r['peak_mb']:.1f} MB")
+        if "bytes_per_todo" in r:
+            extra.append(f"{r['bytes_per_todo']:.0f} Bytes/To-Do")
+        print(f"{name:<18}{r['total_ms']:>12.2f}{r['per_op_us']:>12.1f}  {', '.join(extra)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark für todo_store.py")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--lists", type=int, default=50, help="Anzahl Listen im Datensatz")
+    parser.add_argument("--backend", choices=["json", "binary", "sqlite", "shards"], nargs="+", default=["json"],
+                        help="Ein oder mehrere Speicher-Backends (zum Vergleich)")
+    parser.add_argument("--json", metavar="DATEI", help="Ergebnisse zusätzlich als JSON speichern")
+    args = parser.parse_args()
+
+    all_results = {}
+    for backend in args.backend:
+        all_results[backend] = {}
+        for size in args.sizes:
+            results = run_size(size, args.lists, backend)
+            print_results(size, backend, results)
+            all_results[backend][str(size)] = results
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"lists": args.lists, "results": all_results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
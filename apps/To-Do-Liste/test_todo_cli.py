@@ -0,0 +1,113 @@
+"""
+Tests für die Kommandozeile (todo_cli) – main() mit Dateien in einem temporären Ordner.
+
+Ausführen im Ordner der App: python -m unittest   (oder python -m pytest)
+"""
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import mock
+
+import todo_store
+from todo_cli import main
+from todo_io import read_todos
+
+
+class CliTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        # Die echten Daten der App bleiben unberührt
+        base = os.path.join(self.dir, "todo_data")
+        for name, path in (("SAVE_FILE", base + ".json"), ("JOURNAL_FILE", base + ".journal"),
+                           ("LOCK_FILE", base + ".lock")):
+            patcher = mock.patch.object(todo_store, name, path)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_cli(self, *argv, stdin=""):
+        """main() aufrufen; liefert (Exit-Code, Ausgabe, Fehlerausgabe)."""
+        out, err = io.StringIO(), io.StringIO()
+        with redirect_stdout(out), redirect_stderr(err), mock.patch("sys.stdin", io.StringIO(stdin)):
+            code = main(list(argv))
+        return code, out.getvalue(), err.getvalue()
+
+    def ls(self, *argv):
+        code, out, _ = self.run_cli("ls", *argv)
+        self.assertEqual(code, 0)
+        return [line.split("\t") for line in out.splitlines()]
+
+    def test_add_done_rm(self):
+        code, out, _ = self.run_cli("add", "Milch kaufen", "-d", "05.03.2031")
+        self.assertEqual(code, 0)
+        milch = out.strip()
+        steuer = self.run_cli("add", "Steuer", "--list", "Standard")[1].strip()
+        self.assertEqual([row[4] for row in self.ls()], ["Milch kaufen", "Steuer"])
+
+        self.assertEqual(self.run_cli("done", milch)[0], 0)
+        self.assertEqual([row[4] for row in self.ls()], ["Steuer"])
+        self.assertEqual(self.ls("--done"), [[milch, "05.03.2031", "x", "Standard", "Milch kaufen"]])
+
+        self.assertEqual(self.run_cli("rm", steuer, milch)[0], 0)
+        self.assertEqual(self.ls("--all"), [])
+
+        code, _, err = self.run_cli("rm", milch)
+        self.assertEqual(code, 1)
+        self.assertIn(f"Unbekannte id: {milch}", err)
+
+    def test_ls_due_before(self):
+        for text, deadline in (("später", "01.06.2031"), ("bald", "01.02.2031"), ("ohne", "")):
+            self.run_cli("add", text, "-d", deadline)
+        self.assertEqual([row[4] for row in self.ls("--due-before", "01.03.2031")], ["bald"])
+        self.assertEqual([row[4] for row in self.ls()], ["bald", "später", "ohne"])
+        code, _, err = self.run_cli("ls", "--due-before", "31.02.2031")
+        self.assertEqual(code, 1)
+        self.assertIn("Ungültiges Datum", err)
+
+    def test_export(self):
+        self.run_cli("add", 'Er sagte: "ja"', "-d", "05.03.2031")
+        self.run_cli("done", self.run_cli("add", "erledigt")[1].strip())
+        path = os.path.join(self.dir, "export.csv")
+        self.assertEqual(self.run_cli("export", path)[0], 0)
+        records = sorted((record["text"], record["done"]) for record in read_todos(path))
+        self.assertEqual(records, [('Er sagte: "ja"', False), ("erledigt", True)])
+
+        code, out, _ = self.run_cli("export", "-", "-f", "jsonl")
+        self.assertEqual(code, 0)
+        self.assertEqual(len(out.splitlines()), 2)
+
+    def test_batch_reports_bad_lines(self):
+        commands = "\n".join([
+            'add "eins" -d 01.01.2031',
+            "# Kommentar",
+            "add zwei -d 99.99.2031",
+            "done 999",
+            "gibt_es_nicht",
+            "add drei"
+        ])
+        code, out, err = self.run_cli("batch", stdin=commands)
+        self.assertEqual(code, 1)
+        self.assertEqual(len(out.split()), 2)      # ids von "eins" und "drei"
+        lines = err.splitlines()
+        self.assertEqual([line.split(":")[0] for line in lines[:3]], ["Zeile 3", "Zeile 4", "Zeile 5"])
+        self.assertIn("3 Zeilen mit Fehlern", lines[-1])
+        # Die gültigen Zeilen wurden trotzdem gespeichert
+        self.assertEqual([row[4] for row in self.ls()], ["eins", "drei"])
+
+    def test_lock_timeout(self):
+        lock = todo_store.StorageLock()
+        self.assertTrue(lock.acquire())
+        self.addCleanup(lock.release)
+        code, _, err = self.run_cli("--wait", "0.1", "add", "blockiert")
+        self.assertEqual(code, 3)
+        self.assertIn("verwendet", err)
+        lock.release()
+        self.assertEqual(self.run_cli("add", "frei")[0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Tests für Import und Export (todo_io) ohne Tk.
+
+Ausführen im Ordner der App: python -m unittest   (oder python -m pytest)
+"""
+import os
+import tempfile
+import unittest
+
+from todo_io import read_todos, todo_records, write_todos
+from todo_store import JsonStorage, TodoStore
+
+TEXTS = [
+    'Er sagte: "ja, gern"',
+    'x "q"; y',
+    "Milch, Eier; Brot",
+    "Tab\tgetrennt",
+    "ganz normal"
+]
+
+
+class ExportImportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def open_store(self, name):
+        base = os.path.join(self.tmp.name, name)
+        store = TodoStore(JsonStorage(base + ".json", base + ".journal"))
+        store.load_data()
+        self.addCleanup(store.close_data)
+        return store
+
+    def round_trip(self, ext, texts=TEXTS, name="export"):
+        source = self.open_store(name + "-quelle")
+        arbeit = source.add_list("Arbeit; privat", "")
+        for number, text in enumerate(texts):
+            todo = source.add_todo(text, f"0{number + 1}.02.2031", arbeit["id"] if number % 2 else None)
+        source.toggle_done(todo.id)
+        path = os.path.join(self.tmp.name, name + ext)
+        count = write_todos(path, todo_records(source, source.todos.values()))
+        self.assertEqual(count, len(texts))
+
+        target = self.open_store(name + "-ziel")
+        imported, errors = target.import_todos(read_todos(path))
+        self.assertEqual(errors, [])
+        self.assertEqual(imported, len(texts))
+
+        def summary(store):
+            return sorted(
+                (todo.text, todo.deadline_text, todo.done, store.get_list_name(todo.list_id))
+                for todo in store.todos.values()
+            )
+        self.assertEqual(summary(target), summary(source))
+
+    def test_csv_round_trip(self):
+        self.round_trip(".csv")
+        # Einzeln: hier hat früher csv.Sniffer Trenner bzw. Anführungszeichen falsch geraten
+        for number, text in enumerate(TEXTS):
+            with self.subTest(text=text):
+                self.round_trip(".csv", [text], f"einzeln{number}")
+
+    def test_jsonl_round_trip(self):
+        self.round_trip(".jsonl")
+
+    def test_ical_round_trip(self):
+        self.round_trip(".ics")
+
+    def test_csv_semicolon_and_tab(self):
+        for delimiter in (";", "\t"):
+            path = os.path.join(self.tmp.name, "fremd.csv")
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                f.write(delimiter.join(["text", "deadline", "done"]) + "\r\n")
+                f.write(delimiter.join(['"a, ""b"""', "01.02.2031", "ja"]) + "\r\n")
+            records = list(read_todos(path))
+            self.assertEqual(records[0]["text"], 'a, "b"')
+            self.assertEqual(records[0]["deadline"], "01.02.2031")
+            self.assertTrue(records[0]["done"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+"""
+Tests für den Server-Modus (todo_server): ein TodoServer auf einem freien Port, zwei Clients.
+
+Ausführen im Ordner der App: python -m unittest   (oder python -m pytest)
+"""
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+from todo_server import (
+    APP_ERROR, INVALID_PARAMS, INVALID_REQUEST, METHOD_NOT_FOUND, PARSE_ERROR,
+    RpcConnection, RpcError, ServerStore, TodoServer
+)
+from todo_store import JsonStorage
+
+
+class TodoServerTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        base = os.path.join(tmp.name, "todo_data")
+        self.store = ServerStore(JsonStorage(base + ".json", base + ".journal"))
+        self.store.load_data()
+        self.addCleanup(self.store.close_data)
+
+        # Server in eigener asyncio-Schleife; Port 0 = vom System vergeben
+        started = threading.Event()
+
+        async def serve():
+            server = await TodoServer(self.store).start(port=0)
+            self.port = server.sockets[0].getsockname()[1]
+            self.loop = asyncio.get_running_loop()
+            self.stop = asyncio.Event()
+            started.set()
+            async with server:
+                await self.stop.wait()
+
+        thread = threading.Thread(target=asyncio.run, args=(serve(),), daemon=True)
+        thread.start()
+        started.wait(5)
+        self.addCleanup(thread.join, 5)
+        self.addCleanup(lambda: self.loop.call_soon_threadsafe(self.stop.set))
+
+        self.events = {"a": [], "b": []}
+        self.a = self.connect("a")
+        self.b = self.connect("b")
+
+    def connect(self, name):
+        connection = RpcConnection(port=self.port, on_event=self.events[name].append)
+        self.addCleanup(connection.close)
+        return connection
+
+    def changes(self, name):
+        """Bisher angekommene Änderungen eines Clients (Operationen, ohne Benachrichtigungs-Hülle)."""
+        return [op for message in self.events[name] for op in message["params"]["ops"]]
+
+    def raw(self, lines, count):
+        """Zeilen direkt über den Socket schicken; liefert die ersten count Antworten."""
+        with socket.create_connection(("127.0.0.1", self.port), timeout=5) as sock, sock.makefile("rb") as f:
+            sock.sendall(b"".join(line + b"\n" for line in lines))
+            return [json.loads(f.readline()) for _ in range(count)]
+
+    def test_subscribe_and_add(self):
+        state = self.a.call("subscribe")
+        self.assertEqual(state["todos"], [])
+        self.assertEqual([lst["name"] for lst in state["lists"]], ["Standard"])
+        self.b.call("subscribe")
+
+        todo = self.a.call("add", text=" Milch kaufen ", deadline="05.03.2031")
+        self.assertEqual(todo["text"], "Milch kaufen")
+        self.assertEqual(todo["deadline"], "05.03.2031")
+        # Jeder Aufruf übernimmt die Benachrichtigungen davor; der Server arbeitet der Reihe nach
+        self.b.call("lists")
+        for name in ("a", "b"):
+            self.assertEqual([op[0] for op in self.changes(name)], ["insert"])
+            self.assertEqual(self.changes(name)[0][1]["id"], todo["id"])
+        self.assertEqual([t["text"] for t in self.a.call("query")], ["Milch kaufen"])
+
+    def test_failed_undo_is_not_broadcast(self):
+        self.a.call("subscribe")
+        self.b.call("subscribe")
+        todo = self.a.call("add", text="Milch kaufen")
+        self.b.call("delete", ids=[todo["id"]])
+        self.a.call("lists")
+        self.assertEqual([op[0] for op in self.changes("a")], ["insert", "remove"])
+
+        # Undo von a will das To-Do entfernen, das b schon gelöscht hat
+        with self.assertRaises(RpcError) as raised:
+            self.a.call("undo")
+        self.assertEqual(raised.exception.code, APP_ERROR)
+        self.a.call("lists")
+        self.b.call("lists")
+        self.assertEqual([op[0] for op in self.changes("a")], ["insert", "remove"])
+        self.assertEqual([op[0] for op in self.changes("b")], ["insert", "remove"])
+        self.assertNotIn(todo["id"], self.store.todos)
+
+    def test_error_codes(self):
+        responses = self.raw([
+            b"kein json",
+            b"[1]",
+            b'{"jsonrpc": "2.0", "id": 1, "method": "gibt_es_nicht"}',
+            b'{"jsonrpc": "2.0", "id": 2, "method": "toggle", "params": {"falsch": 1}}',
+            b'{"jsonrpc": "2.0", "id": 3, "method": "add_list", "params": {"name": 5}}',
+            b'{"jsonrpc": "2.0", "id": 4, "method": "add_list", "params": {"name": " "}}',
+            # Benachrichtigung (ohne id) mit Fehler: keine Antwort, weiter mit der nächsten Zeile
+            b'{"jsonrpc": "2.0", "method": "add_list", "params": {"name": 5}}',
+            b'{"jsonrpc": "2.0", "id": 5, "method": "lists"}'
+        ], 7)
+        codes = [(response["id"], response.get("error", {}).get("code")) for response in responses]
+        self.assertEqual(codes, [
+            (None, PARSE_ERROR), (None, INVALID_REQUEST), (1, METHOD_NOT_FOUND),
+            (2, INVALID_PARAMS), (3, INVALID_PARAMS), (4, INVALID_PARAMS), (5, None)
+        ])
+        self.assertEqual(len(self.store.lists), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
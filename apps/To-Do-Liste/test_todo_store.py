@@ -0,0 +1,450 @@
+"""
+Tests für den Tk-freien Kern (todo_store) mit allen Speicher-Backends.
+
+Jeder Test arbeitet in einem eigenen temporären Ordner; die Speicher werden mit
+expliziten Pfaden angelegt, die echten Daten der App bleiben unberührt.
+Ausführen im Ordner der App: python -m unittest   (oder python -m pytest)
+"""
+import json
+import os
+import tempfile
+import unittest
+from datetime import date
+
+from todo_store import (
+    HISTORY_BATCH, BinaryStorage, JsonStorage, ShardedStorage, SqliteStorage, TodoStore, UnsupportedVersionError,
+    parse_deadline, write_snapshot
+)
+
+# Datei im Format der ursprünglichen App (ohne ids, erledigte To-Dos im Snapshot)
+LEGACY_DATA = {
+    "todos": [
+        {"text": "Milch kaufen", "done": False, "created_at": "01.03.2024", "deadline": "05.03.2024", "list_id": 1},
+        {"text": "Steuer", "done": True, "created_at": "01.02.2024", "deadline": "30.04.2024", "list_id": 1},
+        {"text": "Bericht", "done": False, "created_at": "02.03.2024", "deadline": "", "list_id": 2},
+        {"text": "Reifen wechseln", "done": True, "created_at": "03.03.2024", "deadline": "01.04.2024", "list_id": 2}
+    ],
+    "lists": [
+        {"id": 1, "name": "Standard", "description": ""},
+        {"id": 2, "name": "Arbeit", "description": "Büro"}
+    ],
+    "current_list_id": 2
+}
+
+
+def state(store):
+    """Vergleichbarer Stand: Listen, aktuelle Liste und alle To-Dos (auch die erledigten)."""
+    store.ensure_done_loaded()
+    todos = sorted(
+        (todo.id, todo.text, todo.done, todo.created_text, todo.deadline_text, todo.list_id)
+        for todo in store.todos.values()
+    )
+    return [dict(lst) for lst in store.lists], store.current_list_id, todos
+
+
+class StoreTests:
+    """Gemeinsame Tests; die Unterklassen legen fest, welcher Speicher verwendet wird."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = self.tmp.name
+
+    def path(self, name):
+        return os.path.join(self.dir, name)
+
+    def legacy_storage(self):
+        return JsonStorage(self.path("todo_data.json"), self.path("todo_data.journal"))
+
+    def make_storage(self):
+        raise NotImplementedError
+
+    def open_store(self):
+        store = TodoStore(self.make_storage())
+        store.load_data()
+        return store
+
+    def fill(self, store):
+        standard = store.lists[0]["id"]
+        arbeit = store.add_list("Arbeit", "Büro")
+        store.add_todo("Milch kaufen", "05.03.2031", standard)
+        store.add_todo('Er sagte: "ja, gern"', "", arbeit["id"])
+        done = store.add_todo("Steuer", "30.04.2031", arbeit["id"])
+        store.toggle_done(done.id)
+        store.delete_todo(store.add_todo("Wird gelöscht", "01.01.2031", standard).id)
+        return arbeit
+
+    def test_round_trip(self):
+        store = self.open_store()
+        self.fill(store)
+        store.save_data()
+        expected = state(store)
+        store.close_data()
+
+        store = self.open_store()
+        self.assertEqual(state(store), expected)
+        self.assertEqual(len(store.done_todos()), 1)
+        store.close_data()
+
+    def test_journal_replay(self):
+        store = self.open_store()
+        arbeit = self.fill(store)
+        store.edit_list(arbeit["id"], "Job", "")
+        store.move_many([todo.id for todo in store.open_todos(arbeit["id"])], store.lists[0]["id"])
+        # Kein save_data: der neue Store muss die einzelnen Änderungen nachspielen (wie nach einem Absturz)
+        store.writer.flush()
+        expected = state(store)
+
+        other = self.open_store()
+        self.assertEqual(state(other), expected)
+        other.close_data()
+        store.close_data()
+
+    def test_undo(self):
+        store = self.open_store()
+        arbeit = self.fill(store)
+        # Die aktuelle Liste ist kein Undo-Schritt – hier nicht die zu löschende wählen
+        store.set_current_list(store.lists[0]["id"])
+        store.save_data()
+        store.history.clear()
+        expected = state(store)
+
+        todo = store.add_todo("Neu", "01.01.2032", arbeit["id"])
+        store.toggle_done(todo.id)
+        store.toggle_done_many([t.id for t in store.open_todos(store.lists[0]["id"])])
+        store.delete_list(arbeit["id"])
+        self.assertNotIn(arbeit["id"], store.list_by_id)
+        for _ in range(4):
+            store.undo()
+        self.assertIsNone(store.undo())
+        self.assertEqual(state(store), expected)
+        store.close_data()
+
+        store = self.open_store()
+        self.assertEqual(state(store), expected)
+        store.close_data()
+
+    def test_undo_import_resets_current_list(self):
+        store = self.open_store()
+        store.import_todos([{"text": "importiert", "list": "Neu"}])
+        store.set_current_list(store.get_list_id_by_name("Neu"))
+        store.undo()
+        self.assertIn(store.current_list_id, store.list_by_id)
+        todo = store.add_todo("danach")
+        self.assertIn(todo.list_id, store.list_by_id)
+        store.close_data()
+
+    def test_list_stats_with_partly_loaded_archive(self):
+        store = self.open_store()
+        standard = store.lists[0]["id"]
+        arbeit = store.add_list("Arbeit", "")["id"]
+        for number in range(HISTORY_BATCH + 30):
+            list_id = standard if number % 3 == 0 else arbeit
+            store.toggle_done(store.add_todo(f"alt {number}", "01.01.2030", list_id).id)
+        store.add_todo("offen", "", arbeit)
+        store.save_data()
+        store.close_data()
+        today = date.today().toordinal()
+        expected = {standard: (0, 177), arbeit: (1, 353)}
+
+        # Zählung vor dem Nachladen, nach einem Stück und komplett geladen; einmal auch erst nach dem ersten Stück
+        for stats_before_loading in (True, False):
+            with self.subTest(stats_before_loading=stats_before_loading):
+                store = self.open_store()
+
+                def stats():
+                    return {lst["id"]: store.list_stats(lst["id"], today)[:2] for lst in store.lists}
+                if stats_before_loading:
+                    self.assertEqual(stats(), expected)
+                self.assertTrue(store.load_more_done())
+                self.assertFalse(store.done_loaded)
+                self.assertEqual(stats(), expected)
+                # In dieser Sitzung erledigt: zählt sofort mit, aber nicht doppelt
+                store.toggle_done(store.open_todos(arbeit)[0].id)
+                self.assertEqual(stats(), {standard: (0, 177), arbeit: (0, 354)})
+                store.ensure_done_loaded()
+                self.assertEqual(stats(), {standard: (0, 177), arbeit: (0, 354)})
+                store.undo()
+                self.assertEqual(stats(), expected)
+                store.close_data()
+
+    def test_ids_continue_after_reload(self):
+        store = self.open_store()
+        first = store.add_todo("eins")
+        store.close_data()
+        store = self.open_store()
+        self.assertGreater(store.add_todo("zwei").id, first.id)
+        store.close_data()
+
+
+class JsonStorageTest(StoreTests, unittest.TestCase):
+
+    def make_storage(self):
+        return self.legacy_storage()
+
+    def test_migration(self):
+        # Alte Datei: ids werden vergeben, erledigte To-Dos wandern ins Archiv
+        write_snapshot(self.path("todo_data.json"), LEGACY_DATA)
+        store = self.open_store()
+        expected = state(store)
+        self.assertEqual([todo[:3] for todo in expected[2]], [
+            (1, "Milch kaufen", False), (2, "Steuer", True), (3, "Bericht", False), (4, "Reifen wechseln", True)
+        ])
+        store.save_data()
+        store.close_data()
+
+        with open(self.path("todo_data.json"), "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+        self.assertFalse(any(todo["done"] for todo in snapshot["todos"]))
+        self.assertIsNotNone(snapshot.get("archive_generation"))
+
+        store = self.open_store()
+        self.assertEqual(state(store), expected)
+        store.close_data()
+
+
+class MigratingStoreTests(StoreTests):
+    """Backends, die beim ersten Start vorhandene JSON-Daten übernehmen."""
+
+    def test_migration(self):
+        write_snapshot(self.path("todo_data.json"), LEGACY_DATA)
+        legacy = TodoStore(self.legacy_storage())
+        legacy.load_data()
+        expected = state(legacy)
+        legacy.close_data()
+
+        store = self.open_store()
+        self.assertEqual(state(store), expected)
+        store.close_data()
+
+        # Zweiter Start: aus dem neuen Speicher, nicht erneut aus JSON
+        os.remove(self.path("todo_data.json"))
+        store = self.open_store()
+        self.assertEqual(state(store), expected)
+        store.close_data()
+
+
+class BinaryStorageTest(MigratingStoreTests, unittest.TestCase):
+
+    def make_storage(self):
+        return BinaryStorage(self.path("todo_data.bin"), self.path("todo_data.bin.journal"), self.legacy_storage())
+
+    def read_files(self):
+        contents = []
+        for name in ("todo_data.bin", "todo_data.bin.journal"):
+            with open(self.path(name), "rb") as f:
+                contents.append(f.read())
+        return contents
+
+    def set_version(self, version):
+        # Formatversion steht im Kopf direkt hinter der 8 Byte langen Kennung
+        with open(self.path("todo_data.bin"), "r+b") as f:
+            f.seek(8)
+            f.write(version.to_bytes(2, "little"))
+
+    def test_newer_version_is_not_overwritten(self):
+        store = self.open_store()
+        self.fill(store)
+        store.save_data()
+        store.add_todo("nur im Journal")
+        expected = state(store)
+        store.close_data()
+
+        self.set_version(BinaryStorage.VERSION + 1)
+        before = self.read_files()
+        store = TodoStore(self.make_storage())
+        with self.assertRaises(UnsupportedVersionError):
+            store.load_data()
+        store.close_data()
+        self.assertEqual(self.read_files(), before)
+
+        self.set_version(BinaryStorage.VERSION)
+        store = self.open_store()
+        self.assertEqual(state(store), expected)
+        store.close_data()
+
+
+class SqliteStorageTest(MigratingStoreTests, unittest.TestCase):
+
+    def make_storage(self):
+        return SqliteStorage(self.path("todo_data.sqlite3"), self.legacy_storage())
+
+
+class ShardedStorageTest(MigratingStoreTests, unittest.TestCase):
+
+    def make_storage(self):
+        return ShardedStorage(self.path("todo_data.shards"), self.legacy_storage())
+
+    def test_save_reads_only_changed_list(self):
+        store = self.open_store()
+        arbeit = self.fill(store)
+        for number in range(20):
+            store.toggle_done(store.add_todo(f"alt {number}", "", arbeit["id"]).id)
+        store.set_current_list(store.lists[0]["id"])
+        store.save_data()
+        expected = state(store)
+        store.close_data()
+
+        store = self.open_store()
+        todo = store.open_todos(store.lists[0]["id"])[0]
+        store.toggle_done(todo.id)
+        store.save_data()
+        # Nur die geänderte Liste wurde gelesen, die History ist noch nicht geladen
+        self.assertFalse(store.done_loaded)
+        self.assertNotIn(arbeit["id"], store.done_lists_loaded)
+        store.delete_list(arbeit["id"])
+        self.assertFalse(store.done_loaded)
+        store.undo()
+        store.toggle_done(todo.id)
+        store.close_data()
+
+        store = self.open_store()
+        self.assertEqual(state(store), expected)
+        store.close_data()
+
+
+class DueQueueTest(unittest.TestCase):
+    """Erinnerungen: veraltete Heap-Einträge (erledigt, gelöscht, andere Deadline) dürfen nie auftauchen."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        base = os.path.join(tmp.name, "todo_data")
+        self.store = TodoStore(JsonStorage(base + ".json", base + ".journal"))
+        self.store.load_data()
+        self.addCleanup(self.store.close_data)
+        self.first = self.store.add_todo("erstes", "01.03.2031")
+        self.second = self.store.add_todo("zweites", "02.03.2031")
+        self.third = self.store.add_todo("drittes", "03.03.2031")
+        self.store.add_todo("ohne Deadline")
+
+    def test_next_deadline_skips_stale_entries(self):
+        store = self.store
+        self.assertEqual(store.next_deadline(), parse_deadline("01.03.2031"))
+        store.toggle_done(self.first.id)
+        self.assertEqual(store.next_deadline(), parse_deadline("02.03.2031"))
+        store.delete_todo(self.second.id)
+        self.assertEqual(store.next_deadline(), parse_deadline("03.03.2031"))
+        store.perform_many([("set", self.third.id, "deadline", parse_deadline("05.03.2031"))])
+        self.assertEqual(store.next_deadline(), parse_deadline("05.03.2031"))
+
+        # Undo bringt die alten Einträge zurück (zuletzt: erledigt -> wieder offen)
+        store.undo()
+        self.assertEqual(store.next_deadline(), parse_deadline("03.03.2031"))
+        store.undo()
+        self.assertEqual(store.next_deadline(), parse_deadline("02.03.2031"))
+        store.undo()
+        self.assertEqual(store.next_deadline(), parse_deadline("01.03.2031"))
+
+        store.delete_many([todo.id for todo in store.open_todos(store.current_list_id)])
+        self.assertIsNone(store.next_deadline())
+
+    def test_pop_due_returns_each_todo_once(self):
+        store = self.store
+        store.toggle_done(self.first.id)
+        store.perform_many([("set", self.second.id, "deadline", parse_deadline("10.03.2031"))])
+        due = store.pop_due(parse_deadline("05.03.2031"))
+        self.assertEqual([todo.text for todo in due], ["drittes"])
+        self.assertEqual(store.pop_due(parse_deadline("05.03.2031")), [])
+
+        # Rückgängig gemachte Änderungen werden wieder fällig
+        store.undo()
+        store.undo()
+        due = store.pop_due(parse_deadline("05.03.2031"))
+        self.assertEqual(sorted(todo.text for todo in due), ["erstes", "zweites"])
+        self.assertIsNone(store.next_deadline())
+
+
+def texts(todos):
+    return sorted(todo.text for todo in todos)
+
+
+class SearchTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.base = os.path.join(tmp.name, "todo_data")
+
+    def open_store(self):
+        store = TodoStore(JsonStorage(self.base + ".json", self.base + ".journal"))
+        store.load_data()
+        return store
+
+    def test_prefix_matching(self):
+        store = self.open_store()
+        self.addCleanup(store.close_data)
+        for text in ("Milch einkaufen", "Einkaufsliste schreiben", "Bericht schreiben"):
+            store.add_todo(text)
+        self.assertEqual(texts(store.search("einka")), ["Einkaufsliste schreiben", "Milch einkaufen"])
+        self.assertEqual(texts(store.search("EINKAUFEN")), ["Milch einkaufen"])
+        # Jedes Wort der Anfrage muss passen
+        self.assertEqual(texts(store.search("schr ber")), ["Bericht schreiben"])
+        self.assertEqual(texts(store.search("milch bericht")), [])
+        self.assertEqual(texts(store.search("einkaufenx")), [])
+        self.assertEqual(len(store.search("")), 0)
+
+    def test_index_follows_changes(self):
+        store = self.open_store()
+        self.addCleanup(store.close_data)
+        milch = store.add_todo("Milch kaufen")
+        self.assertEqual(texts(store.search("milch")), ["Milch kaufen"])
+
+        # Ab jetzt wird der Index bei jeder Änderung mitgeführt
+        brot = store.add_todo("Brot kaufen")
+        self.assertEqual(texts(store.search("kauf")), ["Brot kaufen", "Milch kaufen"])
+        store.perform_many([("set", milch.id, "text", "Hafermilch bestellen")])
+        self.assertEqual(texts(store.search("kauf")), ["Brot kaufen"])
+        self.assertEqual(texts(store.search("hafer bestell")), ["Hafermilch bestellen"])
+        store.delete_todo(brot.id)
+        self.assertEqual(texts(store.search("kauf")), [])
+        self.assertNotIn("brot", store.search_index.sorted_words())
+
+        store.undo()
+        store.undo()
+        self.assertEqual(texts(store.search("kauf")), ["Brot kaufen", "Milch kaufen"])
+        self.assertEqual(texts(store.search("hafer")), [])
+
+    def test_archive_loaded_later(self):
+        store = self.open_store()
+        for number in range(2 * HISTORY_BATCH + 10):
+            store.toggle_done(store.add_todo(f"archiv {number}").id)
+        store.add_todo("archiv offen")
+        store.save_data()
+        store.close_data()
+
+        store = self.open_store()
+        self.addCleanup(store.close_data)
+        self.assertFalse(store.done_loaded)
+        # complete=False: nur der bisher aufgebaute Teil (noch leer)
+        self.assertEqual(len(store.search("archiv", complete=False)), 0)
+        self.assertTrue(store.build_search_index())
+        self.assertEqual(texts(store.search("archiv", complete=False)), ["archiv offen"])
+
+        # Nachgeladene erledigte To-Dos kommen direkt in den Index
+        store.load_more_done()
+        self.assertEqual(len(store.search("archiv", complete=False)), HISTORY_BATCH + 1)
+        self.assertFalse(store.search_complete)
+        while store.build_search_index():
+            pass
+        self.assertTrue(store.search_complete)
+        self.assertEqual(len(store.search("archiv", complete=False)), 2 * HISTORY_BATCH + 11)
+        self.assertEqual(texts(store.search("archiv 1009")), ["archiv 1009"])
+
+    def test_limit(self):
+        store = self.open_store()
+        self.addCleanup(store.close_data)
+        todos = [store.add_todo(f"Punkt {number}") for number in range(30)]
+        result = store.search("punkt", limit=10)
+        self.assertEqual(len(result), 10)
+        self.assertEqual(result.total, 30)
+        # Neueste zuerst; was über die Grenze fällt, hat keine Zeile
+        self.assertEqual([todo.text for todo in result], [f"Punkt {number}" for number in range(29, 19, -1)])
+        self.assertEqual(result[0], todos[-1])
+        self.assertEqual(result.index(todos[20]), 9)
+        self.assertIsNone(result.index(todos[19]))
+        self.assertEqual(len(store.search("punkt", limit=100)), 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Tests für die Oberfläche (todolist). Brauchen ein Display – ohne werden sie übersprungen.
+
+Ausführen im Ordner der App: python -m unittest   (oder python -m pytest)
+"""
+import os
+import tempfile
+import unittest
+from datetime import date
+
+import tkinter as tk
+
+from todo_store import DATE_FORMAT, HISTORY_BATCH, JsonStorage, TodoStore
+from todolist import ToDoApp
+
+
+class ToDoAppTest(unittest.TestCase):
+
+    def setUp(self):
+        try:
+            self.root = tk.Tk()
+        except tk.TclError as e:
+            self.skipTest(f"kein Display: {e}")
+        self.root.withdraw()
+        self.addCleanup(self.root.destroy)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.base = os.path.join(tmp.name, "todo_data")
+
+    def storage(self):
+        return JsonStorage(self.base + ".json", self.base + ".journal")
+
+    def test_selection_survives_history_batch(self):
+        # Archiv mit früheren Deadlines als das in dieser Sitzung erledigte To-Do
+        store = TodoStore(self.storage())
+        store.load_data()
+        for number in range(2 * HISTORY_BATCH):
+            store.toggle_done(store.add_todo(f"archiviert {number}", "01.01.2030").id)
+        later = store.add_todo("heute erledigt", "01.01.2031")
+        store.save_data()
+        store.close_data()
+
+        app = ToDoApp(self.root, storage=self.storage())
+        app.finish_startup()
+        self.addCleanup(app.store.close_data)
+        app.store.toggle_done(later.id)
+        app.toggle_history_view()
+        app.cancel_history_batch()
+        app.select_row(0)
+        self.assertEqual(app.get_selected_todo().text, "heute erledigt")
+
+        # Ein Stück Archiv kommt vor dem markierten To-Do in den Bucket
+        app.load_history_batch()
+        self.assertEqual(app.get_selected_todo().text, "heute erledigt")
+        self.assertEqual([todo.text for todo in app.get_selected_todos()], ["heute erledigt"])
+        self.assertNotEqual(app.selected_row, 0)
+
+    def test_todo_due_today_is_reported_at_once(self):
+        app = ToDoApp(self.root, storage=self.storage())
+        app.finish_startup()
+        self.addCleanup(app.store.close_data)
+        reported = []
+        app.show_reminder = reported.extend
+
+        app.entry.insert(0, "heute fällig")
+        app.deadline_entry.delete(0, tk.END)
+        app.deadline_entry.insert(0, date.today().strftime(DATE_FORMAT))
+        app.add_todo()
+        # Nicht erst bei der nächsten stündlichen Prüfung
+        self.root.update()
+        self.assertEqual([todo.text for todo in reported], ["heute fällig"])
+
+
+if __name__ == "__main__":
+    unittest.main()
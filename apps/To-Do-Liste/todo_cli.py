@@ -0,0 +1,223 @@
+"""
+Kommandozeile für die To-Do-Liste – ohne Tk, z.B. für cron-Jobs und Skripte.
+
+Arbeitet auf denselben Daten wie die App (SAVE_FILE). Eine gemeinsame Dateisperre sorgt
+dafür, dass App und Kommandozeile nie gleichzeitig schreiben.
+
+Beispiele:
+    python todo_cli.py add "Milch kaufen" --deadline 05.11.2025 --list Einkaufen
+    python todo_cli.py done 12 13
+    python todo_cli.py rm 14
+    python todo_cli.py ls --list Arbeit --due-before 01.12.2025
+    python todo_cli.py export todos.csv
+    python todo_cli.py batch < befehle.txt      # ein Befehl pro Zeile, z.B. add "Text" -d 01.01.2026
+"""
+import argparse
+import os
+import shlex
+import sys
+
+from todo_store import (
+    StorageLock, TodoStore, UnsupportedVersionError, format_ordinal, open_storage, parse_deadline
+)
+
+EXPORT_FORMATS = ("csv", "jsonl", "ical")   # wie todo_io.WRITERS; todo_io wird erst beim Export geladen
+LOCK_TIMEOUT = 10                # Sekunden, die auf eine laufende App / ein anderes Skript gewartet wird
+
+
+class CliError(Exception):
+    """Fehler in einem Befehl (wird als Meldung ausgegeben, das Programm läuft weiter)."""
+
+
+class CommandParser(argparse.ArgumentParser):
+    """Im Batch-Modus sollen Fehler in einer Zeile nicht das ganze Programm beenden."""
+
+    def error(self, message):
+        raise CliError(message)
+
+
+def add_commands(parser):
+    commands = parser.add_subparsers(dest="command", required=True, parser_class=CommandParser)
+
+    add = commands.add_parser("add", help="To-Do anlegen (gibt die id aus)")
+    add.add_argument("text")
+    add.add_argument("-d", "--deadline", default="", help="TT.MM.JJJJ")
+    add.add_argument("-l", "--list", help="Name der Liste (Standard: aktuelle Liste)")
+
+    done = commands.add_parser("done", help="To-Dos als erledigt markieren")
+    done.add_argument("ids", type=int, nargs="+")
+
+    rm = commands.add_parser("rm", help="To-Dos löschen")
+    rm.add_argument("ids", type=int, nargs="+")
+
+    ls = commands.add_parser("ls", help="To-Dos nach Deadline sortiert ausgeben")
+    ls.add_argument("-l", "--list", help="Nur diese Liste")
+    ls.add_argument("--due-before", metavar="TT.MM.JJJJ", help="Nur mit Deadline vor diesem Tag")
+    status = ls.add_mutually_exclusive_group()
+    status.add_argument("--done", action="store_true", help="Erledigte statt offene To-Dos")
+    status.add_argument("--all", action="store_true", help="Offene und erledigte To-Dos")
+
+    export = commands.add_parser("export", help="To-Dos als CSV / JSON Lines / iCalendar speichern")
+    export.add_argument("path", help="Zieldatei (.csv / .jsonl / .ics) oder - für die Standardausgabe")
+    export.add_argument("-l", "--list", help="Nur diese Liste")
+    export.add_argument("-f", "--format", choices=EXPORT_FORMATS, help="Format (Standard: nach Endung)")
+
+    commands.add_parser("batch", help="Befehle zeilenweise von der Standardeingabe lesen")
+
+
+def build_parser():
+    parser = CommandParser(description="To-Do Liste ohne Fenster")
+    backend = parser.add_mutually_exclusive_group()
+    backend.add_argument("--sqlite", action="store_true", help="SQLite-Datenbank wie todolist.py --sqlite")
+    backend.add_argument("--binary", action="store_true", help="Binär-Snapshot wie todolist.py --binary")
+    backend.add_argument("--shards", action="store_true", help="Eine Datei pro Liste wie todolist.py --shards")
+    parser.add_argument("--wait", type=float, default=LOCK_TIMEOUT, metavar="SEKUNDEN",
+                        help="So lange auf eine laufende App / ein anderes Skript warten")
+    add_commands(parser)
+    return parser
+
+
+def build_batch_parser():
+    parser = CommandParser(prog="batch", add_help=False)
+    add_commands(parser)
+    return parser
+
+
+# --- Hilfsfunktionen ---
+
+def list_id_by_name(store, name):
+    if name is None:
+        return None
+    list_id = store.get_list_id_by_name(name)
+    if list_id is None:
+        raise CliError(f"Unbekannte Liste: {name}")
+    return list_id
+
+
+def get_todo(store, todo_id):
+    todo = store.todos.get(todo_id)
+    if todo is None and not store.done_loaded:
+        # Kann ein archiviertes (erledigtes) To-Do sein
+        store.ensure_done_loaded()
+        todo = store.todos.get(todo_id)
+    if todo is None:
+        raise CliError(f"Unbekannte id: {todo_id}")
+    return todo
+
+
+def parse_date(text):
+    try:
+        return parse_deadline(text)
+    except ValueError:
+        raise CliError(f"Ungültiges Datum „{text}“ (erwartet TT.MM.JJJJ)")
+
+
+# --- Befehle ---
+
+def cmd_add(store, args, out):
+    try:
+        todo = store.add_todo(args.text, args.deadline, list_id_by_name(store, args.list))
+    except ValueError:
+        raise CliError(f"Ungültiges Datum „{args.deadline}“ (erwartet TT.MM.JJJJ)")
+    print(todo.id, file=out)
+
+
+def cmd_done(store, args, out):
+    todos = [get_todo(store, todo_id) for todo_id in args.ids]
+    store.toggle_done_many([todo.id for todo in todos if not todo.done])
+
+
+def cmd_rm(store, args, out):
+    todos = [get_todo(store, todo_id) for todo_id in args.ids]
+    store.delete_many([todo.id for todo in todos])
+
+
+def cmd_ls(store, args, out):
+    list_id = list_id_by_name(store, args.list)
+    due_before = parse_date(args.due_before) if args.due_before else None
+    states = (False, True) if args.all else (True,) if args.done else (False,)
+    for todo in store.query(list_id, states, due_before):
+        status = "x" if todo.done else " "
+        deadline = format_ordinal(todo.deadline) or "-"
+        print(f"{todo.id}\t{deadline}\t{status}\t{store.get_list_name(todo.list_id)}\t{todo.text}", file=out)
+
+
+def cmd_export(store, args, out):
+    import todo_io
+    list_id = list_id_by_name(store, args.list)
+    todos = store.query(list_id, (False, True))
+    records = todo_io.todo_records(store, todos)
+    try:
+        if args.path == "-":
+            todo_io.WRITERS[args.format or "jsonl"](out, records)
+        else:
+            todo_io.write_todos(args.path, records, args.format)
+    except BrokenPipeError:
+        raise
+    except (OSError, ValueError) as e:
+        raise CliError(f"Export fehlgeschlagen: {e}")
+
+
+def cmd_batch(store, args, out):
+    """Ein Befehl pro Zeile; fehlerhafte Zeilen werden gemeldet, die übrigen trotzdem ausgeführt."""
+    parser = build_batch_parser()
+    errors = 0
+    for number, line in enumerate(sys.stdin, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            line_args = parser.parse_args(shlex.split(line))
+            if line_args.command == "batch":
+                raise CliError("batch kann nicht verschachtelt werden")
+            COMMANDS[line_args.command](store, line_args, out)
+        except (CliError, ValueError) as e:
+            errors += 1
+            print(f"Zeile {number}: {e}", file=sys.stderr)
+    if errors:
+        raise CliError(f"{errors} Zeilen mit Fehlern")
+
+
+COMMANDS = {
+    "add": cmd_add,
+    "done": cmd_done,
+    "rm": cmd_rm,
+    "ls": cmd_ls,
+    "export": cmd_export,
+    "batch": cmd_batch
+}
+
+
+def main(argv=None):
+    try:
+        args = build_parser().parse_args(argv)
+    except CliError as e:
+        print(f"Fehler: {e}", file=sys.stderr)
+        return 2
+
+    lock = StorageLock()
+    if not lock.acquire(timeout=args.wait):
+        print("Fehler: Die Daten werden gerade von der App oder einem anderen Skript verwendet.", file=sys.stderr)
+        return 3
+    try:
+        kind = "sqlite" if args.sqlite else "binary" if args.binary else "shards" if args.shards else "json"
+        store = TodoStore(open_storage(kind))
+        try:
+            store.load_data()
+            COMMANDS[args.command](store, args, sys.stdout)
+        except (CliError, UnsupportedVersionError) as e:
+            print(f"Fehler: {e}", file=sys.stderr)
+            return 1
+        except BrokenPipeError:
+            # Ausgabe vorzeitig beendet (z.B. "| head") – restliche Ausgabe verwerfen
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        finally:
+            # Schreibt ausstehende Änderungen (ein fsync für alle Befehle)
+            store.close_data()
+    finally:
+        lock.release()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+"""
+Import und Export von To-Dos als CSV, JSON Lines und iCalendar (VTODO).
+
+Gelesen und geschrieben wird Datensatz für Datensatz (Generatoren), damit auch sehr große
+Dateien nicht komplett im Speicher landen. Ein Datensatz ist ein dict mit den Feldern
+"text", "deadline" (TT.MM.JJJJ oder ""), "done", "created_at" und "list" (Name der Liste).
+Geprüft und übernommen werden die Datensätze von TodoStore.import_todos().
+"""
+import csv
+import json
+import os
+import re
+from datetime import datetime, timezone
+
+FIELDS = ("text", "deadline", "done", "created_at", "list")
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ics": "ical"}
+CSV_DELIMITERS = (",", ";", "\t")
+TRUE_VALUES = {"1", "true", "ja", "yes", "x", "erledigt", "done"}
+
+
+def detect_format(path):
+    """Format anhand der Dateiendung (.csv / .jsonl / .ics) -> ValueError bei unbekannter Endung."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Unbekanntes Dateiformat: {ext or path} (erlaubt: {', '.join(FORMATS)})")
+    return FORMATS[ext]
+
+
+def as_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in TRUE_VALUES
+    return bool(value)
+
+
+def todo_records(store, todos):
+    """To-Dos des Stores als Datensätze (mit Listennamen statt id)."""
+    for todo in todos:
+        yield {
+            "text": todo.text,
+            "deadline": todo.deadline_text,
+            "done": todo.done,
+            "created_at": todo.created_text,
+            "list": store.get_list_name(todo.list_id)
+        }
+
+
+# --- Lesen ---
+
+def read_todos(path, fmt=None):
+    """Datensätze einer Datei nacheinander liefern."""
+    fmt = fmt or detect_format(path)
+    readers = {"csv": read_csv, "jsonl": read_jsonl, "ical": read_ical}
+    encoding = "utf-8-sig" if fmt == "csv" else "utf-8"
+    with open(path, "r", encoding=encoding, newline="") as f:
+        yield from readers[fmt](f)
+
+
+def read_csv(f):
+    """CSV mit Kopfzeile (Spalten wie FIELDS, fehlende Spalten bleiben leer; auch ";" als Trenner)."""
+    # Trenner nur an der Kopfzeile erkennen: csv.Sniffer rät bei Texten mit Anführungszeichen
+    # oder ";" falsch; die Anführungszeichen selbst bleiben wie beim Export im Excel-Stil
+    header = f.readline()
+    f.seek(0)
+    delimiter = max(CSV_DELIMITERS, key=header.count)
+    for row in csv.DictReader(f, delimiter=delimiter):
+        yield {
+            "text": row.get("text") or "",
+            "deadline": row.get("deadline") or "",
+            "done": as_bool(row.get("done") or ""),
+            "created_at": row.get("created_at") or "",
+            "list": row.get("list") or ""
+        }
+
+
+def read_jsonl(f):
+    """Eine JSON-Zeile pro To-Do; leere Zeilen werden übersprungen."""
+    for line in f:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            # Wie eine leere Zeile zählen -> import_todos meldet "kein Text"
+            record = {}
+        if not isinstance(record, dict):
+            record = {}
+        yield {
+            "text": str(record.get("text") or ""),
+            "deadline": str(record.get("deadline") or ""),
+            "done": as_bool(record.get("done", False)),
+            "created_at": str(record.get("created_at") or ""),
+            "list": str(record.get("list") or "")
+        }
+
+
+def unfold_lines(f):
+    """iCalendar: Fortsetzungszeilen (beginnen mit Leerzeichen/Tab) an die Vorzeile anhängen."""
+    current = None
+    for line in f:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def ical_unescape(value):
+    if "\\" not in value:
+        return value
+    result = []
+    chars = iter(value)
+    for ch in chars:
+        if ch == "\\":
+            nxt = next(chars, "")
+            result.append("\n" if nxt in ("n", "N") else nxt)
+        else:
+            result.append(ch)
+    return "".join(result)
+
+
+def ical_date(value):
+    """
+    DUE/CREATED (JJJJMMTT oder JJJJMMTTTHHMMSS[Z]) -> TT.MM.JJJJ; ungültig bleibt unverändert.
+    Nur umgestellt – ob das Datum existiert, prüft TodoStore.import_todos().
+    """
+    if len(value) >= 8 and value[:8].isdigit():
+        return f"{value[6:8]}.{value[4:6]}.{value[:4]}"
+    return value
+
+
+def read_ical(f):
+    """VTODO-Einträge einer .ics-Datei (SUMMARY, DUE, STATUS, CREATED, CATEGORIES)."""
+    record = None
+    for line in unfold_lines(f):
+        name, _, value = line.partition(":")
+        # Parameter wie "DUE;VALUE=DATE" abtrennen
+        name = name.split(";", 1)[0].upper()
+        if name == "BEGIN" and value.upper() == "VTODO":
+            record = {"text": "", "deadline": "", "done": False, "created_at": "", "list": ""}
+        elif record is None:
+            continue
+        elif name == "END" and value.upper() == "VTODO":
+            yield record
+            record = None
+        elif name == "SUMMARY":
+            record["text"] = ical_unescape(value)
+        elif name == "DUE":
+            record["deadline"] = ical_date(value)
+        elif name == "CREATED":
+            record["created_at"] = ical_date(value)
+        elif name == "STATUS":
+            record["done"] = value.upper() == "COMPLETED"
+        elif name == "CATEGORIES":
+            # Nur die erste Kategorie wird zur Liste
+            record["list"] = ical_unescape(re.split(r"(?<!\\),", value, maxsplit=1)[0])
+
+
+# --- Schreiben ---
+
+def write_todos(path, records, fmt=None):
+    """Datensätze nacheinander in eine Datei schreiben. Liefert die Anzahl."""
+    fmt = fmt or detect_format(path)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        return WRITERS[fmt](f, records)
+
+
+def write_csv(f, records):
+    writer = csv.DictWriter(f, fieldnames=FIELDS)
+    writer.writeheader()
+    count = 0
+    for record in records:
+        writer.writerow(record)
+        count += 1
+    return count
+
+
+def write_jsonl(f, records):
+    count = 0
+    for record in records:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def ical_escape(value):
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def ical_fold(line):
+    """Zeilen nach 75 Zeichen umbrechen (Fortsetzung mit Leerzeichen)."""
+    parts = [line[i:i + 74] for i in range(0, len(line), 74)] or [""]
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def to_ical_date(datestr):
+    day, month, year = datestr.split(".")
+    return f"{year}{month.zfill(2)}{day.zfill(2)}"
+
+
+def write_ical(f, records):
+    f.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//To-Do Liste//DE\r\n")
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    count = 0
+    for record in records:
+        count += 1
+        lines = ["BEGIN:VTODO", f"UID:todo-{count}-{stamp}", f"DTSTAMP:{stamp}",
+                 f"SUMMARY:{ical_escape(record['text'])}"]
+        if record["deadline"]:
+            lines.append(f"DUE;VALUE=DATE:{to_ical_date(record['deadline'])}")
+        if record["created_at"]:
+            lines.append(f"CREATED:{to_ical_date(record['created_at'])}T000000Z")
+        lines.append("STATUS:COMPLETED" if record["done"] else "STATUS:NEEDS-ACTION")
+        if record["list"]:
+            lines.append(f"CATEGORIES:{ical_escape(record['list'])}")
+        lines.append("END:VTODO")
+        f.write("".join(ical_fold(line) for line in lines))
+    f.write("END:VCALENDAR\r\n")
+    return count
+
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl, "ical": write_ical}
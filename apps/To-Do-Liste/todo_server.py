@@ -0,0 +1,557 @@
+"""
+Server-Modus: Ein Prozess hält die To-Do-Daten im Speicher, beliebig viele Fenster und Skripte
+greifen über eine lokale TCP-Verbindung darauf zu.
+
+Protokoll: JSON-RPC 2.0, eine JSON-Zeile pro Nachricht. Methoden:
+    subscribe                                   – aktueller Stand; danach kommt jede Änderung als Benachrichtigung
+    lists                                       – alle Listen
+    query {list_id, done, due_before, limit}    – To-Dos nach Deadline sortiert (done: false/true/null = alle)
+    add {text, deadline, list_id}               – To-Do anlegen, liefert das To-Do
+    toggle {ids} / delete {ids}                 – erledigt umschalten / löschen
+    move {ids, list_id}                         – in eine andere Liste verschieben
+    import {records, list_id}                   – Datensätze wie todo_io.read_todos()
+    undo                                        – letzte Aktion dieses Clients rückgängig machen
+    add_list {name, description} / edit_list {list_id, name, description} / delete_list {list_id}
+
+Änderungsbenachrichtigung (an alle Clients nach subscribe, auch an den auslösenden):
+    {"jsonrpc": "2.0", "method": "changed", "params": {"ops": [...]}}
+Die Operationen haben das Journal-Format (siehe TodoStore.apply_op).
+
+Gespeichert wird wie in der App über den Schreib-Thread (Journal, gebündelt) – keine
+Datei-Zugriffe pro Anfrage. Der Server hält die Dateisperre, App und todo_cli.py im
+lokalen Modus warten also, bis er beendet ist.
+
+Starten:
+    python todo_server.py                       # 127.0.0.1:8765
+    python todolist.py --connect                # App als Client
+"""
+import argparse
+import asyncio
+import json
+import queue
+import signal
+import socket
+import sys
+import threading
+from collections import deque
+from itertools import islice
+
+from todo_store import (
+    UNDO_LIMIT, StorageLock, TodoStore, UnsupportedVersionError, frozen_op, open_storage, parse_deadline, to_json
+)
+
+DEFAULT_HOST = "127.0.0.1"       # Nur lokal erreichbar
+DEFAULT_PORT = 8765
+CONNECT_TIMEOUT = 5              # Sekunden für den Verbindungsaufbau des Clients
+MAX_MESSAGE = 64 * 1024 * 1024   # Längste Zeile (z.B. Import vieler To-Dos auf einmal)
+MAX_BACKLOG = 16 * 1024 * 1024   # Ungesendete Bytes, ab denen ein Client, der nicht mehr liest, getrennt wird
+COMPACT_INTERVAL = 60            # Sekunden zwischen den Prüfungen, ob das Journal kompaktiert werden soll
+
+# JSON-RPC Fehlercodes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+APP_ERROR = -32000
+
+
+class RpcError(Exception):
+    """Fehlerantwort des Servers (code nach JSON-RPC)."""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+def encode(message):
+    return (json.dumps(message, ensure_ascii=False, default=to_json) + "\n").encode("utf-8")
+
+
+def parse_address(address):
+    """"host:port", "port" oder "" (Standard) -> (host, port)."""
+    host, _, port = (address or "").rpartition(":")
+    return host or DEFAULT_HOST, int(port) if port else DEFAULT_PORT
+
+
+# --- Server ---
+
+class ServerStore(TodoStore):
+    """TodoStore, der sich die ausgeführten Operationen für die Benachrichtigungen merkt."""
+
+    def __init__(self, storage=None):
+        super().__init__(storage)
+        self.changes = []
+
+    def perform(self, op):
+        # "batch" ruft perform für jede Einzeloperation auf; die aktuelle Liste wählt jeder Client selbst.
+        # Erst nach dem Ausführen merken – eine fehlgeschlagene Operation darf kein Client bekommen.
+        inverse_op = super().perform(op)
+        if op[0] not in ("batch", "current_list"):
+            self.changes.append(frozen_op(op))
+        return inverse_op
+
+
+class Session:
+    """Eine Client-Verbindung mit eigenem Undo-Verlauf."""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.history = deque(maxlen=UNDO_LIMIT)
+        self.subscribed = False
+
+
+class TodoServer:
+    """
+    Bedient alle Clients in einer asyncio-Schleife. Anfragen werden nacheinander und ohne
+    await ausgeführt – die Daten brauchen daher keine Sperren, und subscribe liefert den Stand
+    ohne Lücke zur ersten Benachrichtigung.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.sessions = set()
+        self.methods = {
+            "subscribe": self.rpc_subscribe,
+            "lists": self.rpc_lists,
+            "query": self.rpc_query,
+            "add": self.rpc_add,
+            "toggle": self.rpc_toggle,
+            "delete": self.rpc_delete,
+            "move": self.rpc_move,
+            "import": self.rpc_import,
+            "undo": self.rpc_undo,
+            "add_list": self.rpc_add_list,
+            "edit_list": self.rpc_edit_list,
+            "delete_list": self.rpc_delete_list
+        }
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        return await asyncio.start_server(self.handle_client, host, port, limit=MAX_MESSAGE)
+
+    async def run(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await self.start(host, port)
+        print(f"To-Do Server läuft auf {host}:{port} (Beenden mit Strg+C)")
+        stop = asyncio.Event()
+        try:
+            # Auch bei "kill" sauber beenden, damit die letzten Änderungen noch geschrieben werden
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+        except NotImplementedError:  # Windows
+            pass
+        compactor = asyncio.create_task(self.compact_periodically())
+        try:
+            async with server:
+                await stop.wait()
+        finally:
+            compactor.cancel()
+
+    async def compact_periodically(self):
+        """Das Journal wächst, solange der Server läuft – ab und zu in einen Snapshot einarbeiten."""
+        while True:
+            await asyncio.sleep(COMPACT_INTERVAL)
+            if self.store.storage.needs_compaction():
+                self.store.save_data()
+
+    async def handle_client(self, reader, writer):
+        session = Session(writer)
+        self.sessions.add(session)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = self.handle_line(session, line)
+                if response is not None:
+                    writer.write(response)
+                    await writer.drain()
+        except (ConnectionError, ValueError):
+            # Verbindung abgebrochen oder Zeile länger als MAX_MESSAGE
+            pass
+        except asyncio.CancelledError:
+            # Server wird beendet
+            pass
+        finally:
+            self.sessions.discard(session)
+            writer.close()
+
+    def handle_line(self, session, line):
+        """Eine Anfrage ausführen; liefert die kodierte Antwort (None bei Benachrichtigungen ohne id)."""
+        request = {}
+        try:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                raise RpcError(PARSE_ERROR, "Ungültiges JSON")
+            if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+                request = {}
+                raise RpcError(INVALID_REQUEST, "Ungültige Anfrage")
+            method = self.methods.get(request["method"])
+            if method is None:
+                raise RpcError(METHOD_NOT_FOUND, f"Unbekannte Methode: {request['method']}")
+            params = request.get("params") or {}
+            if not isinstance(params, dict):
+                raise RpcError(INVALID_PARAMS, "params muss ein Objekt sein")
+            response = {"jsonrpc": "2.0", "id": request.get("id"), "result": self.call(session, method, params)}
+        except RpcError as e:
+            response = {"jsonrpc": "2.0", "id": request.get("id"), "error": {"code": e.code, "message": str(e)}}
+        # Benachrichtigungen (ohne id) bekommen keine Antwort, auch keine Fehlermeldung –
+        # außer die Anfrage war gar nicht lesbar
+        if "id" not in request and response.get("error", {}).get("code") not in (PARSE_ERROR, INVALID_REQUEST):
+            return None
+        return encode(response)
+
+    def call(self, session, method, params):
+        store = self.store
+        store.history = session.history
+        store.changes = []
+        try:
+            return method(session, **params)
+        except TypeError as e:
+            raise RpcError(INVALID_PARAMS, str(e))
+        except (KeyError, ValueError, IndexError) as e:
+            raise RpcError(APP_ERROR, f"Fehler beim Ausführen: {e}")
+        finally:
+            # Auch nach einem Fehler: Bereits ausgeführte Operationen müssen alle Clients erfahren
+            if store.changes:
+                self.broadcast(store.changes)
+                store.changes = []
+
+    def broadcast(self, ops):
+        """Änderung an alle abonnierten Clients (einmal kodiert, ohne auf langsame Clients zu warten)."""
+        data = encode({"jsonrpc": "2.0", "method": "changed", "params": {"ops": ops}})
+        for session in list(self.sessions):
+            if not session.subscribed or session.writer.is_closing():
+                continue
+            if session.writer.transport.get_write_buffer_size() > MAX_BACKLOG:
+                # Liest nicht mehr mit – trennen statt den Speicher zu füllen
+                self.sessions.discard(session)
+                session.writer.close()
+                continue
+            session.writer.write(data)
+
+    # --- Prüfungen ---
+
+    def todo_ids(self, ids):
+        if not isinstance(ids, list):
+            raise RpcError(INVALID_PARAMS, "ids muss eine Liste sein")
+        for todo_id in ids:
+            if todo_id not in self.store.todos:
+                raise RpcError(APP_ERROR, f"Unbekannte id: {todo_id}")
+        return ids
+
+    def list_id(self, list_id):
+        if list_id not in self.store.list_by_id:
+            raise RpcError(APP_ERROR, f"Unbekannte Liste: {list_id}")
+        return list_id
+
+    def list_fields(self, name, description):
+        if not isinstance(name, str) or not name.strip():
+            raise RpcError(INVALID_PARAMS, "name muss ein nicht leerer Text sein")
+        if not isinstance(description, str):
+            raise RpcError(INVALID_PARAMS, "description muss ein Text sein")
+        return name.strip(), description.strip()
+
+    # --- Methoden ---
+
+    def rpc_subscribe(self, session):
+        """Aktueller Stand (Format wie der Snapshot); ab jetzt kommt jede Änderung als Benachrichtigung."""
+        session.subscribed = True
+        store = self.store
+        return {
+            "todos": list(store.todos.values()),
+            "lists": store.lists,
+            "current_list_id": store.current_list_id,
+            "next_todo_id": store.next_todo_id
+        }
+
+    def rpc_lists(self, session):
+        return self.store.lists
+
+    def rpc_query(self, session, list_id=None, done=False, due_before=None, limit=None):
+        if list_id is not None:
+            self.list_id(list_id)
+        states = (False, True) if done is None else (bool(done),)
+        due_before = parse_deadline(due_before) if due_before else None
+        return list(islice(self.store.query(list_id, states, due_before), limit))
+
+    def rpc_add(self, session, text, deadline="", list_id=None):
+        if not str(text).strip():
+            raise RpcError(INVALID_PARAMS, "Kein Text")
+        return self.store.add_todo(str(text).strip(), deadline, list_id)
+
+    def rpc_toggle(self, session, ids):
+        self.store.toggle_done_many(self.todo_ids(ids))
+        return len(ids)
+
+    def rpc_delete(self, session, ids):
+        self.store.delete_many(self.todo_ids(ids))
+        return len(ids)
+
+    def rpc_move(self, session, ids, list_id):
+        self.store.move_many(self.todo_ids(ids), self.list_id(list_id))
+        return len(ids)
+
+    def rpc_import(self, session, records, list_id=None):
+        if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+            raise RpcError(INVALID_PARAMS, "records muss eine Liste von Objekten sein")
+        count, errors = self.store.import_todos(records, list_id)
+        return {"count": count, "errors": errors}
+
+    def rpc_undo(self, session):
+        """Macht die letzte Aktion dieses Clients rückgängig; liefert die ausgeführte Operation oder null."""
+        return self.store.undo()
+
+    def rpc_add_list(self, session, name, description=""):
+        return self.store.add_list(*self.list_fields(name, description))
+
+    def rpc_edit_list(self, session, list_id, name, description=""):
+        self.store.edit_list(self.list_id(list_id), *self.list_fields(name, description))
+
+    def rpc_delete_list(self, session, list_id):
+        if len(self.store.lists) <= 1:
+            raise RpcError(APP_ERROR, "Die letzte Liste kann nicht gelöscht werden")
+        self.store.delete_list(self.list_id(list_id))
+
+
+# --- Client ---
+
+class RpcConnection:
+    """
+    Blockierende Verbindung zum Server (für die GUI). Ein Lese-Thread legt alle Nachrichten
+    in eine Queue; ausgewertet werden sie nur im aufrufenden Thread, in Eingangsreihenfolge.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, on_event=None):
+        self.sock = socket.create_connection((host, port), timeout=CONNECT_TIMEOUT)
+        self.sock.settimeout(None)
+        self.on_event = on_event
+        self.messages = queue.Queue()
+        self.next_id = 1
+        self.closed = False
+        self.thread = threading.Thread(target=self.read_loop, name="todo-rpc", daemon=True)
+        self.thread.start()
+
+    def read_loop(self):
+        try:
+            with self.sock.makefile("rb") as f:
+                for line in f:
+                    self.messages.put(json.loads(line))
+        except (OSError, ValueError) as e:
+            if not self.closed:
+                print("Fehler beim Lesen vom Server:", e)
+        self.messages.put(None)         # Verbindung beendet
+
+    def handle(self, message):
+        if message is None:
+            self.messages.put(None)     # Auch spätere Aufrufe sollen es merken
+            raise ConnectionError("Verbindung zum Server verloren")
+        if "id" not in message and self.on_event:
+            self.on_event(message)
+
+    def call(self, method, **params):
+        """Anfrage senden und auf die Antwort warten; Benachrichtigungen davor werden übernommen."""
+        request_id = self.next_id
+        self.next_id += 1
+        self.sock.sendall(encode({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}))
+        while True:
+            message = self.messages.get()
+            self.handle(message)
+            if message.get("id") != request_id:
+                continue
+            if "error" in message:
+                raise RpcError(message["error"]["code"], message["error"]["message"])
+            return message["result"]
+
+    def poll(self):
+        """Alle bereits angekommenen Benachrichtigungen übernehmen (ohne zu warten)."""
+        while True:
+            try:
+                message = self.messages.get_nowait()
+            except queue.Empty:
+                return
+            self.handle(message)
+
+    def close(self):
+        self.closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class RemoteStorage:
+    """Speicher-Ersatz für RemoteTodoStore: Die Daten kommen vom Server, gespeichert wird dort."""
+
+    lazy_done = False
+    sharded = False
+    lazy_counts = False
+    archive_counts = {}
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def exists(self):
+        return True
+
+    def needs_migration(self):
+        return False
+
+    def needs_compaction(self):
+        return False
+
+    def load(self):
+        return self.connection.call("subscribe"), []
+
+    def append_many(self, ops):
+        # Nur "current_list" kommt hier an – die ausgewählte Liste bleibt lokal
+        pass
+
+    def save(self, data):
+        pass
+
+    def close(self):
+        self.connection.close()
+
+
+class RemoteTodoStore(TodoStore):
+    """
+    TodoStore als Client von todo_server.py. Gelesen wird wie gewohnt aus der lokalen Kopie;
+    Änderungen schickt der Store an den Server und übernimmt sie erst, wenn sie – wie die
+    Änderungen anderer Clients – als Benachrichtigung zurückkommen. So vergibt nur der Server
+    ids, und alle Kopien sehen dieselbe Reihenfolge.
+    """
+
+    remote = True
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.connection = RpcConnection(host, port, self.apply_event)
+        self.changed_ops = []          # Übernommene Operationen seit dem letzten poll_events()
+        self.resync_needed = False     # Lokale Kopie weicht vom Server ab, Stand neu holen
+        super().__init__(RemoteStorage(self.connection))
+
+    def apply_event(self, message):
+        if message.get("method") != "changed" or self.resync_needed:
+            return
+        try:
+            for op in message["params"]["ops"]:
+                self.apply_op(op)
+                self.changed_ops.append(op)
+        except Exception as e:
+            # Rest verwerfen – bis zum Neuladen würde jede weitere Operation auf einer falschen Kopie laufen
+            print("Fehler beim Übernehmen einer Änderung:", e)
+            self.resync_needed = True
+
+    def resync(self):
+        """Stand neu vom Server holen; Änderungen, die vor der Antwort ankommen, stecken schon darin."""
+        current_list_id = self.current_list_id
+        self.load_from(self.storage)
+        self.resync_needed = False
+        if current_list_id in self.list_by_id:
+            self.current_list_id = current_list_id
+        self.changed_ops.append(("resync",))
+
+    def poll_events(self):
+        """Angekommene Änderungen übernehmen; liefert die Operationen (für die Anzeige)."""
+        self.connection.poll()
+        if self.resync_needed:
+            self.resync()
+        ops, self.changed_ops = self.changed_ops, []
+        return ops
+
+    def call(self, method, **params):
+        """Anfrage an den Server; ließ sich eine Änderung davor nicht übernehmen, gleich neu laden."""
+        result = self.connection.call(method, **params)
+        if self.resync_needed:
+            self.resync()
+        return result
+
+    def save_data(self):
+        # Speichert der Server
+        pass
+
+    # --- Aktionen: ausgeführt vom Server ---
+
+    def add_todo(self, text, deadline="", list_id=None):
+        parse_deadline(deadline)       # ValueError wie lokal, ohne Umweg über den Server
+        if list_id not in self.list_by_id:
+            list_id = self.current_list_id
+        result = self.call("add", text=text, deadline=deadline, list_id=list_id)
+        return self.todos[result["id"]]
+
+    def import_todos(self, records, list_id=None):
+        if list_id not in self.list_by_id:
+            list_id = self.current_list_id
+        result = self.call("import", records=list(records), list_id=list_id)
+        return result["count"], [tuple(error) for error in result["errors"]]
+
+    def toggle_done(self, todo_id):
+        self.toggle_done_many([todo_id])
+
+    def delete_todo(self, todo_id):
+        self.delete_many([todo_id])
+
+    def toggle_done_many(self, todo_ids):
+        self.call("toggle", ids=list(todo_ids))
+
+    def delete_many(self, todo_ids):
+        self.call("delete", ids=list(todo_ids))
+
+    def move_many(self, todo_ids, list_id):
+        self.call("move", ids=list(todo_ids), list_id=list_id)
+
+    def undo(self):
+        return self.call("undo")
+
+    def add_list(self, name, description=""):
+        result = self.call("add_list", name=name, description=description)
+        self.set_current_list(result["id"])
+        return self.list_by_id[result["id"]]
+
+    def edit_list(self, list_id, name, description):
+        self.call("edit_list", list_id=list_id, name=name, description=description)
+
+    def delete_list(self, list_id):
+        self.call("delete_list", list_id=list_id)
+        if self.current_list_id == list_id:
+            self.set_current_list(self.lists[0]["id"])
+
+
+# --- Start ---
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="To-Do Server (JSON-RPC über eine lokale TCP-Verbindung)")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Adresse (Standard: {DEFAULT_HOST}, nur lokal)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (Standard: {DEFAULT_PORT})")
+    backend = parser.add_mutually_exclusive_group()
+    backend.add_argument("--sqlite", action="store_true", help="SQLite-Datenbank wie todolist.py --sqlite")
+    backend.add_argument("--binary", action="store_true", help="Binär-Snapshot wie todolist.py --binary")
+    backend.add_argument("--shards", action="store_true", help="Eine Datei pro Liste wie todolist.py --shards")
+    args = parser.parse_args(argv)
+
+    lock = StorageLock()
+    if not lock.acquire():
+        print("Fehler: Die Daten werden gerade von der App oder einem anderen Skript verwendet.", file=sys.stderr)
+        return 3
+    kind = "sqlite" if args.sqlite else "binary" if args.binary else "shards" if args.shards else "json"
+    store = ServerStore(open_storage(kind))
+    try:
+        store.load_data()
+        # Der Server hält alles im Speicher (auch die erledigten To-Dos für subscribe/query)
+        store.ensure_done_loaded()
+        asyncio.run(TodoServer(store).run(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    except UnsupportedVersionError as e:
+        print("Fehler beim Laden:", e, file=sys.stderr)
+        return 1
+    except OSError as e:
+        print("Fehler beim Starten des Servers:", e, file=sys.stderr)
+        return 1
+    finally:
+        store.close_data()
+        lock.release()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2000 @@
+"""
+Tk-freier Kern der To-Do-App: Daten, Indizes, Undo und Speicherung.
+
+Wird von der GUI (todolist.py), der Kommandozeile (todo_cli.py), dem Server (todo_server.py)
+und vom Benchmark (bench_todo_store.py) verwendet.
+"""
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime, date
+from functools import lru_cache
+from heapq import heapify, heappop, heappush, merge
+from operator import attrgetter
+from array import array
+from itertools import accumulate, islice
+import json
+import mmap
+import os
+import queue
+import re
+import struct
+import sys
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:              # Windows
+    fcntl = None
+    import msvcrt
+
+DATE_FORMAT = "%d.%m.%Y"
+
+
+def get_save_file():
+    """
+    Ermittelt einen Speicherort für die Daten im gleichen Ordner wie
+    das Script (beim Entwickeln) bzw. die ausführbare Datei (bei PyInstaller).
+    """
+    if getattr(sys, 'frozen', False):
+        # PyInstaller: Pfad zur ausgeführten EXE / .app
+        base_dir = os.path.dirname(sys.executable)
+    else:
+        # Normales Python-Script
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_dir, "todo_data.json")
+
+SAVE_FILE = get_save_file()
+JOURNAL_FILE = os.path.splitext(SAVE_FILE)[0] + ".journal"
+SQLITE_FILE = os.path.splitext(SAVE_FILE)[0] + ".sqlite3"
+BINARY_FILE = os.path.splitext(SAVE_FILE)[0] + ".bin"
+BINARY_JOURNAL_FILE = BINARY_FILE + ".journal"
+SHARD_DIR = os.path.splitext(SAVE_FILE)[0] + ".shards"
+LOCK_FILE = os.path.splitext(SAVE_FILE)[0] + ".lock"
+PROFILE_FILE = os.path.splitext(SAVE_FILE)[0] + ".profile.jsonl"
+COMPACT_THRESHOLD = 500          # Ab so vielen Journal-Einträgen wird beim Start kompaktiert
+
+UNDO_LIMIT = 1000                # Maximale Anzahl Undo-Schritte
+HISTORY_BATCH = 500              # Erledigte To-Dos, die pro Schritt nachgeladen werden
+SEARCH_BATCH = 2000              # Geladene To-Dos, die pro Schritt in den Suchindex aufgenommen werden
+AUTOSAVE_DELAY = 0.5             # Sekunden, in denen Änderungen gesammelt und dann gemeinsam geschrieben werden
+PROFILE_SAMPLES = 10000          # Größe des Ringpuffers für Messwerte (--profile)
+
+NO_DEADLINE_ORDINAL = date.max.toordinal()   # Sortierschlüssel für To-Dos ohne (gültige) Deadline
+
+
+@lru_cache(maxsize=4096)
+def deadline_ordinal(datestr):
+    """
+    Datum "TT.MM.JJJJ" als ganzzahlige Tagesnummer (leer/ungültig -> NO_DEADLINE_ORDINAL).
+    Bewusst ohne strptime, da diese Funktion beim Laden für jedes To-Do läuft. Der Cache
+    sorgt zusätzlich dafür, dass gleiche Daten dasselbe int-Objekt teilen.
+    """
+    if not datestr:
+        return NO_DEADLINE_ORDINAL
+    try:
+        day, month, year = datestr.split(".")
+        return date(int(year), int(month), int(day)).toordinal()
+    except ValueError:
+        return NO_DEADLINE_ORDINAL
+
+
+@lru_cache(maxsize=4096)
+def format_ordinal(ordinal):
+    """Tagesnummer wieder als "TT.MM.JJJJ" (NO_DEADLINE_ORDINAL -> "")."""
+    if ordinal == NO_DEADLINE_ORDINAL:
+        return ""
+    return date.fromordinal(ordinal).strftime(DATE_FORMAT)
+
+
+_shared_ints = {}
+
+
+@lru_cache(maxsize=4096)
+def parse_deadline(datestr):
+    """Deadline aus der Eingabe prüfen ("" = keine). Ungültig (nicht TT.MM.JJJJ) -> ValueError."""
+    if datestr:
+        datetime.strptime(datestr, DATE_FORMAT)
+    return deadline_ordinal(datestr)
+
+
+def shared_int(value):
+    """Gleiche Zahlen (z.B. Listen-ids) nur einmal im Speicher halten."""
+    return _shared_ints.setdefault(value, value)
+
+
+class Todo:
+    """
+    Kompakter To-Do-Datensatz (statt eines dicts pro To-Do).
+    Daten sind Tagesnummern: created = Erstellt am, deadline = Deadline
+    (NO_DEADLINE_ORDINAL = keine Deadline). In JSON bleibt das bisherige Format erhalten.
+    """
+
+    __slots__ = ("id", "text", "done", "created", "deadline", "list_id")
+
+    def __init__(self, todo_id, text, done, created, deadline, list_id):
+        self.id = todo_id
+        self.text = text
+        self.done = done
+        self.created = created
+        self.deadline = deadline
+        self.list_id = list_id
+
+    @property
+    def deadline_text(self):
+        return format_ordinal(self.deadline)
+
+    @property
+    def created_text(self):
+        return format_ordinal(self.created)
+
+    @classmethod
+    def from_dict(cls, data, default_list_id=None):
+        """To-Do aus dem JSON-Format { "id", "text", "done", "created_at", "deadline", "list_id" }."""
+        return cls(
+            data["id"],
+            data.get("text", ""),
+            bool(data.get("done", False)),
+            deadline_ordinal(data.get("created_at", "")),
+            deadline_ordinal(data.get("deadline", "")),
+            shared_int(data.get("list_id", default_list_id))
+        )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "text": self.text,
+            "done": self.done,
+            "created_at": self.created_text,
+            "deadline": self.deadline_text,
+            "list_id": self.list_id
+        }
+
+
+def to_json(obj):
+    """default-Funktion für json.dump: To-Do-Datensätze im bisherigen Format schreiben."""
+    if isinstance(obj, Todo):
+        return obj.to_dict()
+    raise TypeError(f"Nicht serialisierbar: {type(obj).__name__}")
+
+
+todo_record = attrgetter(*Todo.__slots__)    # Unveränderliche Kopie eines To-Dos als Tupel
+
+
+def as_todo(todo):
+    """Journal-Einträge enthalten To-Dos als dict, Snapshots für den Schreib-Thread als Tupel."""
+    if isinstance(todo, Todo):
+        return todo
+    if isinstance(todo, tuple):
+        return Todo(*todo)
+    return Todo.from_dict(todo)
+
+
+def frozen_op(op):
+    """
+    Operation ohne veränderliche Objekte (To-Dos, Listen) für den Schreib-Thread –
+    die GUI darf sie weiter ändern, während das Schreiben noch aussteht.
+    """
+    kind = op[0]
+    if kind == "insert":
+        return (kind, as_todo(op[1]).to_dict())
+    if kind == "insert_many":
+        return (kind, [as_todo(todo).to_dict() for todo in op[1]])
+    if kind == "insert_list":
+        return (kind, op[1], dict(op[2]))
+    if kind == "restore_list":
+        _, idx, lst, todos = op
+        return (kind, idx, dict(lst), [as_todo(todo).to_dict() for todo in todos])
+    return op
+
+
+sort_key = attrgetter("deadline", "id")    # Sortierung innerhalb eines Buckets (id macht eindeutig)
+
+
+class TodoBucket:
+    """To-Dos einer Liste mit einem Status, sortiert nach (Deadline, id)."""
+
+    __slots__ = ("entries",)
+
+    def __init__(self):
+        self.entries = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __getitem__(self, row):
+        return self.entries[row]
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def add(self, todo):
+        self.entries.insert(bisect_left(self.entries, sort_key(todo), key=sort_key), todo)
+
+    def remove(self, todo):
+        del self.entries[bisect_left(self.entries, sort_key(todo), key=sort_key)]
+
+    def add_many(self, todos):
+        """
+        Viele To-Dos einsortieren. Sortiert wird nur der neue Stapel; liegt er hinter dem
+        letzten Eintrag (z.B. beim Nachladen der History), wird nur angehängt, sonst nur der
+        Teil ab seinem ersten Schlüssel gemischt – nicht bei jedem Stapel der ganze Bucket.
+        """
+        batch = sorted(todos, key=sort_key)
+        if not batch:
+            return
+        entries = self.entries
+        first = sort_key(batch[0])
+        if not entries or sort_key(entries[-1]) < first:
+            entries.extend(batch)
+            return
+        start = bisect_left(entries, first, key=sort_key)
+        entries[start:] = merge(entries[start:], batch, key=sort_key)
+
+    def remove_list(self, list_id):
+        self.entries = [todo for todo in self.entries if todo.list_id != list_id]
+
+    def remove_ids(self, todo_ids):
+        """Viele To-Dos auf einmal entfernen (O(n) statt O(n) je To-Do)."""
+        self.entries = [todo for todo in self.entries if todo.id not in todo_ids]
+
+    def first_row_from(self, deadline):
+        """Erste Zeile mit Deadline >= deadline – davor liegen die früheren (O(log n))."""
+        return bisect_left(self.entries, (deadline,), key=sort_key)
+
+    def index(self, todo):
+        """Zeile eines To-Dos im Bucket (O(log n)) oder None."""
+        row = bisect_left(self.entries, sort_key(todo), key=sort_key)
+        if row < len(self.entries) and self.entries[row] is todo:
+            return row
+        return None
+
+
+EMPTY_BUCKET = TodoBucket()
+ALL_LISTS = None                 # Bucket-Schlüssel für "alle Listen" (History-Filter "Alle")
+
+class DueQueue:
+    """
+    Offene To-Dos mit Deadline als Min-Heap von (Deadline, id) – für Erinnerungen.
+
+    Erledigte, gelöschte oder geänderte To-Dos werden nicht aus dem Heap gesucht,
+    sondern erst beim Entnehmen als veraltet erkannt und verworfen (O(log n) je Eintrag).
+    """
+
+    __slots__ = ("heap", "queued")
+
+    def __init__(self):
+        self.heap = []
+        self.queued = set()        # (Deadline, id) im Heap – verhindert doppelte Einträge
+
+    def add(self, todo, todos):
+        if todo.done or todo.deadline == NO_DEADLINE_ORDINAL:
+            return
+        key = (todo.deadline, todo.id)
+        if key in self.queued:
+            return
+        self.queued.add(key)
+        heappush(self.heap, key)
+        if len(self.heap) > 2 * len(todos) + 64:
+            # Zu viele veraltete Einträge: einmal aufräumen (amortisiert O(1))
+            self.heap = [key for key in self.heap if self.valid(key, todos)]
+            self.queued = set(self.heap)
+            heapify(self.heap)
+
+    def add_many(self, todos):
+        keys = [
+            (todo.deadline, todo.id) for todo in todos
+            if not todo.done and todo.deadline != NO_DEADLINE_ORDINAL
+        ]
+        keys = [key for key in keys if key not in self.queued]
+        self.queued.update(keys)
+        self.heap.extend(keys)
+        heapify(self.heap)
+
+    @staticmethod
+    def valid(key, todos):
+        todo = todos.get(key[1])
+        return todo is not None and not todo.done and todo.deadline == key[0]
+
+    def _discard_stale(self, todos):
+        while self.heap and not self.valid(self.heap[0], todos):
+            self.queued.discard(heappop(self.heap))
+
+    def next_deadline(self, todos):
+        """Früheste Deadline eines offenen To-Dos oder None."""
+        self._discard_stale(todos)
+        return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, today, todos):
+        """Alle offenen To-Dos mit Deadline <= today entnehmen (O(k log n))."""
+        due = []
+        while self.heap and self.heap[0][0] <= today:
+            key = heappop(self.heap)
+            self.queued.discard(key)
+            if self.valid(key, todos):
+                due.append(todos[key[1]])
+        return due
+
+
+WORD_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Wörter eines Textes für die Suche (klein geschrieben, ohne Duplikate)."""
+    return set(WORD_RE.findall(text.casefold()))
+
+
+class SearchIndex:
+    """
+    Invertierter Index für die Volltextsuche: Wort -> ids der To-Dos, die es enthalten.
+    Die sortierte Wortliste erlaubt Präfixsuche per bisect ("einka" findet "einkaufen").
+    Neue Wörter werden hinten angehängt und erst vor der nächsten Suche einsortiert –
+    beim stückweisen Aufbau sonst ein Einfügen mitten in die Liste je neuem Wort.
+    """
+
+    def __init__(self, todos=()):
+        self.postings = {}           # Wort -> set(ids)
+        self.words = []              # Alle Wörter, sortiert (bis auf neu angehängte, siehe unsorted)
+        self.unsorted = False
+        for todo in todos:
+            self.add(todo)
+
+    def add(self, todo):
+        for word in tokenize(todo.text):
+            ids = self.postings.get(word)
+            if ids is None:
+                ids = self.postings[word] = set()
+                self.words.append(word)
+                self.unsorted = True
+            ids.add(todo.id)
+
+    def remove(self, todo):
+        for word in tokenize(todo.text):
+            ids = self.postings.get(word)
+            if ids is None:
+                continue
+            ids.discard(todo.id)
+            if not ids:
+                del self.postings[word]
+                words = self.sorted_words()
+                del words[bisect_left(words, word)]
+
+    def sorted_words(self):
+        if self.unsorted:
+            # Sortierter Anfang + angehängte Wörter: Timsort braucht dafür nur einen Durchlauf
+            self.words.sort()
+            self.unsorted = False
+        return self.words
+
+    def prefix_ids(self, prefix):
+        """ids aller To-Dos mit einem Wort, das mit prefix beginnt."""
+        words = self.sorted_words()
+        start = bisect_left(words, prefix)
+        end = bisect_left(words, prefix + "\U0010ffff", lo=start)
+        if end - start == 1:
+            return self.postings[words[start]]
+        result = set()
+        for word in words[start:end]:
+            result |= self.postings[word]
+        return result
+
+    def search(self, query):
+        """ids der To-Dos, die zu jedem Wort der Anfrage ein passendes Wort enthalten."""
+        candidates = sorted((self.prefix_ids(prefix) for prefix in tokenize(query)), key=len)
+        if not candidates:
+            return set()
+        # Von der kleinsten Menge aus schneiden: jeder Schritt kostet höchstens so viel wie das Ergebnis
+        result = set(candidates[0])
+        for ids in candidates[1:]:
+            if not result:
+                break
+            result &= ids
+        return result
+
+
+class SearchResult:
+    """
+    Treffer einer Suche, neueste zuerst (wie ein Bucket: len, [row], index).
+    Sortiert und in To-Dos umgesetzt wird erst beim ersten Zugriff und höchstens limit
+    Treffer – bei häufigen Präfixen wie "a" nicht alle 100.000.
+    """
+
+    __slots__ = ("ids", "todos", "total", "limit", "rows")
+
+    def __init__(self, ids, todos, limit=None):
+        self.ids = ids
+        self.todos = todos
+        self.total = len(ids)
+        self.limit = self.total if limit is None else min(limit, self.total)
+        self.rows = None
+
+    def __len__(self):
+        return self.limit
+
+    def row_ids(self):
+        if self.rows is None:
+            # sorted läuft komplett in C und ist hier schneller als heapq.nlargest
+            self.rows = sorted(self.ids, reverse=True)[:self.limit]
+        return self.rows
+
+    def __getitem__(self, row):
+        return self.todos[self.row_ids()[row]]
+
+    def __iter__(self):
+        return (self.todos[todo_id] for todo_id in self.row_ids())
+
+    def index(self, todo):
+        """Zeile eines To-Dos (O(limit)) oder None."""
+        try:
+            row = self.row_ids().index(todo.id)
+        except ValueError:
+            return None
+        return row if self.todos.get(todo.id) is todo else None
+
+
+def write_snapshot(path, data):
+    """Schreibt die Daten in eine temporäre Datei und ersetzt das Ziel danach atomar."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, default=to_json)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def write_lines(path, todos):
+    """
+    Wie write_snapshot, aber ein To-Do pro Zeile – so lässt sich die Datei stückweise lesen.
+    Liefert die Anzahl geschriebener To-Dos je Liste (list_id -> Anzahl).
+    """
+    counts = {}
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for todo in todos:
+            todo = as_todo(todo)
+            counts[todo.list_id] = counts.get(todo.list_id, 0) + 1
+            f.write(json.dumps(todo.to_dict(), ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return counts
+
+
+class UnsupportedVersionError(ValueError):
+    """
+    Die Datei stammt von einer neueren Version der App. Laden wird abgebrochen – mit einem
+    leeren Stand weiterzumachen, würde beim nächsten Speichern die gültigen Daten überschreiben.
+    """
+
+
+class Journal:
+    """
+    Append-only Änderungsprotokoll neben SAVE_FILE.
+
+    Erste Zeile ist ein Header {"generation": n}. Passt n nicht zur Generation des
+    Snapshots, wurde das Journal bereits eingearbeitet und wird ignoriert.
+    Danach folgt eine JSON-Zeile pro Operation.
+    """
+
+    def __init__(self, path, generation):
+        self.path = path
+        self.generation = generation
+        self.count = 0               # Anzahl Operationen im Journal
+        self.file = None
+        self.valid_size = None       # Länge des gültigen Teils; None = Datei neu anlegen
+
+    def replay(self):
+        """Liefert alle vollständig geschriebenen Operationen der passenden Generation."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            header = f.readline()
+            try:
+                generation = json.loads(header).get("generation")
+            except ValueError:
+                return
+            if not header.endswith(b"\n") or generation != self.generation:
+                return
+            size = len(header)
+            for line in f:
+                # Eine abgeschnittene letzte Zeile (Absturz beim Schreiben) wird verworfen
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    break
+                size += len(line)
+                self.count += 1
+                yield op
+        self.valid_size = size
+
+    def append(self, op):
+        if self.file is None:
+            self._open()
+        self.file.write(json.dumps(op, ensure_ascii=False, default=to_json) + "\n")
+        self.count += 1
+
+    def sync(self):
+        """Geschriebene Zeilen auf die Platte bringen (einmal pro Bündel)."""
+        if self.file is not None:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def _open(self):
+        if self.valid_size is None:
+            self.reset(self.generation)
+        else:
+            os.truncate(self.path, self.valid_size)
+            self.file = open(self.path, "a", encoding="utf-8")
+
+    def reset(self, generation):
+        """Neues, leeres Journal für die angegebene Snapshot-Generation beginnen."""
+        self.close()
+        self.generation = generation
+        self.count = 0
+        self.file = open(self.path, "w", encoding="utf-8")
+        self.file.write(json.dumps({"generation": generation}) + "\n")
+        self.file.flush()
+        self.valid_size = None
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class JsonStorage:
+    """
+    Standard-Speicher: JSON-Snapshot (SAVE_FILE) plus Append-only Journal.
+
+    Der Snapshot enthält nur offene To-Dos. Erledigte To-Dos liegen in einer eigenen
+    Archiv-Datei (todo_data.archive.<n>.jsonl, eine Zeile pro To-Do, nach Deadline sortiert),
+    die erst beim Öffnen der History stückweise gelesen wird.
+    Ein neues Archiv bekommt eine neue Nummer und wird vor dem Snapshot geschrieben, der
+    darauf verweist – ein Absturz dazwischen lässt Snapshot und altes Archiv gültig.
+    """
+
+    lazy_done = True
+    sharded = False                    # True: save_data liefert nur geänderte Segmente (ShardedStorage)
+    lazy_counts = False                # True: Archiv-Zählung erst bei Bedarf je Liste (count_done, SQLite)
+
+    def __init__(self, snapshot_path, journal_path):
+        self.snapshot_path = snapshot_path
+        self.journal = Journal(journal_path, 0)
+        self.archive_generation = None     # Archiv, auf das der Snapshot verweist (None = keins)
+        self.archive_counts = {}           # Anzahl To-Dos im Archiv je Liste (None = unbekannt, ältere Datei)
+        self.inline_done = False           # Ältere Datei: erledigte To-Dos stehen noch im Snapshot
+
+    def archive_path(self, generation):
+        return f"{os.path.splitext(self.snapshot_path)[0]}.archive.{generation}.jsonl"
+
+    def exists(self):
+        return os.path.exists(self.snapshot_path) or os.path.exists(self.journal.path)
+
+    def needs_migration(self):
+        return False
+
+    def load(self):
+        """Liefert (Snapshot-Daten oder None, Operationen aus dem Journal)."""
+        data = None
+        if os.path.exists(self.snapshot_path):
+            data = self.read_snapshot()
+        self.journal.generation = data.get("generation", 0) if data else 0
+        if data:
+            self.archive_generation = data.get("archive_generation")
+            counts = data.get("archive_counts")
+            if self.archive_generation is None:
+                self.archive_counts = {}
+            elif counts is None:
+                self.archive_counts = None
+            else:
+                self.archive_counts = {int(list_id): count for list_id, count in counts.items()}
+            self.inline_done = self.archive_generation is None and any(
+                todo.get("done") for todo in data.get("todos", [])
+            )
+        return data, self.journal.replay()
+
+    def read_snapshot(self):
+        with open(self.snapshot_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def write_snapshot(self, snapshot):
+        write_snapshot(self.snapshot_path, snapshot)
+
+    def iter_done(self, batch_size):
+        """Erledigte To-Dos aus dem Archiv in Stücken von batch_size (nach Deadline sortiert)."""
+        if self.archive_generation is None:
+            return
+        with open(self.archive_path(self.archive_generation), "r", encoding="utf-8") as f:
+            batch = []
+            for line in f:
+                batch.append(json.loads(line))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+    def append_many(self, ops):
+        for op in ops:
+            self.journal.append(op)
+        self.journal.sync()
+
+    def needs_compaction(self):
+        # Ältere Dateien werden beim ersten Start in Snapshot + Archiv aufgeteilt
+        return self.journal.count >= COMPACT_THRESHOLD or self.inline_done
+
+    def save(self, data):
+        """
+        Kompaktierung: neuer Snapshot (atomar per Rename) und leeres Journal.
+        Das Archiv wird nur neu geschrieben, wenn data["archive"] nicht None ist.
+        """
+        generation = self.journal.generation + 1
+        snapshot = dict(data, generation=generation, todos=[as_todo(todo) for todo in data["todos"]])
+        archive = snapshot.pop("archive", None)
+        old_archive = self.archive_generation
+        if archive is not None:
+            self.archive_counts = write_lines(self.archive_path(generation), archive)
+            self.archive_generation = generation
+        snapshot["archive_generation"] = self.archive_generation
+        snapshot["archive_counts"] = self.archive_counts
+        self.write_snapshot(snapshot)
+        self.inline_done = False
+        self.journal.reset(generation)
+        if archive is not None and old_archive is not None:
+            try:
+                os.remove(self.archive_path(old_archive))
+            except OSError:
+                pass
+
+    def close(self):
+        self.journal.close()
+
+
+class BinaryStorage(JsonStorage):
+    """
+    Optionaler kompakter Snapshot (BINARY_FILE) statt JSON – Journal und Archiv wie bei JsonStorage.
+
+    Aufbau (little-endian, siehe BINARY_HEADER):
+      Kopf       Kennung, Formatversion, generation, archive_generation (-1 = keins),
+                 next_todo_id, current_list_id, Anzahl Texte / Listen / To-Dos
+      Texttabelle  Länge je Text (uint32, Bytes) + UTF-8-Block – Namen und Beschreibungen der Listen
+      Listen     je id (int64), Index des Namens und der Beschreibung in der Texttabelle
+      To-Dos     je id, list_id (int64), erstellt, Deadline (Tagesnummern, int32), erledigt (uint8)
+      Texte      Länge je To-Do-Text (uint32, Zeichen), Blockgröße (uint64) + UTF-8-Block
+      Archiv     (ab Version 2) Anzahl Listen (uint32, 0xFFFFFFFF = unbekannt),
+                 je list_id (int64) und Anzahl erledigter To-Dos im Archiv (uint32)
+    Gelesen wird per mmap ohne Parser: feste Datensätze mit struct.iter_unpack, die Texte
+    werden am Stück dekodiert und nur noch aufgeteilt.
+    """
+
+    MAGIC = b"TODOSNAP"
+    VERSION = 2
+    HEADER = struct.Struct("<8sHqqqqIII")
+    LIST = struct.Struct("<qII")
+    TODO = struct.Struct("<qqiiB")
+    SIZE = struct.Struct("<Q")
+    COUNT = struct.Struct("<I")
+    ARCHIVE_COUNT = struct.Struct("<qI")
+    UNKNOWN = 0xFFFFFFFF
+
+    def __init__(self, path, journal_path, legacy_storage=None):
+        super().__init__(path, journal_path)
+        self.legacy_storage = legacy_storage   # JSON-Daten für die einmalige Migration
+
+    def archive_path(self, generation):
+        # Eigene Archivnamen, damit sich JSON- und Binär-Speicher nicht gegenseitig aufräumen
+        return f"{self.snapshot_path}.archive.{generation}.jsonl"
+
+    def needs_migration(self):
+        return not self.exists() and self.legacy_storage is not None and self.legacy_storage.exists()
+
+    def read_snapshot(self):
+        with open(self.snapshot_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return self.decode(view)
+
+    def decode(self, view):
+        magic, version, generation, archive_generation, next_todo_id, current_list_id, \
+            string_count, list_count, todo_count = self.HEADER.unpack_from(view, 0)
+        if magic != self.MAGIC:
+            raise ValueError("Keine Snapshot-Datei (Kennung fehlt)")
+        if version > self.VERSION:
+            raise UnsupportedVersionError(f"Snapshot-Version {version} wird nicht unterstützt (max. {self.VERSION})")
+        offset = self.HEADER.size
+
+        lengths, offset = self.read_lengths(view, offset, string_count)
+        blob = view[offset:offset + sum(lengths)]
+        ends = list(accumulate(lengths))
+        strings = [str(blob[end - n:end], "utf-8") for n, end in zip(lengths, ends)]
+        offset += sum(lengths)
+
+        size = self.LIST.size * list_count
+        lists = [
+            {"id": list_id, "name": strings[name], "description": strings[description]}
+            for list_id, name, description in self.LIST.iter_unpack(view[offset:offset + size])
+        ]
+        offset += size
+
+        size = self.TODO.size * todo_count
+        records = self.TODO.iter_unpack(view[offset:offset + size])
+        offset += size
+        lengths, offset = self.read_lengths(view, offset, todo_count)
+        (text_size,) = self.SIZE.unpack_from(view, offset)
+        offset += self.SIZE.size
+        texts = str(view[offset:offset + text_size], "utf-8")
+        offset += text_size
+        archive_counts = None
+        if version >= 2:
+            (count,) = self.COUNT.unpack_from(view, offset)
+            offset += self.COUNT.size
+            if count != self.UNKNOWN:
+                size = self.ARCHIVE_COUNT.size * count
+                archive_counts = dict(self.ARCHIVE_COUNT.iter_unpack(view[offset:offset + size]))
+        todos = [
+            Todo(todo_id, texts[end - n:end], bool(done), shared_int(created), shared_int(deadline),
+                 shared_int(list_id))
+            for (todo_id, list_id, created, deadline, done), n, end in zip(records, lengths, accumulate(lengths))
+        ]
+        return {
+            "todos": todos,
+            "lists": lists,
+            "current_list_id": current_list_id,
+            "next_todo_id": next_todo_id,
+            "generation": generation,
+            "archive_generation": None if archive_generation < 0 else archive_generation,
+            "archive_counts": archive_counts
+        }
+
+    @staticmethod
+    def read_lengths(view, offset, count):
+        lengths = array("I")
+        lengths.frombytes(view[offset:offset + 4 * count])
+        if sys.byteorder != "little":
+            lengths.byteswap()
+        return lengths, offset + 4 * count
+
+    @staticmethod
+    def pack_lengths(values):
+        lengths = array("I", values)
+        if sys.byteorder != "little":
+            lengths.byteswap()
+        return lengths.tobytes()
+
+    def write_snapshot(self, snapshot):
+        todos = snapshot["todos"]
+        strings = []
+        for lst in snapshot["lists"]:
+            strings.extend((lst["name"], lst["description"]))
+        encoded = [text.encode("utf-8") for text in strings]
+        archive_generation = snapshot.get("archive_generation")
+        texts = [todo.text for todo in todos]
+        text_blob = "".join(texts).encode("utf-8")
+        parts = [
+            self.HEADER.pack(
+                self.MAGIC, self.VERSION, snapshot["generation"],
+                -1 if archive_generation is None else archive_generation,
+                snapshot["next_todo_id"], snapshot["current_list_id"] or 0,
+                len(strings), len(snapshot["lists"]), len(todos)
+            ),
+            self.pack_lengths(map(len, encoded)),
+            b"".join(encoded),
+            b"".join(
+                self.LIST.pack(lst["id"], 2 * idx, 2 * idx + 1) for idx, lst in enumerate(snapshot["lists"])
+            ),
+            b"".join(
+                self.TODO.pack(todo.id, todo.list_id, todo.created, todo.deadline, todo.done) for todo in todos
+            ),
+            self.pack_lengths(map(len, texts)),
+            self.SIZE.pack(len(text_blob)),
+            text_blob
+        ]
+        archive_counts = snapshot.get("archive_counts")
+        if archive_counts is None:
+            parts.append(self.COUNT.pack(self.UNKNOWN))
+        else:
+            parts.append(self.COUNT.pack(len(archive_counts)))
+            parts.extend(self.ARCHIVE_COUNT.pack(list_id, count) for list_id, count in archive_counts.items())
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.writelines(parts)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+
+class SqliteStorage:
+    """
+    Optionaler Speicher in einer SQLite-Datenbank neben SAVE_FILE.
+
+    Jede Operation wird sofort als kleine Transaktion geschrieben. Beim Start werden
+    nur offene To-Dos über den Index geladen, erledigte erst beim Öffnen der History.
+    """
+
+    lazy_done = True
+    sharded = False
+    lazy_counts = True
+
+    TODO_FIELDS = ("text", "done", "list_id")
+    TODO_QUERY = "SELECT id, text, done, created_at, deadline, list_id FROM todos "
+
+    def __init__(self, path, legacy_storage=None):
+        self.path = path
+        self.legacy_storage = legacy_storage   # JSON-Daten für die einmalige Migration
+        self.archive_counts = {}               # Leer: gezählt wird je Liste erst bei Bedarf (count_done)
+        # Erst hier importiert: spart der Kommandozeile (todo_cli.py) beim Start ~10 ms
+        import sqlite3
+        # Geschrieben wird im Schreib-Thread (StorageWriter), gelesen im GUI-Thread
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+                CREATE TABLE IF NOT EXISTS lists (
+                    id INTEGER PRIMARY KEY,
+                    position INTEGER NOT NULL,
+                    name TEXT NOT NULL,
+                    description TEXT NOT NULL DEFAULT ''
+                );
+                CREATE TABLE IF NOT EXISTS todos (
+                    id INTEGER PRIMARY KEY,
+                    list_id INTEGER NOT NULL,
+                    done INTEGER NOT NULL,
+                    deadline_ordinal INTEGER NOT NULL,
+                    text TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    deadline TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS todos_list_done_deadline
+                    ON todos (list_id, done, deadline_ordinal);
+                CREATE INDEX IF NOT EXISTS todos_done_deadline
+                    ON todos (done, deadline_ordinal);
+            """)
+
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def exists(self):
+        return self.get_meta("schema_version") is not None
+
+    def needs_migration(self):
+        return not self.exists() and self.legacy_storage is not None and self.legacy_storage.exists()
+
+    def load(self):
+        if not self.exists():
+            return None, []
+        lists = [
+            {"id": row[0], "name": row[1], "description": row[2]}
+            for row in self.conn.execute("SELECT id, name, description FROM lists ORDER BY position")
+        ]
+        todos = [self._todo(row) for row in self.conn.execute(self.TODO_QUERY + "WHERE done = 0 ORDER BY id")]
+        max_id = self.conn.execute("SELECT MAX(id) FROM todos").fetchone()[0] or 0
+        data = {
+            "todos": todos,
+            "lists": lists,
+            "current_list_id": self.get_meta("current_list_id"),
+            "next_todo_id": max_id + 1
+        }
+        return data, []
+
+    def count_done(self, list_id):
+        """
+        Erledigte To-Dos einer Liste in der Datenbank – über den Index (list_id, done, ...), ohne
+        die Tabelle zu lesen. Beim Start alle Listen zu zählen, hieße jedes erledigte To-Do anfassen.
+        """
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM todos WHERE list_id = ? AND done = 1", (list_id,)
+        ).fetchone()[0]
+
+    def iter_done(self, batch_size):
+        """Erledigte To-Dos stückweise nachladen (Index (done, deadline_ordinal), nach Deadline sortiert)."""
+        cursor = self.conn.execute(self.TODO_QUERY + "WHERE done = 1 ORDER BY deadline_ordinal, id")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield [self._todo(row) for row in rows]
+
+    @staticmethod
+    def _todo(row):
+        return Todo(row[0], row[1], bool(row[2]), deadline_ordinal(row[3]), deadline_ordinal(row[4]),
+                    shared_int(row[5]))
+
+    def _insert_todos(self, todos):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO todos (id, list_id, done, deadline_ordinal, text, created_at, deadline) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (t.id, t.list_id, int(t.done), t.deadline, t.text, t.created_text, t.deadline_text)
+                for t in map(as_todo, todos)
+            ]
+        )
+
+    def _insert_list(self, position, lst):
+        self.conn.execute("UPDATE lists SET position = position + 1 WHERE position >= ?", (position,))
+        self.conn.execute(
+            "INSERT INTO lists (id, position, name, description) VALUES (?, ?, ?, ?)",
+            (lst["id"], position, lst["name"], lst["description"])
+        )
+
+    def append_many(self, ops):
+        """Schreibt ein Bündel von Operationen als eine Transaktion."""
+        with self.conn:
+            for op in ops:
+                self._write_op(op)
+
+    def _write_op(self, op):
+        """Übersetzt eine Operation in SQL."""
+        kind = op[0]
+        if kind == "insert":
+            self._insert_todos([op[1]])
+        elif kind == "remove":
+            self.conn.execute("DELETE FROM todos WHERE id = ?", (op[1],))
+        elif kind == "insert_many":
+            self._insert_todos(op[1])
+        elif kind == "remove_many":
+            self.conn.executemany("DELETE FROM todos WHERE id = ?", [(todo_id,) for todo_id in op[1]])
+        elif kind == "set":
+            _, todo_id, field, value = op
+            if field == "deadline":
+                self.conn.execute(
+                    "UPDATE todos SET deadline = ?, deadline_ordinal = ? WHERE id = ?",
+                    (format_ordinal(value), value, todo_id)
+                )
+            elif field in self.TODO_FIELDS:
+                self.conn.execute(f"UPDATE todos SET {field} = ? WHERE id = ?", (value, todo_id))
+            else:
+                raise ValueError(f"Unbekanntes Feld: {field}")
+        elif kind == "insert_list":
+            _, position, lst = op
+            self._insert_list(position, lst)
+        elif kind == "set_list":
+            _, list_id, field, value = op
+            if field not in ("name", "description"):
+                raise ValueError(f"Unbekanntes Feld: {field}")
+            self.conn.execute(f"UPDATE lists SET {field} = ? WHERE id = ?", (value, list_id))
+        elif kind == "delete_list":
+            list_id = op[1]
+            row = self.conn.execute("SELECT position FROM lists WHERE id = ?", (list_id,)).fetchone()
+            self.conn.execute("DELETE FROM todos WHERE list_id = ?", (list_id,))
+            self.conn.execute("DELETE FROM lists WHERE id = ?", (list_id,))
+            if row:
+                self.conn.execute("UPDATE lists SET position = position - 1 WHERE position > ?", (row[0],))
+        elif kind == "restore_list":
+            _, position, lst, todos = op
+            self._insert_list(position, lst)
+            self._insert_todos(todos)
+        elif kind == "current_list":
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('current_list_id', ?)", (op[1],))
+        else:
+            raise ValueError(f"Unbekannte Operation: {kind}")
+
+    def needs_compaction(self):
+        return False
+
+    def save(self, data):
+        """
+        Kompletten Datenstand übernehmen (Erstbefüllung bzw. Migration aus JSON).
+        Ohne data["archive"] bleiben die erledigten To-Dos in der Datenbank unverändert.
+        """
+        archive = data.get("archive")
+        with self.conn:
+            if archive is None:
+                self.conn.execute("DELETE FROM todos WHERE done = 0")
+            else:
+                self.conn.execute("DELETE FROM todos")
+            self.conn.execute("DELETE FROM lists")
+            self.conn.executemany(
+                "INSERT INTO lists (id, position, name, description) VALUES (?, ?, ?, ?)",
+                [(lst["id"], pos, lst["name"], lst["description"]) for pos, lst in enumerate(data["lists"])]
+            )
+            self._insert_todos(data["todos"] + (archive or []))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [("current_list_id", data["current_list_id"]), ("schema_version", 1)]
+            )
+
+    def close(self):
+        self.conn.close()
+
+
+class ShardedStorage:
+    """
+    Optionaler Speicher mit einer Datei pro Liste statt eines großen Snapshots (Verzeichnis SHARD_DIR):
+      manifest.json                  Listen, current_list_id, next_todo_id, Generation und je Liste
+                                     die aktuellen Segmente (Generation, Anzahl To-Dos)
+      list-<id>.open.<n>.jsonl       offene To-Dos der Liste, nach Deadline sortiert
+      list-<id>.done.<n>.jsonl       erledigte To-Dos der Liste, nach Deadline sortiert
+      journal                        Änderungen seit dem Manifest (wie bei JsonStorage)
+
+    Beim Speichern kommen nur die geänderten Segmente (TodoStore.dirty_shards) neu hinzu, unter
+    der neuen Generation; danach wird das Manifest atomar ersetzt und nicht mehr verwendete
+    Dateien werden gelöscht. Die Kosten hängen also von den bearbeiteten Listen ab, eine
+    gelöschte Liste ist nur noch ein unlink. Ein Absturz vor dem Manifest lässt den alten Stand
+    gültig. Erledigte To-Dos werden erst beim Öffnen der History gelesen – oder nur das Segment
+    einer Liste, wenn es neu geschrieben oder die Liste gelöscht wird.
+    """
+
+    lazy_done = True
+    sharded = True
+    lazy_counts = False
+
+    def __init__(self, directory, legacy_storage=None):
+        self.path = directory
+        self.manifest_path = os.path.join(directory, "manifest.json")
+        self.journal = Journal(os.path.join(directory, "journal"), 0)
+        self.legacy_storage = legacy_storage   # JSON-Daten für die einmalige Migration
+        self.shards = {}                       # (list_id, erledigt) -> (Generation, Anzahl) laut Manifest
+        self.archive_counts = {}               # Erledigte To-Dos je Liste (für die Listen-Statistik)
+        os.makedirs(directory, exist_ok=True)
+
+    def shard_path(self, list_id, done, generation):
+        return os.path.join(self.path, f"list-{list_id}.{'done' if done else 'open'}.{generation}.jsonl")
+
+    def exists(self):
+        return os.path.exists(self.manifest_path) or os.path.exists(self.journal.path)
+
+    def needs_migration(self):
+        return not self.exists() and self.legacy_storage is not None and self.legacy_storage.exists()
+
+    def load(self):
+        """Manifest und offene Segmente lesen; liefert (Daten oder None, Operationen aus dem Journal)."""
+        data = None
+        self.shards = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for shard in data.pop("shards", []):
+                self.shards[(shard["list_id"], shard["done"])] = (shard["generation"], shard["count"])
+            data["todos"] = [
+                todo for lst in data.get("lists", []) for todo in self.read_segment(lst["id"], False)
+            ]
+        self.journal.generation = data.get("generation", 0) if data else 0
+        self.archive_counts = {list_id: count for (list_id, done), (_, count) in self.shards.items() if done}
+        return data, self.journal.replay()
+
+    def read_segment(self, list_id, done):
+        """Alle To-Dos eines Segments als dicts (leer, wenn die Liste keins hat)."""
+        if (list_id, done) not in self.shards:
+            return []
+        with open(self.shard_path(list_id, done, self.shards[(list_id, done)][0]), "r", encoding="utf-8") as f:
+            lines = f.read().rstrip("\n")
+        # Ein Parser-Aufruf pro Datei statt pro Zeile (Zeilenumbrüche in Texten sind in JSON maskiert)
+        return json.loads("[" + lines.replace("\n", ",") + "]")
+
+    def stream_segment(self, list_id, done):
+        """To-Dos eines Segments nacheinander (für das stückweise Nachladen der History)."""
+        if (list_id, done) not in self.shards:
+            return
+        with open(self.shard_path(list_id, done, self.shards[(list_id, done)][0]), "r", encoding="utf-8") as f:
+            for line in f:
+                yield Todo.from_dict(json.loads(line))
+
+    def iter_done(self, batch_size):
+        """Erledigte To-Dos aller Listen in Stücken – die sortierten Segmente werden nur zusammengeführt."""
+        segments = [self.stream_segment(list_id, True) for (list_id, done) in self.shards if done]
+        batch = []
+        for todo in merge(*segments, key=sort_key):
+            batch.append(todo)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def append_many(self, ops):
+        for op in ops:
+            self.journal.append(op)
+        self.journal.sync()
+
+    def needs_compaction(self):
+        return self.journal.count >= COMPACT_THRESHOLD
+
+    def save(self, data):
+        """
+        Geänderte Segmente (data["shards"]: (list_id, erledigt) -> To-Dos) schreiben, dann Manifest
+        und Journal erneuern. Segmente gelöschter Listen fallen weg.
+        """
+        generation = self.journal.generation + 1
+        list_ids = {lst["id"] for lst in data["lists"]}
+        shards = {key: value for key, value in self.shards.items() if key[0] in list_ids}
+        for (list_id, done), todos in data["shards"].items():
+            if todos:
+                write_lines(self.shard_path(list_id, done, generation), todos)
+                shards[(list_id, done)] = (generation, len(todos))
+            else:
+                shards.pop((list_id, done), None)
+        manifest = {
+            "generation": generation,
+            "lists": data["lists"],
+            "current_list_id": data["current_list_id"],
+            "next_todo_id": data["next_todo_id"],
+            "shards": [
+                {"list_id": list_id, "done": done, "generation": shard_generation, "count": count}
+                for (list_id, done), (shard_generation, count) in shards.items()
+            ]
+        }
+        write_snapshot(self.manifest_path, manifest)
+        self.journal.reset(generation)
+        self.shards = shards
+        self.archive_counts = {list_id: count for (list_id, done), (_, count) in shards.items() if done}
+        # Alte Generationen, gelöschte Listen und Reste eines abgebrochenen Speicherns entfernen
+        used = {os.path.basename(self.shard_path(list_id, done, shard_generation))
+                for (list_id, done), (shard_generation, _) in shards.items()}
+        for name in os.listdir(self.path):
+            if name.startswith("list-") and name not in used:
+                try:
+                    os.remove(os.path.join(self.path, name))
+                except OSError:
+                    pass
+
+    def close(self):
+        self.journal.close()
+
+
+def open_storage(kind="json"):
+    """Speicher-Backend wie in der App ("json", "binary", "sqlite" oder "shards"); übernimmt vorhandene JSON-Daten."""
+    if kind == "shards":
+        return ShardedStorage(SHARD_DIR, legacy_storage=JsonStorage(SAVE_FILE, JOURNAL_FILE))
+    if kind == "sqlite":
+        return SqliteStorage(SQLITE_FILE, legacy_storage=JsonStorage(SAVE_FILE, JOURNAL_FILE))
+    if kind == "binary":
+        return BinaryStorage(BINARY_FILE, BINARY_JOURNAL_FILE, legacy_storage=JsonStorage(SAVE_FILE, JOURNAL_FILE))
+    return JsonStorage(SAVE_FILE, JOURNAL_FILE)
+
+
+class StorageLock:
+    """
+    Exklusive Sperre auf LOCK_FILE, damit App und Kommandozeile (todo_cli.py) nie gleichzeitig
+    dieselben Daten schreiben. Die Sperre hält das Betriebssystem – nach einem Absturz ist sie frei.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or LOCK_FILE
+        self.file = None
+
+    def acquire(self, timeout=0.0):
+        """Sperre holen, höchstens timeout Sekunden warten. Liefert False, wenn sie belegt bleibt."""
+        self.file = open(self.path, "a+")
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if fcntl:
+                    fcntl.flock(self.file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    self.file.seek(0)
+                    msvcrt.locking(self.file.fileno(), msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if time.monotonic() >= deadline:
+                    self.file.close()
+                    self.file = None
+                    return False
+                time.sleep(0.05)
+
+    def release(self):
+        if self.file is None:
+            return
+        if fcntl:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        else:
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        self.file.close()
+        self.file = None
+
+
+class StorageWriter:
+    """
+    Schreib-Thread für ein Speicher-Backend, damit die GUI nie auf die Platte wartet.
+
+    Operationen und Snapshots (unveränderliche Kopien) landen in einer Queue. Der Thread
+    sammelt nach dem ersten Eintrag AUTOSAVE_DELAY Sekunden lang weitere ein und schreibt
+    das Bündel dann in einem Rutsch (Journal: ein fsync pro Bündel). Bei einem Absturz
+    gehen also höchstens die Änderungen dieses Zeitfensters verloren.
+    """
+
+    def __init__(self, storage, delay=AUTOSAVE_DELAY):
+        self.storage = storage
+        self.delay = delay
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.run, name="todo-writer", daemon=True)
+        self.thread.start()
+
+    def append(self, op):
+        self.queue.put(("append", op))
+
+    def save(self, data):
+        self.queue.put(("save", data))
+
+    def flush(self):
+        """Wartet, bis alles Ausstehende geschrieben ist (ohne das Zeitfenster abzuwarten)."""
+        done = threading.Event()
+        self.queue.put(("flush", done))
+        done.wait()
+
+    def close(self):
+        self.queue.put(("close", None))
+        self.thread.join()
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.delay
+            # Weitere Änderungen einsammeln; flush/close schreiben sofort
+            while batch[-1][0] not in ("flush", "close"):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self.write(batch)
+            if batch[-1][0] == "close":
+                return
+
+    def write(self, batch):
+        ops = []
+        for kind, payload in batch:
+            if kind == "append":
+                ops.append(payload)
+                continue
+            self.write_ops(ops)
+            ops = []
+            if kind == "save":
+                try:
+                    self.storage.save(payload)
+                except Exception as e:
+                    print("Fehler beim Speichern:", e)
+            elif kind == "flush":
+                payload.set()
+        self.write_ops(ops)
+
+    def write_ops(self, ops):
+        if not ops:
+            return
+        try:
+            self.storage.append_many(ops)
+        except Exception as e:
+            print("Fehler beim Schreiben:", e)
+
+
+class Profiler:
+    """
+    Optionale Laufzeitmessung für einzelne Methoden (--profile).
+
+    instrument() ersetzt die Methoden nur auf dem jeweiligen Objekt durch eine messende
+    Hülle – ohne Profiler bleibt der Code unverändert und kostet nichts. Die Messwerte
+    (Dauer, Anzahl Einträge) liegen in einem Ringpuffer und lassen sich als JSON-Zeilen
+    ausgeben.
+    """
+
+    def __init__(self, path=PROFILE_FILE, size=PROFILE_SAMPLES):
+        self.path = path
+        self.samples = deque(maxlen=size)
+
+    def instrument(self, obj, counters):
+        """
+        counters: Methodenname -> Funktion (obj, Rückgabewert) -> Anzahl bearbeiteter Einträge.
+        Muss vor dem Verteilen der Methoden (bind/command) aufgerufen werden.
+        """
+        for name, count in counters.items():
+            setattr(obj, name, self.wrap(name, getattr(obj, name), obj, count))
+
+    def wrap(self, name, method, obj, count):
+        samples = self.samples
+        clock = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = clock()
+            result = method(*args, **kwargs)
+            samples.append((name, clock() - start, count(obj, result), time.time()))
+            return result
+        return timed
+
+    def summary(self):
+        """Je Methode: Anzahl Aufrufe sowie p50/p90/p99/max in ms."""
+        durations = {}
+        for name, seconds, _, _ in self.samples:
+            durations.setdefault(name, []).append(seconds * 1000)
+        result = {}
+        for name, values in durations.items():
+            values.sort()
+            result[name] = {"calls": len(values), "max_ms": values[-1]}
+            for p in (50, 90, 99):
+                result[name][f"p{p}_ms"] = values[min(len(values) - 1, len(values) * p // 100)]
+        return result
+
+    def dump(self):
+        """Messwerte und Zusammenfassung an PROFILE_FILE anhängen (eine JSON-Zeile pro Eintrag)."""
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                for name, seconds, count, timestamp in self.samples:
+                    f.write(json.dumps({"type": "sample", "name": name, "ms": round(seconds * 1000, 3),
+                                        "count": count, "time": timestamp}) + "\n")
+                for name, stats in self.summary().items():
+                    f.write(json.dumps({"type": "summary", "name": name, **stats}) + "\n")
+            self.samples.clear()
+        except Exception as e:
+            print("Fehler beim Schreiben der Messwerte:", e)
+
+
+class TodoStore:
+    """Alle To-Dos und Listen samt Indizes, Undo-Journal und Speicher-Backend."""
+
+    remote = False                     # True bei RemoteTodoStore (Client von todo_server.py)
+
+    def __init__(self, storage=None):
+        self.todos = {}                # id -> Todo
+        # Index: (list_id, done) -> TodoBucket, nach Deadline sortiert.
+        # Erledigte To-Dos stehen zusätzlich in (ALL_LISTS, True) für die History "Alle".
+        self.buckets = {}
+        self.next_todo_id = 1
+        self.history = deque(maxlen=UNDO_LIMIT)  # Inverse Operationen für Undo (für alle Listen)
+        self.storage = storage or JsonStorage(SAVE_FILE, JOURNAL_FILE)
+        self.writer = StorageWriter(self.storage)
+        self.done_loaded = True        # False, solange erledigte To-Dos noch nicht (vollständig) geladen sind
+        self.done_loader = None        # Laufendes stückweises Nachladen (Generator) oder None
+        self.done_source = self.storage  # Speicher, aus dem erledigte To-Dos nachgeladen werden
+        self.archive_dirty = False     # Erledigte To-Dos seit dem letzten Speichern geändert
+        self.dirty_shards = set()      # Seit dem letzten Speichern geänderte (list_id, erledigt) – für ShardedStorage
+        self.search_index = None       # SearchIndex, wird ab der ersten Suche aufgebaut
+        self.search_pending = []       # Noch nicht in den Suchindex aufgenommene To-Dos
+        self.due_queue = DueQueue()    # Offene To-Dos nach Deadline (Erinnerungen)
+        self.unloaded_done = {}        # Noch nicht geladene erledigte To-Dos je Liste (None = unbekannt, siehe unloaded_done_count)
+        self.done_lists_loaded = set() # Listen, deren erledigte To-Dos einzeln komplett geladen wurden (load_done_list)
+
+        # Listen-Verwaltung (Default-Liste)
+        self.lists = []
+        self.next_list_id = 1
+        default_list = {"id": self.next_list_id, "name": "Standard", "description": ""}
+        self.next_list_id += 1
+        self.lists.append(default_list)
+        self.current_list_id = default_list["id"]
+        self.list_by_id = {}           # Hash-Index: id -> Liste
+        self.list_id_by_name = {}      # Hash-Index: Name -> id (erste Liste mit diesem Namen)
+        self.rebuild_list_index()
+
+    # --- Indizes ---
+
+    def get_bucket(self, list_id, done):
+        key = (list_id, done)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = TodoBucket()
+        return bucket
+
+    def view_bucket(self, list_id, done):
+        """Nach Deadline sortierte To-Dos einer Liste (ALL_LISTS = alle) – ohne Scan oder Sortierung."""
+        return self.buckets.get((list_id, done), EMPTY_BUCKET)
+
+    def index_todo(self, todo):
+        self.get_bucket(todo.list_id, todo.done).add(todo)
+        self.dirty_shards.add((todo.list_id, todo.done))
+        self.due_queue.add(todo, self.todos)
+        if todo.done:
+            self.get_bucket(ALL_LISTS, True).add(todo)
+            self.archive_dirty = True
+
+    def unindex_todo(self, todo):
+        self.buckets[(todo.list_id, todo.done)].remove(todo)
+        self.dirty_shards.add((todo.list_id, todo.done))
+        if todo.done:
+            self.buckets[(ALL_LISTS, True)].remove(todo)
+            self.archive_dirty = True
+
+    def mark_dirty(self, todos):
+        self.dirty_shards.update((todo.list_id, todo.done) for todo in todos)
+
+    def add_todos(self, todos):
+        """Viele To-Dos auf einmal aufnehmen (Laden, Liste wiederherstellen)."""
+        groups = {}
+        for todo in todos:
+            self.todos[todo.id] = todo
+            groups.setdefault((todo.list_id, todo.done), []).append(todo)
+            if todo.done:
+                groups.setdefault((ALL_LISTS, True), []).append(todo)
+        for (list_id, done), group in groups.items():
+            self.get_bucket(list_id, done).add_many(group)
+        self.due_queue.add_many(todos)
+
+    def list_index(self, list_id):
+        return self.lists.index(self.list_by_id[list_id])
+
+    def rebuild_list_index(self):
+        """Hash-Indizes für Listen neu aufbauen (nur bei Listenänderungen, O(Listen))."""
+        self.list_by_id = {lst["id"]: lst for lst in self.lists}
+        self.list_id_by_name = {}
+        for lst in self.lists:
+            self.list_id_by_name.setdefault(lst["name"], lst["id"])
+
+    # --- Operationen ---
+
+    def apply_op(self, op):
+        """
+        Wendet eine Operation auf die Daten an und liefert die inverse Operation zurück.
+        Mögliche Operationen:
+          ("insert", todo)                          – To-Do einfügen (Position ergibt sich aus der id)
+          ("remove", todo_id)                       – To-Do entfernen
+          ("insert_many", [todo, ...])              – viele To-Dos einfügen (Import)
+          ("remove_many", [todo_id, ...])           – viele To-Dos entfernen
+          ("set", todo_id, feld, wert)              – Feld eines To-Dos setzen (deadline als Tagesnummer)
+          ("insert_list", idx, liste)               – Liste an Position einfügen
+          ("set_list", list_id, feld, wert)         – Feld einer Liste setzen
+          ("delete_list", list_id)                  – Liste samt ihrer To-Dos löschen
+          ("restore_list", idx, liste, [todo, ...]) – gelöschte Liste samt To-Dos zurückholen
+          ("current_list", list_id)                 – aktuelle Liste wechseln
+        """
+        kind = op[0]
+        if kind in ("remove", "set") and op[1] not in self.todos:
+            # Betrifft ein archiviertes To-Do (z.B. beim Abspielen des Journals)
+            self.ensure_done_loaded()
+        if kind == "remove_many" and not all(todo_id in self.todos for todo_id in op[1]):
+            self.ensure_done_loaded()
+        if kind == "insert":
+            todo = as_todo(op[1])
+            self.todos[todo.id] = todo
+            self.index_todo(todo)
+            if self.search_index is not None:
+                self.search_index.add(todo)
+            return ("remove", todo.id)
+        if kind == "remove":
+            todo = self.todos.pop(op[1])
+            self.unindex_todo(todo)
+            if self.search_index is not None:
+                self.search_index.remove(todo)
+            return ("insert", todo)
+        if kind == "insert_many":
+            todos = [as_todo(todo) for todo in op[1]]
+            # Ein Sortierlauf je Bucket statt einer Einfügung pro To-Do
+            self.add_todos(todos)
+            self.mark_dirty(todos)
+            if self.search_index is not None:
+                for todo in todos:
+                    self.search_index.add(todo)
+            if any(todo.done for todo in todos):
+                self.archive_dirty = True
+            return ("remove_many", [todo.id for todo in todos])
+        if kind == "remove_many":
+            todo_ids = set(op[1])
+            removed = [self.todos.pop(todo_id) for todo_id in op[1]]
+            keys = {(todo.list_id, todo.done) for todo in removed}
+            if any(todo.done for todo in removed):
+                keys.add((ALL_LISTS, True))
+                self.archive_dirty = True
+            for key in keys:
+                self.buckets[key].remove_ids(todo_ids)
+            self.dirty_shards.update(keys)
+            if self.search_index is not None:
+                for todo in removed:
+                    self.search_index.remove(todo)
+            return ("insert_many", removed)
+        if kind == "set":
+            _, todo_id, field, value = op
+            todo = self.todos[todo_id]
+            old_value = getattr(todo, field)
+            search_index = self.search_index if field == "text" else None
+            if search_index is not None:
+                search_index.remove(todo)
+            # Umsortieren: aus dem alten Bucket nehmen, im neuen einfügen (O(log k))
+            self.unindex_todo(todo)
+            setattr(todo, field, value)
+            self.index_todo(todo)
+            if search_index is not None:
+                search_index.add(todo)
+            return ("set", todo_id, field, old_value)
+        if kind == "insert_list":
+            _, idx, lst = op
+            self.lists.insert(idx, lst)
+            self.rebuild_list_index()
+            return ("delete_list", lst["id"])
+        if kind == "set_list":
+            _, list_id, field, value = op
+            lst = self.lists[self.list_index(list_id)]
+            old_value = lst[field]
+            lst[field] = value
+            self.rebuild_list_index()
+            return ("set_list", list_id, field, old_value)
+        if kind == "delete_list":
+            list_id = op[1]
+            # Auch archivierte To-Dos der Liste werden gelöscht und für Undo mitgesichert
+            self.load_done_list(list_id)
+            idx = self.list_index(list_id)
+            lst = self.lists.pop(idx)
+            self.rebuild_list_index()
+            # Die Buckets der Liste werden als Ganzes verworfen
+            removed = []
+            for done in (False, True):
+                removed.extend(self.buckets.pop((list_id, done), EMPTY_BUCKET))
+            for todo in removed:
+                del self.todos[todo.id]
+                if self.search_index is not None:
+                    self.search_index.remove(todo)
+            if any(todo.done for todo in removed):
+                self.buckets[(ALL_LISTS, True)].remove_list(list_id)
+                self.archive_dirty = True
+            return ("restore_list", idx, lst, removed)
+        if kind == "restore_list":
+            _, idx, lst, removed = op
+            self.lists.insert(idx, lst)
+            self.rebuild_list_index()
+            todos = [as_todo(todo) for todo in removed]
+            self.add_todos(todos)
+            self.mark_dirty(todos)
+            if self.search_index is not None:
+                for todo in todos:
+                    self.search_index.add(todo)
+            if any(todo.done for todo in todos):
+                self.archive_dirty = True
+            return ("delete_list", lst["id"])
+        if kind == "current_list":
+            old_value = self.current_list_id
+            self.current_list_id = op[1]
+            return ("current_list", old_value)
+        raise ValueError(f"Unbekannte Operation: {kind}")
+
+    def perform(self, op):
+        """
+        Operation anwenden und zum Schreiben an den Schreib-Thread geben (O(1) pro Änderung).
+        ("batch", [op, ...]) wendet mehrere Operationen an; die inverse Operation ist wieder
+        ein einzelnes "batch" (ein Undo-Schritt). Ins Journal kommen die Einzeloperationen.
+        """
+        if op[0] == "batch":
+            return ("batch", [self.perform(sub_op) for sub_op in op[1]][::-1])
+        inverse_op = self.apply_op(op)
+        self.writer.append(frozen_op(op))
+        return inverse_op
+
+    def set_current_list(self, list_id):
+        if list_id != self.current_list_id:
+            self.perform(("current_list", list_id))
+
+    def new_todo_id(self):
+        todo_id = self.next_todo_id
+        self.next_todo_id += 1
+        return todo_id
+
+    # --- Speicherfunktionen ---
+
+    def save_data(self):
+        """
+        Schreibt den kompletten Datenstand (Listen, Todos, aktuelle Liste) in den Speicher.
+        Beim JSON-Speicher ist das die Kompaktierung von Snapshot + Journal.
+        Erledigte To-Dos (Archiv) werden nur mitgeschrieben, wenn sie sich geändert haben.
+        Hier wird nur eine Kopie als Tupel erstellt; serialisiert wird im Schreib-Thread.
+        """
+        if self.storage.sharded:
+            self.save_shards()
+            return
+        archive = None
+        if self.archive_dirty:
+            self.ensure_done_loaded()
+            # Bucket "Alle" ist nach Deadline sortiert – das Archiv kann so stückweise angezeigt werden
+            archive = [todo_record(todo) for todo in self.view_bucket(ALL_LISTS, True)]
+        data = {
+            "todos": [todo_record(todo) for todo in self.todos.values() if not todo.done],
+            "archive": archive,
+            "lists": [dict(lst) for lst in self.lists],
+            "current_list_id": self.current_list_id,
+            "next_todo_id": self.next_todo_id
+        }
+        self.writer.save(data)
+        self.archive_dirty = False
+
+    def save_shards(self):
+        """
+        save_data für ShardedStorage: nur die seit dem letzten Speichern geänderten Segmente
+        (Liste + offen/erledigt) plus das kleine Manifest – unabhängig von der Gesamtmenge.
+        """
+        dirty = {key for key in self.dirty_shards if key[0] in self.list_by_id}
+        for list_id, done in dirty:
+            if done:
+                # Ein erledigt-Segment wird komplett neu geschrieben – dafür reicht dieses eine
+                self.load_done_list(list_id)
+        data = {
+            "shards": {key: [todo_record(todo) for todo in self.view_bucket(*key)] for key in dirty},
+            "lists": [dict(lst) for lst in self.lists],
+            "current_list_id": self.current_list_id,
+            "next_todo_id": self.next_todo_id
+        }
+        self.writer.save(data)
+        self.dirty_shards = set()
+        self.archive_dirty = False
+
+    def load_data(self):
+        """Lädt die gespeicherten Daten; beim ersten Start mit SQLite werden die JSON-Daten übernommen."""
+        if self.storage.needs_migration():
+            self.load_from(self.storage.legacy_storage)
+            self.ensure_done_loaded()
+            self.storage.legacy_storage.close()
+            self.done_source = self.storage
+            self.archive_dirty = True
+            self.mark_dirty(self.todos.values())
+            self.save_data()
+            return
+        self.load_from(self.storage)
+        if not self.storage.exists():
+            # Neuer Speicher: Startzustand (Default-Liste) festhalten
+            self.save_data()
+        elif self.storage.needs_compaction():
+            self.save_data()
+
+    def load_from(self, storage):
+        """Snapshot laden und die Operationen aus dem Journal darauf abspielen."""
+        ops = []
+        todos = []
+        try:
+            data, ops = storage.load()
+            if data:
+                todos = data.get("todos", [])
+                loaded_lists = data.get("lists")
+                if loaded_lists:
+                    self.lists = loaded_lists
+                    self.rebuild_list_index()
+                self.current_list_id = data.get("current_list_id") or self.current_list_id
+                self.next_todo_id = data.get("next_todo_id", 1)
+        except UnsupportedVersionError:
+            # Nicht leer weitermachen: Journal und Snapshot bleiben unangetastet
+            raise
+        except Exception as e:
+            print("Fehler beim Laden:", e)
+
+        # Ältere Dateien ohne ids: fortlaufend in bisheriger Reihenfolge vergeben
+        if todos and isinstance(todos[0], dict) and "id" not in todos[0]:
+            for todo_id, todo in enumerate(todos, start=1):
+                todo["id"] = todo_id
+        todos = [
+            todo if isinstance(todo, Todo) else Todo.from_dict(todo, self.current_list_id)
+            for todo in todos
+        ]
+        self.todos = {}
+        self.buckets = {}
+        self.search_index = None
+        self.search_pending = []
+        self.due_queue = DueQueue()
+        self.add_todos(todos)
+        if todos:
+            self.next_todo_id = max(self.next_todo_id, max(self.todos) + 1)
+        self.done_loaded = not storage.lazy_done
+        self.done_loader = None
+        self.done_source = storage
+        # Erledigte To-Dos je Liste im Archiv – für die Listen-Statistik, bevor die History geladen ist
+        counts = {} if self.done_loaded else storage.archive_counts
+        self.unloaded_done = None if counts is None else dict(counts)
+        self.done_lists_loaded = set()
+        # Erledigte To-Dos aus einer älteren Datei müssen ins Archiv
+        self.archive_dirty = any(todo.done for todo in todos)
+        # Geladen = gespeichert; nur die Operationen aus dem Journal machen Segmente wieder "dirty"
+        self.dirty_shards = set()
+
+        try:
+            for op in ops:
+                self.apply_op(op)
+                if op[0] == "insert":
+                    self.next_todo_id = max(self.next_todo_id, op[1]["id"] + 1)
+                elif op[0] == "insert_many" and op[1]:
+                    self.next_todo_id = max(self.next_todo_id, max(todo["id"] for todo in op[1]) + 1)
+        except Exception as e:
+            print("Fehler beim Einlesen des Journals:", e)
+            # Bereits angewendete Operationen sichern, bevor das Journal neu beginnt
+            self.save_data()
+
+        # next_list_id nach geladenen Daten anpassen
+        self.next_list_id = max((lst.get("id", 0) for lst in self.lists), default=0) + 1
+
+    def load_more_done(self, batch_size=HISTORY_BATCH):
+        """
+        Nächstes Stück erledigter To-Dos nachladen (die GUI ruft das schrittweise auf).
+        Liefert False, sobald alles geladen ist.
+        """
+        if self.done_loaded:
+            return False
+        try:
+            if self.done_loader is None:
+                # Ausstehende Schreibvorgänge abwarten (z.B. ein gerade ersetztes Archiv)
+                self.writer.flush()
+                self.done_loader = self.done_source.iter_done(batch_size)
+            batch = next(self.done_loader, None)
+        except Exception as e:
+            print("Fehler beim Laden der History:", e)
+            batch = None
+        if batch is None:
+            self.done_loaded = True
+            self.done_loader = None
+            self.unloaded_done = {}
+            return False
+        self.add_loaded_done([as_todo(todo) for todo in batch])
+        return True
+
+    def add_loaded_done(self, done):
+        """Nachgeladene erledigte To-Dos aufnehmen."""
+        # In dieser Sitzung erledigte To-Dos sind bereits im Speicher, einzeln geladene Listen komplett
+        new = [todo for todo in done if todo.id not in self.todos and todo.list_id not in self.done_lists_loaded]
+        self.add_todos(new)
+        if self.search_index is not None:
+            for todo in new:
+                self.search_index.add(todo)
+        if self.unloaded_done:
+            for todo in new:
+                if self.unloaded_done.get(todo.list_id):
+                    self.unloaded_done[todo.list_id] -= 1
+        if done:
+            self.next_todo_id = max(self.next_todo_id, max(todo.id for todo in done) + 1)
+
+    def ensure_done_loaded(self):
+        """Alle (restlichen) erledigten To-Dos nachladen, falls der Speicher sie erst bei Bedarf liefert."""
+        while self.load_more_done():
+            pass
+
+    def load_done_list(self, list_id):
+        """
+        Erledigte To-Dos einer Liste vollständig laden – genug, um ihr Segment neu zu schreiben
+        oder die Liste samt Undo zu löschen. Mit ShardedStorage wird nur ihr Segment gelesen,
+        sonst (oder wenn die History schon nachlädt) wie bisher alles.
+        """
+        if self.done_loaded or list_id in self.done_lists_loaded:
+            return
+        if not self.storage.sharded or self.done_loader is not None:
+            # Ein halb gelesener Gesamtstrom könnte sonst gelöschte To-Dos zurückbringen
+            self.ensure_done_loaded()
+            return
+        try:
+            done = [as_todo(todo) for todo in self.done_source.read_segment(list_id, True)]
+        except Exception as e:
+            print("Fehler beim Laden der History:", e)
+            self.ensure_done_loaded()
+            return
+        self.add_loaded_done(done)
+        # Ab jetzt überspringt load_more_done diese Liste
+        self.done_lists_loaded.add(list_id)
+        if self.unloaded_done:
+            self.unloaded_done[list_id] = 0
+
+    def close_data(self):
+        """Beim Beenden: ausstehende Änderungen noch schreiben, dann schließen."""
+        self.writer.close()
+        self.storage.close()
+
+    # --- Abfragen ---
+
+    def get_list_name(self, list_id):
+        lst = self.list_by_id.get(list_id)
+        return lst["name"] if lst else "Unbekannt"
+
+    def get_list_id_by_name(self, name):
+        return self.list_id_by_name.get(name)
+
+    def open_todos(self, list_id):
+        """Offene To-Dos einer Liste, nach Deadline sortiert."""
+        return self.view_bucket(list_id, False)
+
+    def query(self, list_id=None, states=(False,), due_before=None):
+        """
+        To-Dos nach Deadline sortiert (Generator), optional nur einer Liste (None = alle) und nur
+        mit Deadline vor due_before (Tagesnummer). states: (False,) offene, (True,) erledigte,
+        (False, True) beide. Die Buckets sind schon sortiert – O(log n) je Bucket plus Ausgabe.
+        """
+        if True in states:
+            self.ensure_done_loaded()
+        buckets = []
+        for done in states:
+            if list_id is not None:
+                buckets.append(self.view_bucket(list_id, done))
+            elif done:
+                buckets.append(self.view_bucket(ALL_LISTS, True))
+            else:
+                buckets.extend(self.view_bucket(lst["id"], False) for lst in self.lists)
+        ranges = []
+        for bucket in buckets:
+            end = bucket.first_row_from(due_before) if due_before is not None else len(bucket)
+            ranges.append(islice(bucket, end))
+        return merge(*ranges, key=sort_key)
+
+    def search(self, query, limit=None, complete=True):
+        """
+        Volltextsuche über alle Listen, offene und erledigte To-Dos (SearchResult, neueste zuerst,
+        höchstens limit Zeilen). Der Index wird ab dem ersten Aufruf aufgebaut und danach bei
+        jeder Änderung mitgeführt. complete=False sucht nur im bisher aufgebauten Teil – die GUI
+        baut ihn mit build_search_index stückweise weiter auf (siehe search_complete).
+        """
+        if self.search_index is None:
+            self.search_index = SearchIndex()
+            self.search_pending = list(self.todos.values())
+        if complete:
+            while self.build_search_index():
+                pass
+        return SearchResult(self.search_index.search(query), self.todos, limit)
+
+    def build_search_index(self, batch_size=SEARCH_BATCH):
+        """
+        Nächstes Stück des Suchindex aufbauen: erst die geladenen To-Dos (neueste zuerst),
+        dann die noch nicht geladenen erledigten. Liefert False, sobald er vollständig ist.
+        """
+        if self.search_pending:
+            batch = self.search_pending[-batch_size:]
+            del self.search_pending[-batch_size:]
+            for todo in batch:
+                # Inzwischen gelöscht oder neu eingefügt (dann schon im Index)?
+                if self.todos.get(todo.id) is todo:
+                    self.search_index.add(todo)
+            return True
+        # Je Schritt ein Stück der History (wie beim Öffnen der History);
+        # load_more_done nimmt die nachgeladenen To-Dos selbst in den Index auf
+        return self.load_more_done()
+
+    @property
+    def search_complete(self):
+        return self.search_index is not None and not self.search_pending and self.done_loaded
+
+    def list_stats(self, list_id, today):
+        """
+        (offen, erledigt, überfällig, nächste Deadline oder None) einer Liste – O(log n).
+        Alles ergibt sich aus den ohnehin aktuell gehaltenen Buckets; noch nicht geladene
+        erledigte To-Dos zählt der Speicher beim Schreiben des Archivs mit.
+        """
+        if self.unloaded_done is None:
+            # Ältere Datei ohne Zählung im Snapshot: einmalig alles laden
+            self.ensure_done_loaded()
+        open_todos = self.view_bucket(list_id, False)
+        overdue = open_todos.first_row_from(today)
+        next_deadline = None
+        if overdue < len(open_todos) and open_todos[overdue].deadline != NO_DEADLINE_ORDINAL:
+            next_deadline = open_todos[overdue].deadline
+        done = len(self.view_bucket(list_id, True)) + self.unloaded_done_count(list_id)
+        return len(open_todos), done, overdue, next_deadline
+
+    def unloaded_done_count(self, list_id):
+        """
+        Noch nicht geladene erledigte To-Dos einer Liste. Zählt der Speicher erst bei Bedarf
+        (lazy_counts), wird die Liste beim ersten Aufruf gezählt: alle erledigten To-Dos in der
+        Datenbank minus die schon im Speicher – danach zieht add_loaded_done wie sonst ab.
+        """
+        count = self.unloaded_done.get(list_id)
+        if count is not None:
+            return count
+        if self.done_loaded or not self.done_source.lazy_counts:
+            return 0
+        # In dieser Sitzung erledigte To-Dos müssen schon in der Datenbank stehen
+        self.writer.flush()
+        count = self.done_source.count_done(list_id) - len(self.view_bucket(list_id, True))
+        self.unloaded_done[list_id] = count
+        return count
+
+    def next_deadline(self):
+        """Früheste Deadline (Tagesnummer) aller offenen To-Dos oder None – O(log n)."""
+        return self.due_queue.next_deadline(self.todos)
+
+    def pop_due(self, today):
+        """Offene To-Dos, deren Deadline (Tagesnummer) erreicht ist; jedes wird nur einmal geliefert."""
+        return self.due_queue.pop_due(today, self.todos)
+
+    def done_todos(self, list_id=ALL_LISTS):
+        """
+        Erledigte To-Dos einer Liste (ALL_LISTS = alle), nach Deadline sortiert.
+        Enthält nur bereits geladene To-Dos (siehe load_more_done / ensure_done_loaded).
+        """
+        return self.view_bucket(list_id, True)
+
+    # --- Aktionen (je ein Undo-Schritt) ---
+
+    def save_state(self, inverse_op):
+        """Merkt sich die inverse Operation einer Änderung für Undo."""
+        self.history.append(inverse_op)
+
+    def add_todo(self, text, deadline="", list_id=None):
+        """Neues To-Do anlegen. Ungültige Deadline (nicht TT.MM.JJJJ) -> ValueError."""
+        deadline = parse_deadline(deadline)
+        if list_id not in self.list_by_id:
+            list_id = self.current_list_id
+        todo = Todo(
+            self.new_todo_id(),
+            text,
+            False,
+            deadline_ordinal(datetime.now().strftime(DATE_FORMAT)),
+            deadline,
+            list_id
+        )
+        self.save_state(self.perform(("insert", todo)))
+        return todo
+
+    def import_todos(self, records, list_id=None):
+        """
+        To-Dos aus einem Import übernehmen (ein Undo-Schritt, eine Operation im Journal).
+        records: dicts mit "text", "deadline" (TT.MM.JJJJ), "done", "created_at", "list" (Name),
+        z.B. aus todo_io.read_todos(). Unbekannte Listen werden angelegt, ungültige Einträge
+        übersprungen. Liefert (Anzahl importiert, [(Nummer, Fehler), ...]).
+        """
+        if list_id not in self.list_by_id:
+            list_id = self.current_list_id
+        today = deadline_ordinal(datetime.now().strftime(DATE_FORMAT))
+        ops = []
+        todos = []
+        errors = []
+        new_lists = {}
+        for number, record in enumerate(records, start=1):
+            text = (record.get("text") or "").strip()
+            if not text:
+                errors.append((number, "kein Text"))
+                continue
+            try:
+                deadline = parse_deadline((record.get("deadline") or "").strip())
+            except ValueError:
+                errors.append((number, f"ungültige Deadline „{record.get('deadline')}“"))
+                continue
+            created = deadline_ordinal((record.get("created_at") or "").strip())
+            if created == NO_DEADLINE_ORDINAL:
+                created = today
+            target = list_id
+            name = (record.get("list") or "").strip()
+            if name:
+                target = self.list_id_by_name.get(name) or new_lists.get(name)
+                if target is None:
+                    lst = {"id": self.next_list_id, "name": name, "description": ""}
+                    self.next_list_id += 1
+                    new_lists[name] = target = lst["id"]
+                    ops.append(("insert_list", len(self.lists) + len(new_lists) - 1, lst))
+            todos.append(Todo(self.new_todo_id(), text, bool(record.get("done")), created, deadline, target))
+        if todos:
+            ops.append(("insert_many", todos))
+            self.perform_many(ops)
+        return len(todos), errors
+
+    def toggle_done(self, todo_id):
+        todo = self.todos[todo_id]
+        self.save_state(self.perform(("set", todo_id, "done", not todo.done)))
+
+    def delete_todo(self, todo_id):
+        self.save_state(self.perform(("remove", todo_id)))
+
+    # Mehrfachauswahl: je Aufruf ein Undo-Schritt
+
+    def toggle_done_many(self, todo_ids):
+        self.perform_many([("set", todo_id, "done", not self.todos[todo_id].done) for todo_id in todo_ids])
+
+    def delete_many(self, todo_ids):
+        self.perform_many([("remove", todo_id) for todo_id in todo_ids])
+
+    def move_many(self, todo_ids, list_id):
+        """To-Dos in eine andere Liste verschieben (bereits dort liegende werden übersprungen)."""
+        self.perform_many([
+            ("set", todo_id, "list_id", list_id) for todo_id in todo_ids if self.todos[todo_id].list_id != list_id
+        ])
+
+    def perform_many(self, ops):
+        if ops:
+            self.save_state(self.perform(("batch", ops)))
+
+    def undo(self):
+        """Letzte Aktion rückgängig machen. Liefert die ausgeführte Operation oder None."""
+        if not self.history:
+            return None
+        op = self.history.pop()
+        self.perform(op)
+        if self.current_list_id not in self.list_by_id:
+            # Die aktuelle Liste wurde vom Rückgängigmachen entfernt (z.B. bei einem Import angelegt)
+            self.set_current_list(self.lists[0]["id"])
+        return op
+
+    def add_list(self, name, description=""):
+        new_list = {"id": self.next_list_id, "name": name, "description": description}
+        self.next_list_id += 1
+        self.perform(("insert_list", len(self.lists), new_list))
+        self.set_current_list(new_list["id"])
+        return new_list
+
+    def edit_list(self, list_id, name, description):
+        self.perform(("set_list", list_id, "name", name))
+        self.perform(("set_list", list_id, "description", description))
+
+    def delete_list(self, list_id):
+        """Liste samt To-Dos löschen (ein Undo-Schritt)."""
+        self.save_state(self.perform(("delete_list", list_id)))
+        if self.current_list_id == list_id:
+            self.set_current_list(self.lists[0]["id"])
+        if self.storage.sharded:
+            # Mit einer Datei pro Liste ist das Löschen nur ein unlink – gleich erledigen
+            self.save_data()
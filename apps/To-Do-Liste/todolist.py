@@ -1,65 +1,401 @@
+import time
+STARTUP_START = time.perf_counter()      # Für --profile-startup (vor allen anderen Imports)
+
 import tkinter as tk
-from tkinter import messagebox
-import copy
-from datetime import datetime
-import tkinter.font as tkfont
-from tkcalendar import DateEntry   # pip install tkcalendar
-import json
-import os
+from tkinter import filedialog, messagebox
+import argparse
 import sys
-
-def get_save_file():
+from datetime import date, datetime, timedelta
+import tkinter.font as tkfont
+# tkcalendar (pip install tkcalendar) wird erst bei der ersten Benutzung des Deadline-Felds importiert
+
+from todo_store import (
+    ALL_LISTS, DATE_FORMAT, Profiler, StorageLock, TodoStore, UnsupportedVersionError, format_ordinal, open_storage
+)
+from todo_io import read_todos, todo_records, write_todos
+
+SELECTED_ROW_BG = "#d9ead3"
+OVERDUE_ROW_BG = "#f4cccc"       # Offene To-Dos mit überschrittener Deadline
+DUE_TODAY_ROW_BG = "#fff2cc"     # Offene To-Dos, die heute fällig sind
+REMINDER_MAX_DELAY_MS = 3600000  # Spätestens stündlich prüfen (z.B. nach Ruhezustand oder Zeitumstellung)
+ROW_PADY = 2
+IMPORT_FILETYPES = [("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("iCalendar", "*.ics")]
+REMOTE_POLL_MS = 100             # Im Client-Modus (--connect): so oft werden Änderungen vom Server übernommen
+LIST_OPS = ("insert_list", "set_list", "delete_list", "restore_list")
+RESIZE_DELAY_MS = 50             # Größenänderungen werden gesammelt und erst danach angewendet
+SEARCH_LIMIT = 1000              # Höchstens so viele (neueste) Suchtreffer werden in der Tabelle gezeigt
+
+
+class StartupTimer:
+    """Misst die Dauer der Startphasen (--profile-startup)."""
+
+    def __init__(self, start):
+        self.last = start
+        self.phases = []
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self):
+        print("Startzeit nach Phasen:")
+        for phase, seconds in self.phases:
+            print(f"  {phase:<22}{seconds * 1000:>9.1f} ms")
+        total = sum(seconds for _, seconds in self.phases)
+        print(f"  {'Gesamt':<22}{total * 1000:>9.1f} ms")
+
+
+class VirtualTable:
     """
-    Ermittelt einen Speicherort für die Daten im gleichen Ordner wie
-    das Script (beim Entwickeln) bzw. die ausführbare Datei (bei PyInstaller).
+    Scrollbare Tabelle mit einem festen Pool an Zeilen-Widgets.
+
+    Es werden nur so viele Zeilen angelegt, wie in den sichtbaren Bereich passen.
+    Beim Scrollen oder nach Änderungen werden die vorhandenen Labels nur mit neuen
+    Texten/Farben befüllt – und auch nur dann, wenn sich daran etwas geändert hat.
     """
-    if getattr(sys, 'frozen', False):
-        # PyInstaller: Pfad zur ausgeführten EXE / .app
-        base_dir = os.path.dirname(sys.executable)
-    else:
-        # Normales Python-Script
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-    return os.path.join(base_dir, "todo_data.json")
 
-SAVE_FILE = get_save_file()
+    def __init__(self, frame, scrollbar, header_font, default_bg):
+        self.frame = frame
+        self.scrollbar = scrollbar
+        self.header_font = header_font
+        self.default_bg = default_bg
+
+        self.layout = None           # Aktuelle Spaltenkonfiguration (zum Erkennen von Wechseln)
+        self.header_widgets = []
+        self.column_count = 0
+        self.wrap_column = None      # Spalte mit umbrechendem Text
+        self.wraplength = 300
+        self.has_header_button = False
+
+        self.slots = []              # Pool: pro sichtbarer Zeile eine Liste von Labels
+        self.slot_state = []         # Zuletzt gesetzter Inhalt pro Slot: (texte, bg) oder None
+        self.viewport_height = 0
+        self.fitting = None          # Vollständig sichtbare Zeilen (nach dem letzten render gemessen)
+
+        self.row_count = 0
+        self.offset = 0              # Index der ersten sichtbaren Datenzeile
+        self.row_source = None       # Callback: Zeilenindex -> Tupel mit Zelltexten
+        self.row_bg = None           # Callback: Zeilenindex -> Hintergrundfarbe
+
+        self.on_click = None         # Callback(row_idx)
+        self.on_right_click = None   # Callback(event, row_idx)
+
+        linespace = tkfont.nametofont("TkDefaultFont").metrics("linespace")
+        self.row_height = linespace + 2 * ROW_PADY + 4
+
+        self.scrollbar.configure(command=self.yview)
+
+    # --- Aufbau ---
+
+    def set_columns(self, headers, wrap_column=None, on_click=None, on_right_click=None, header_button=None,
+                    on_extend=None):
+        """
+        Spalten setzen. Bei unveränderter Konfiguration bleiben Pool und Scrollposition erhalten.
+        on_extend(row, mode) erhält Shift-Klicks (mode "range") und Strg-Klicks (mode "toggle");
+        ohne on_extend werden sie wie normale Klicks behandelt.
+        """
+        self.on_click = on_click
+        self.on_right_click = on_right_click
+        self.on_extend = on_extend
+        layout = (tuple(headers), wrap_column, header_button[0] if header_button else None)
+        if layout == self.layout:
+            return
+        self.layout = layout
+
+        for widget in self.header_widgets:
+            widget.destroy()
+        for labels in self.slots:
+            for lbl in labels:
+                lbl.destroy()
+        self.header_widgets = []
+        self.slots = []
+        self.slot_state = []
+        self.fitting = None
+        self.offset = 0
+
+        for c in range(max(self.column_count, len(headers)) + 1):
+            self.frame.grid_columnconfigure(c, weight=0)
+
+        self.column_count = len(headers)
+        self.wrap_column = wrap_column
+        self.wraplength = 300
+        self.has_header_button = header_button is not None
+
+        for c, h in enumerate(headers):
+            header = tk.Label(self.frame, text=h, font=self.header_font, anchor="w")
+            header.grid(row=0, column=c, sticky="nw", padx=self._padx(c), pady=(0, 5))
+            self.header_widgets.append(header)
+
+        if header_button is not None:
+            text, command = header_button
+            btn = tk.Button(self.frame, text=text, command=command)
+            btn.grid(row=0, column=self.column_count, sticky="ne", padx=(0, 0), pady=(0, 5))
+            self.header_widgets.append(btn)
+
+        if wrap_column is not None:
+            self.frame.grid_columnconfigure(wrap_column, weight=1)
+
+        self._resize_pool()
+
+    def _padx(self, column):
+        if column == self.column_count - 1 and not self.has_header_button:
+            return (0, 0)
+        return (0, 5)
+
+    def _create_slot(self):
+        slot = len(self.slots)
+        labels = []
+        for c in range(self.column_count):
+            if c == self.wrap_column:
+                lbl = tk.Label(self.frame, anchor="w", justify="left", wraplength=self.wraplength)
+            else:
+                lbl = tk.Label(self.frame, anchor="w")
+            lbl.grid(row=slot + 1, column=c, sticky="nw", padx=self._padx(c), pady=ROW_PADY)
+            lbl.grid_remove()
+            lbl.bind("<Button-1>", lambda e, s=slot: self._on_slot_click(s))
+            lbl.bind("<Shift-Button-1>", lambda e, s=slot: self._on_slot_click(s, "range"))
+            lbl.bind("<Control-Button-1>", lambda e, s=slot: self._on_slot_click(s, "toggle"))
+            # Rechtsklick / Touchpad (Button-3 & Button-2)
+            lbl.bind("<Button-3>", lambda e, s=slot: self._on_slot_right_click(e, s))
+            lbl.bind("<Button-2>", lambda e, s=slot: self._on_slot_right_click(e, s))
+            self.bind_wheel(lbl)
+            labels.append(lbl)
+        self.slots.append(labels)
+        self.slot_state.append(None)
+
+    def _resize_pool(self):
+        """Pool an die Höhe des sichtbaren Bereichs anpassen."""
+        needed = max(1, self.viewport_height // self.row_height + 1)
+        while len(self.slots) < needed:
+            self._create_slot()
+        while len(self.slots) > needed:
+            for lbl in self.slots.pop():
+                lbl.destroy()
+            self.slot_state.pop()
+
+    def set_viewport_height(self, height):
+        if height == self.viewport_height:
+            return
+        self.viewport_height = height
+        if self.layout is None:
+            return
+        self._resize_pool()
+        self.offset = min(self.offset, self.max_offset())
+        self.render()
+
+    def set_wraplength(self, width):
+        if self.wrap_column is None or width == self.wraplength:
+            return
+        self.wraplength = width
+        for labels in self.slots:
+            try:
+                labels[self.wrap_column].configure(wraplength=width)
+            except tk.TclError:
+                pass
+        # Andere Umbrüche -> andere Zeilenhöhen
+        self._measure()
+
+    # --- Daten ---
+
+    def set_rows(self, row_count, row_source, row_bg=None):
+        """Neue Datenquelle setzen und nur die sichtbaren Zeilen befüllen."""
+        self.row_count = row_count
+        self.row_source = row_source
+        self.row_bg = row_bg
+        self.offset = min(self.offset, self.max_offset())
+        self.render()
+
+    def render(self):
+        for slot in range(len(self.slots)):
+            self._render_slot(slot)
+        self._measure()
+        self._update_scrollbar()
+
+    def _measure(self):
+        """
+        Zählen, wie viele der befüllten Slots vollständig in den sichtbaren Bereich passen.
+        Umgebrochene Texte machen Zeilen höher als row_height; die angeforderten Höhen der
+        Labels stehen sofort nach configure fest (ohne update_idletasks, das sonst z.B. das
+        Nachladen der History mitten im Zeichnen ausführen würde).
+        """
+        if not self.slots:
+            self.fitting = None
+            return
+        y = max((w.winfo_reqheight() for w in self.header_widgets), default=0) + 5
+        fitting = 0
+        for slot, labels in enumerate(self.slots):
+            if self.slot_state[slot] is None:
+                break
+            y += max(lbl.winfo_reqheight() for lbl in labels) + 2 * ROW_PADY
+            if y > self.viewport_height:
+                break
+            fitting += 1
+        self.fitting = fitting
+
+    def render_rows(self, *rows):
+        """Nur die angegebenen Datenzeilen neu zeichnen (falls sichtbar), z.B. bei Auswahlwechsel."""
+        for row in rows:
+            if row is None:
+                continue
+            slot = row - self.offset
+            if 0 <= slot < len(self.slots):
+                self._render_slot(slot)
+
+    def _render_slot(self, slot):
+        row = self.offset + slot
+        if row < self.row_count:
+            bg = self.row_bg(row) if self.row_bg else self.default_bg
+            state = (self.row_source(row), bg)
+        else:
+            state = None
+
+        old = self.slot_state[slot]
+        if state == old:
+            return
+        labels = self.slots[slot]
+        if state is None:
+            for lbl in labels:
+                lbl.grid_remove()
+        else:
+            texts, bg = state
+            old_texts, old_bg = old if old is not None else ((None,) * len(labels), None)
+            for c, lbl in enumerate(labels):
+                opts = {}
+                if texts[c] != old_texts[c]:
+                    opts["text"] = texts[c]
+                if bg != old_bg:
+                    opts["bg"] = bg
+                if opts:
+                    lbl.configure(**opts)
+                if old is None:
+                    lbl.grid()
+        self.slot_state[slot] = state
+
+    # --- Scrollen ---
+
+    def visible_rows(self):
+        if self.fitting is None:
+            # Noch nicht gemessen: die letzte Pool-Zeile ist meist nur angeschnitten sichtbar
+            return max(1, len(self.slots) - 1)
+        return max(1, self.fitting)
+
+    def max_offset(self):
+        return max(0, self.row_count - self.visible_rows())
+
+    def scroll_to(self, first):
+        # max_offset hängt von den gemessenen Zeilenhöhen ab: sind die Zeilen am Ende höher,
+        # wächst es nach dem Zeichnen und die letzte Zeile braucht weitere Schritte
+        for _ in range(len(self.slots)):
+            target = max(0, min(first, self.max_offset()))
+            if target == self.offset:
+                return
+            self.offset = target
+            self.render()
+
+    def ensure_visible(self, row):
+        """So weit scrollen, dass die Zeile vollständig sichtbar ist."""
+        if row < self.offset:
+            self.scroll_to(row)
+            return
+        while row >= self.offset + self.visible_rows():
+            offset = self.offset
+            self.scroll_to(max(offset + 1, row - self.visible_rows() + 1))
+            if self.offset == offset:
+                break
+
+    def yview(self, *args):
+        """Scrollbar-Kommando ('moveto' / 'scroll') auf Zeilen-Offset abbilden."""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.scroll_to(int(round(float(args[1]) * self.row_count)))
+        elif args[0] == "scroll":
+            step = self.visible_rows() if args[2].startswith("page") else 1
+            self.scroll_to(self.offset + int(args[1]) * step)
+
+    def on_mousewheel(self, event):
+        if getattr(event, "num", None) == 4:
+            delta = -1
+        elif getattr(event, "num", None) == 5:
+            delta = 1
+        else:
+            delta = -1 if event.delta > 0 else 1
+        self.scroll_to(self.offset + delta * 3)
+        return "break"
+
+    def bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self.on_mousewheel)
+        widget.bind("<Button-4>", self.on_mousewheel)
+        widget.bind("<Button-5>", self.on_mousewheel)
+
+    def _update_scrollbar(self):
+        if self.row_count == 0:
+            self.scrollbar.set(0, 1)
+            return
+        first = self.offset / self.row_count
+        last = min(1.0, (self.offset + self.visible_rows()) / self.row_count)
+        self.scrollbar.set(first, last)
+
+    # --- Klicks ---
+
+    def _on_slot_click(self, slot, mode=None):
+        row = self.offset + slot
+        if row >= self.row_count:
+            return
+        if mode and self.on_extend:
+            self.on_extend(row, mode)
+        elif self.on_click:
+            self.on_click(row)
+
+    def _on_slot_right_click(self, event, slot):
+        row = self.offset + slot
+        if row < self.row_count and self.on_right_click:
+            self.on_right_click(event, row)
 
 
 class ToDoApp:
-    def __init__(self, root):
+    def __init__(self, root, storage=None, startup_timer=None, profiler=None, store=None):
         self.root = root
         self.root.title("To-Do Liste")
-
-        # Daten
-        # Jeder Eintrag: { "text": str, "done": bool, "created_at": str, "deadline": str, "list_id": int }
-        self.todos = []
-        self.history = []              # Zustände für Undo (für alle Listen)
-        self.visible_indices = []      # Sichtbare Indizes in aktueller Ansicht
-        self.row_widgets = []          # Widgets pro Tabellenzeile (für Markierung)
-        self.selected_index = None     # Index in self.todos oder self.lists (je nach Ansicht)
+        self.startup_timer = startup_timer
+        self.profiler = profiler
+
+        # Daten (Tk-freier Kern); im Client-Modus ein RemoteTodoStore (todo_server.py)
+        self.store = store or TodoStore(storage)
+        if profiler:
+            # Vor dem Aufbau der Oberfläche, damit auch bind/command die messenden Methoden erhalten
+            self.instrument(profiler)
+        self.visible_items = []        # Angezeigte To-Dos bzw. Listen (Zeile -> Eintrag)
+        self.selected_row = None       # Zuletzt angeklickte Tabellenzeile (Cursor)
+        self.selected_rows = set()     # Alle markierten Tabellenzeilen (Mehrfachauswahl)
+        self.anchor_row = None         # Startzeile für Shift-Auswahl
         self.show_history = False      # False = offene To Dos, True = erledigte
         self.current_view = "todos"    # "todos" oder "lists"
-
-        # Listen-Verwaltung (Default-Liste)
-        self.lists = []
-        self.next_list_id = 1
-        default_list = {"id": self.next_list_id, "name": "Standard", "description": ""}
-        self.next_list_id += 1
-        self.lists.append(default_list)
-        self.current_list_id = default_list["id"]
-
-        # Beim Start gespeicherte Daten laden (falls vorhanden)
-        self.load_data()
-        # next_list_id nach geladenen Daten anpassen
-        if self.lists:
-            self.next_list_id = max(lst.get("id", 0) for lst in self.lists) + 1
-        else:
-            self.next_list_id = 1
+        self.history_filter_names = None  # Zuletzt ins History-Dropdown übernommene Namen
+        self.table_width = None        # Zuletzt gemeldete Breite der Tabelle
+        self.resize_job = None         # Geplante Anpassung der Umbruchbreite (after-id)
+        self.history_job = None        # Geplantes Nachladen der History (after-id)
+        self.search_job = None         # Geplanter nächster Schritt beim Aufbau des Suchindex (after-id)
+        self.data_loaded = False       # Gespeicherte Daten werden erst nach dem ersten Anzeigen geladen
+        self.calendar_active = False   # True, sobald der Platzhalter durch DateEntry ersetzt ist
+        self.today = date.today().toordinal()  # Für Überfällig-Markierung, wird vom Erinnerungs-Timer aktualisiert
+        self.reminder_job = None       # Einziger Timer für Erinnerungen (after-id)
+        self.poll_job = None           # Timer für Änderungen vom Server (after-id, nur mit --connect)
 
         # Kontextmenü für Listen
         self.list_menu = tk.Menu(root, tearoff=0)
         self.list_menu.add_command(label="Bearbeiten", command=self.edit_selected_list)
         self.list_menu.add_command(label="Löschen", command=self.delete_selected_list)
 
+        # Menüleiste: Import / Export
+        menubar = tk.Menu(root)
+        file_menu = tk.Menu(menubar, tearoff=0)
+        file_menu.add_command(label="Importieren …", command=self.import_file)
+        file_menu.add_command(label="Exportieren …", command=self.export_file)
+        menubar.add_cascade(label="Datei", menu=file_menu)
+        root.config(menu=menubar)
+
         # Header-Font
         base_font = tkfont.nametofont("TkDefaultFont")
         self.header_font = base_font.copy()
@@ -80,11 +416,11 @@ class ToDoApp:
         deadline_label = tk.Label(input_frame, text="Deadline:")
         deadline_label.grid(row=0, column=2, sticky="w", padx=(0, 5))
 
-        self.deadline_entry = DateEntry(
-            input_frame,
-            date_pattern="dd.mm.yyyy"
-        )
+        # Platzhalter: einfaches Eingabefeld, der Kalender wird erst bei der ersten Benutzung geladen
+        self.deadline_entry = tk.Entry(input_frame, width=12, bg="white", fg="black")
+        self.deadline_entry.insert(0, datetime.today().strftime(DATE_FORMAT))
         self.deadline_entry.grid(row=0, column=3, sticky="w", padx=(0, 10))
+        self.deadline_entry.bind("<FocusIn>", self.activate_calendar)
 
         list_label = tk.Label(input_frame, text="Liste:")
         list_label.grid(row=0, column=4, sticky="w", padx=(0, 5))
@@ -102,6 +438,21 @@ class ToDoApp:
         input_frame.columnconfigure(1, weight=3)
         input_frame.columnconfigure(6, weight=0)
 
+        # --- Suchzeile: filtert beim Tippen über alle Listen ---
+        search_frame = tk.Frame(root)
+        search_frame.pack(padx=10, pady=(0, 5), fill="x")
+
+        search_label = tk.Label(search_frame, text="Suche:")
+        search_label.pack(side="left", padx=(0, 5))
+
+        self.search_var = tk.StringVar()
+        self.search_entry = tk.Entry(search_frame, textvariable=self.search_var, bg="white", fg="black")
+        self.search_entry.pack(side="left", fill="x", expand=True)
+        self.search_entry.bind("<Escape>", lambda e: self.clear_search())
+
+        clear_search_btn = tk.Button(search_frame, text="×", command=self.clear_search)
+        clear_search_btn.pack(side="left", padx=(5, 0))
+
         # Anzeige aktuelle Liste / Listenübersicht
         self.current_list_label_var = tk.StringVar()
         self.current_list_label = tk.Label(root, textvariable=self.current_list_label_var)
@@ -126,19 +477,31 @@ class ToDoApp:
         self.canvas = tk.Canvas(list_container)
         self.canvas.pack(side="left", fill="both", expand=True)
 
-        scrollbar = tk.Scrollbar(list_container, command=self.canvas.yview)
+        scrollbar = tk.Scrollbar(list_container)
         scrollbar.pack(side="right", fill="y")
 
-        self.canvas.configure(yscrollcommand=scrollbar.set)
-
         self.table_frame = tk.Frame(self.canvas)
         self.table_window = self.canvas.create_window((0, 0), window=self.table_frame, anchor="nw")
 
+        self.default_row_bg = self.table_frame.cget("bg")
+
+        # Virtualisierte Tabelle: Scrollbar steuert den Zeilen-Offset statt der Canvas
+        self.table = VirtualTable(self.table_frame, scrollbar, self.header_font, self.default_row_bg)
+        self.table.bind_wheel(self.canvas)
+
+        # Tastatur-Navigation in der Tabelle (Fokus liegt nach einem Klick auf der Canvas)
+        self.canvas.configure(takefocus=1)
+        self.canvas.bind("<Up>", lambda e: self.move_selection(-1))
+        self.canvas.bind("<Down>", lambda e: self.move_selection(1))
+        self.canvas.bind("<Prior>", lambda e: self.move_selection(-self.table.visible_rows()))
+        self.canvas.bind("<Next>", lambda e: self.move_selection(self.table.visible_rows()))
+        self.canvas.bind("<Shift-Up>", lambda e: self.move_selection(-1, extend=True))
+        self.canvas.bind("<Shift-Down>", lambda e: self.move_selection(1, extend=True))
+        self.canvas.bind("<Control-a>", lambda e: self.select_all())
+
         # Canvas-Größenänderungen behandeln
         self.canvas.bind("<Configure>", self.on_canvas_resize)
 
-        self.default_row_bg = self.table_frame.cget("bg")
-
         # --- Buttons unten ---
         btn_frame = tk.Frame(root)
         btn_frame.pack(padx=10, pady=10, fill="x")
@@ -151,108 +514,231 @@ class ToDoApp:
         self.delete_btn = tk.Button(btn_frame, text="Delete", width=button_width, command=self.delete_todo)
         self.delete_btn.grid(row=0, column=1, padx=5, pady=5)
 
+        self.move_btn = tk.Button(btn_frame, text="Move", width=button_width, command=self.open_move_menu)
+        self.move_btn.grid(row=0, column=2, padx=5, pady=5)
+
+        # Ziel-Listen für "Move" (wird beim Öffnen befüllt)
+        self.move_menu = tk.Menu(root, tearoff=0)
+
         self.undo_btn = tk.Button(btn_frame, text="Undo", width=button_width, command=self.undo)
-        self.undo_btn.grid(row=0, column=2, padx=5, pady=5)
+        self.undo_btn.grid(row=0, column=3, padx=5, pady=5)
 
         self.history_btn = tk.Button(btn_frame, text="History", width=button_width, command=self.toggle_history_view)
-        self.history_btn.grid(row=0, column=3, padx=5, pady=5)
+        self.history_btn.grid(row=0, column=4, padx=5, pady=5)
 
         self.lists_btn = tk.Button(btn_frame, text="Lists", width=button_width, command=self.toggle_lists_view)
-        self.lists_btn.grid(row=0, column=4, padx=5, pady=5)
+        self.lists_btn.grid(row=0, column=5, padx=5, pady=5)
 
-        for i in range(5):
+        for i in range(6):
             btn_frame.grid_columnconfigure(i, weight=1)
 
-        # Start
-        self.update_list_selector()
-        self.update_history_filter_options()
+        # Suche erst nach dem Aufbau verbinden (refresh_view braucht die Tabelle)
+        self.search_var.trace_add("write", lambda *args: self.on_search_change())
+
+        # Start: Fenster zuerst (leer) anzeigen, die Daten danach laden
         self.update_buttons_for_view()
-        self.refresh_view()
+        self.current_list_label_var.set("Lade Daten …")
 
         # Wrap-Länge dynamisch anpassen
         self.table_frame.bind("<Configure>", self.on_table_resize)
 
-    # --- Speicherfunktionen ---
+        if self.startup_timer:
+            self.startup_timer.mark("Oberfläche aufbauen")
+        # after_idle -> after(0): läuft erst, nachdem Tk das Fenster gezeichnet hat
+        self.root.after_idle(self.root.after, 0, self.finish_startup)
+
+    def instrument(self, profiler):
+        """Kritische Pfade messen (Dauer und Anzahl Einträge); F12 schreibt die Messwerte."""
+        rows = lambda app, result: app.table.row_count
+        todos = lambda store, result: len(store.todos)
+        profiler.instrument(self.store, {
+            "save_state": lambda store, result: len(store.history),
+            "save_data": todos,
+            "load_data": todos,
+        })
+        profiler.instrument(self, {
+            "refresh_todos_view": rows,
+            "refresh_lists_view": rows,
+            "select_row": lambda app, result: 1,
+            "on_table_resize": rows,
+            "update_wraplength": rows,
+        })
+        self.root.bind_all("<F12>", self.dump_profile)
 
-    def save_state(self):
-        state_copy = copy.deepcopy(self.todos)
-        self.history.append(state_copy)
-        if len(self.history) > 10:
-            self.history.pop(0)
+    def dump_profile(self, event=None):
+        self.profiler.dump()
+        print("Messwerte gespeichert:", self.profiler.path)
 
-    def save_data(self):
-        """Speichert alle Daten (Listen, Todos, aktuelle Liste) in eine JSON-Datei."""
-        data = {
-            "todos": self.todos,
-            "lists": self.lists,
-            "current_list_id": self.current_list_id
-        }
+    def finish_startup(self):
+        """Gespeicherte Daten laden und anzeigen (nach dem ersten Zeichnen des Fensters)."""
+        if self.startup_timer:
+            self.startup_timer.mark("Erste Anzeige")
         try:
-            with open(SAVE_FILE, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self.store.load_data()
+        except UnsupportedVersionError as e:
+            print("Fehler beim Laden:", e)
+            messagebox.showerror(
+                "To-Do Liste", f"Die Daten stammen von einer neueren Version und werden nicht geöffnet:\n{e}"
+            )
+            # Ohne zu speichern beenden, die Datei bleibt unverändert
+            self.store.close_data()
+            self.root.destroy()
+            return
+        self.data_loaded = True
+        if self.startup_timer:
+            self.startup_timer.mark("Daten laden")
+        self.update_list_selector()
+        self.update_history_filter_options()
+        self.refresh_view()
+        self.check_reminders()
+        if self.store.remote:
+            self.poll_remote()
+        if self.startup_timer:
+            self.root.update_idletasks()
+            self.startup_timer.mark("Erstes Rendern")
+            self.startup_timer.report()
+
+    # --- Erinnerungen ---
+
+    def check_reminders(self):
+        """
+        Heute fällig gewordene To-Dos melden und den Timer für die nächste Prüfung stellen.
+        Die offenen To-Dos liegen nach Deadline in einem Heap – geprüft wird nur dessen Spitze.
+        """
+        self.reminder_job = None
+        today = date.today().toordinal()
+        day_changed = today != self.today
+        self.today = today
+        # Schon überfällige To-Dos werden nur markiert, gemeldet werden die heute fälligen
+        due = [todo for todo in self.store.pop_due(today) if todo.deadline == today]
+        if day_changed:
+            self.refresh_view()
+        if due:
+            self.show_reminder(due)
+        self.schedule_reminder()
+
+    def schedule_reminder(self):
+        """Nach jeder Änderung aufrufen, die ein offenes To-Do mit Deadline bringen kann."""
+        if self.reminder_job is not None:
+            self.root.after_cancel(self.reminder_job)
+        next_deadline = self.store.next_deadline()
+        if next_deadline is not None and next_deadline <= self.today:
+            # Schon fällig (z.B. gerade mit heutiger Deadline angelegt): gleich melden
+            self.reminder_job = self.root.after(0, self.check_reminders)
+            return
+        # Deadlines sind Tage: Alles andere wird frühestens mit dem nächsten Tageswechsel fällig
+        now = datetime.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        delay = int((midnight - now).total_seconds() * 1000) + 1000
+        self.reminder_job = self.root.after(min(delay, REMINDER_MAX_DELAY_MS), self.check_reminders)
+
+    def show_reminder(self, todos):
+        lines = [f"• {todo.text} ({self.store.get_list_name(todo.list_id)})" for todo in todos[:10]]
+        if len(todos) > 10:
+            lines.append(f"… und {len(todos) - 10} weitere")
+        self.root.bell()
+        messagebox.showinfo("Heute fällig", "\n".join(lines))
+
+    # --- Client-Modus (--connect) ---
+
+    def poll_remote(self):
+        """Vom Server geschickte Änderungen (auch die anderer Clients) übernehmen und anzeigen."""
+        self.poll_job = None
+        try:
+            ops = self.store.poll_events()
+        except ConnectionError as e:
+            print("Fehler beim Empfangen:", e)
+            messagebox.showerror("To-Do Liste", "Die Verbindung zum Server ist unterbrochen.")
+            return
         except Exception as e:
-            print("Fehler beim Speichern:", e)
+            # Z.B. Neuladen fehlgeschlagen – weiter abfragen, der Store versucht es beim nächsten Mal wieder
+            print("Fehler beim Übernehmen der Änderungen:", e)
+            ops = []
+        if ops:
+            if self.store.current_list_id not in self.store.list_by_id:
+                # Aktuelle Liste wurde von einem anderen Client gelöscht
+                self.store.set_current_list(self.store.lists[0]["id"])
+            if any(op[0] in LIST_OPS or op[0] == "resync" for op in ops):
+                self.update_list_selector()
+                self.update_history_filter_options()
+            self.refresh_view()
+            self.schedule_reminder()
+        self.poll_job = self.root.after(REMOTE_POLL_MS, self.poll_remote)
+
+    # --- Deadline-Feld ---
 
-    def load_data(self):
-        """Lädt gespeicherte Daten aus der JSON-Datei, falls vorhanden."""
-        if not os.path.exists(SAVE_FILE):
+    def activate_calendar(self, event=None):
+        """Platzhalter beim ersten Fokus durch tkcalendar.DateEntry ersetzen (Import erst jetzt)."""
+        if self.calendar_active:
             return
         try:
-            with open(SAVE_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            self.todos = data.get("todos", [])
-            loaded_lists = data.get("lists")
-            if loaded_lists:
-                self.lists = loaded_lists
-            self.current_list_id = data.get("current_list_id", self.current_list_id)
-        except Exception as e:
-            print("Fehler beim Laden:", e)
+            from tkcalendar import DateEntry
+        except ImportError:
+            # Ohne tkcalendar bleibt das einfache Eingabefeld (Format wird beim Hinzufügen geprüft)
+            return
+        self.calendar_active = True
+        placeholder = self.deadline_entry
+        value = placeholder.get().strip()
+        self.deadline_entry = DateEntry(placeholder.master, date_pattern="dd.mm.yyyy")
+        self.deadline_entry.delete(0, tk.END)
+        self.deadline_entry.insert(0, value)
+        self.deadline_entry.grid(row=0, column=3, sticky="w", padx=(0, 10))
+        placeholder.destroy()
+        self.deadline_entry.focus_set()
+
+    def reset_deadline(self):
+        if self.calendar_active:
+            self.deadline_entry.set_date(datetime.today())
+        else:
+            self.deadline_entry.delete(0, tk.END)
+            self.deadline_entry.insert(0, datetime.today().strftime(DATE_FORMAT))
+
+    # --- Speicherfunktionen ---
+
+    def save_data(self):
+        self.store.save_data()
+
+    def close_data(self):
+        self.store.close_data()
+        if self.profiler:
+            self.dump_profile()
 
     # --- Allgemeine Helfer ---
 
     def clear_table(self):
-        for widget in self.table_frame.winfo_children():
-            widget.destroy()
-        self.row_widgets = []
-        self.visible_indices = []
-        self.selected_index = None
+        """Auswahl und Zeilenzuordnung zurücksetzen (die Widgets bleiben im Pool erhalten)."""
+        self.visible_items = []
+        self.selected_row = None
+        self.selected_rows = set()
+        self.anchor_row = None
 
     def on_canvas_resize(self, event):
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
         self.canvas.itemconfig(self.table_window, width=event.width)
+        self.table.set_viewport_height(event.height)
 
     def on_table_resize(self, event):
+        # <Configure> kommt auch bei reinen Höhenänderungen – nur die Breite ist relevant
+        if event.width == self.table_width:
+            return
+        self.table_width = event.width
+        # Beim Ziehen am Fenster nur einmal nach der letzten Änderung anpassen
+        if self.resize_job is not None:
+            self.root.after_cancel(self.resize_job)
+        self.resize_job = self.root.after(RESIZE_DELAY_MS, self.update_wraplength)
+
+    def update_wraplength(self):
+        self.resize_job = None
         # Nur To-Do-Ansicht
-        if self.current_view != "todos":
+        if self.current_view != "todos" or self.table_width is None:
             return
-        total_width = event.width
-        reserve = 260 if self.show_history else 80
-        text_col_width = max(total_width - reserve, 100)
-
-        for widgets in self.row_widgets:
-            if not widgets:
-                continue
-            todo_label = widgets[0]  # immer erstes Widget = To-Do-Text
-            try:
-                todo_label.configure(wraplength=text_col_width)
-            except tk.TclError:
-                pass
-
-    def get_list_name(self, list_id):
-        for lst in self.lists:
-            if lst["id"] == list_id:
-                return lst["name"]
-        return "Unbekannt"
-
-    def get_list_id_by_name(self, name):
-        for lst in self.lists:
-            if lst["name"] == name:
-                return lst["id"]
-        return None
+        reserve = 260 if self.show_history or self.get_search_query() else 80
+        text_col_width = max(self.table_width - reserve, 100)
+        # Betrifft nur die Labels im Pool (sichtbare Zeilen) und nur bei geänderter Breite
+        self.table.set_wraplength(text_col_width)
 
     def update_list_selector(self):
-        names = [lst["name"] for lst in self.lists]
-        current_name = self.get_list_name(self.current_list_id)
+        names = [lst["name"] for lst in self.store.list_by_id.values()]
+        current_name = self.store.get_list_name(self.store.current_list_id)
         self.list_selector_var.set(current_name)
         menu = self.list_selector["menu"]
         menu.delete(0, "end")
@@ -261,11 +747,15 @@ class ToDoApp:
 
     def update_history_filter_options(self):
         """History-Filter-Dropdown mit 'Alle' + allen Listennamen aktualisieren."""
-        names = ["Alle"] + [lst["name"] for lst in self.lists]
+        names = ["Alle"] + [lst["name"] for lst in self.store.list_by_id.values()]
         current = self.history_filter_var.get()
         if current not in names:
             self.history_filter_var.set("Alle")
 
+        # Menü nur neu aufbauen, wenn sich die Listennamen geändert haben
+        if names == self.history_filter_names:
+            return
+        self.history_filter_names = names
         menu = self.history_filter_menu["menu"]
         menu.delete(0, "end")
         for name in names:
@@ -275,15 +765,20 @@ class ToDoApp:
         self.history_filter_var.set(name)
         self.refresh_view()
 
-    def parse_deadline_date(self, todo):
-        """Hilfsfunktion: Deadline aus ToDo als date-Objekt, sonst sehr großes Datum."""
-        datestr = todo.get("deadline", "")
-        if not datestr:
-            return datetime.max.date()
-        try:
-            return datetime.strptime(datestr, "%d.%m.%Y").date()
-        except ValueError:
-            return datetime.max.date()
+    # --- Suche ---
+
+    def get_search_query(self):
+        return self.search_var.get().strip()
+
+    def on_search_change(self):
+        # Suchergebnisse werden in der To-Do-Ansicht angezeigt
+        if self.current_view == "lists" and self.get_search_query():
+            self.current_view = "todos"
+            self.update_buttons_for_view()
+        self.refresh_view()
+
+    def clear_search(self):
+        self.search_var.set("")
 
     # --- Buttons je nach Ansicht (ToDos / Listen) ---
 
@@ -292,6 +787,7 @@ class ToDoApp:
             # In Listenübersicht: unten gar keine Buttons
             self.done_btn.grid_remove()
             self.delete_btn.grid_remove()
+            self.move_btn.grid_remove()
             self.undo_btn.grid_remove()
             self.history_btn.grid_remove()
             self.lists_btn.grid_remove()
@@ -299,9 +795,10 @@ class ToDoApp:
             # To-Do-Ansicht: alle sichtbar
             self.done_btn.grid(row=0, column=0, padx=5, pady=5)
             self.delete_btn.grid(row=0, column=1, padx=5, pady=5)
-            self.undo_btn.grid(row=0, column=2, padx=5, pady=5)
-            self.history_btn.grid(row=0, column=3, padx=5, pady=5)
-            self.lists_btn.grid(row=0, column=4, padx=5, pady=5)
+            self.move_btn.grid(row=0, column=2, padx=5, pady=5)
+            self.undo_btn.grid(row=0, column=3, padx=5, pady=5)
+            self.history_btn.grid(row=0, column=4, padx=5, pady=5)
+            self.lists_btn.grid(row=0, column=5, padx=5, pady=5)
             self.delete_btn.config(text="Delete", command=self.delete_todo)
 
     # --- View-Umschaltung ---
@@ -333,180 +830,229 @@ class ToDoApp:
 
     def refresh_lists_view(self):
         self.clear_table()
+        self.cancel_history_batch()
         self.current_list_label_var.set("Listenübersicht")
 
-        header_list = tk.Label(self.table_frame, text="Liste", font=self.header_font, anchor="w")
-        header_list.grid(row=0, column=0, sticky="nw", padx=(0, 5), pady=(0, 5))
-
-        header_desc = tk.Label(self.table_frame, text="Beschreibung", font=self.header_font, anchor="w")
-        header_desc.grid(row=0, column=1, sticky="nw", padx=(0, 5), pady=(0, 5))
-
-        plus_btn = tk.Button(self.table_frame, text="+", command=self.open_new_list_dialog)
-        plus_btn.grid(row=0, column=2, sticky="ne", padx=(0, 0), pady=(0, 5))
-
-        self.table_frame.grid_columnconfigure(1, weight=1)
-
-        row = 1
-        for idx, lst in enumerate(self.lists):
-            name_label = tk.Label(self.table_frame, text=lst["name"], anchor="w")
-            name_label.grid(row=row, column=0, sticky="nw", padx=(0, 5), pady=2)
-
-            desc_label = tk.Label(self.table_frame, text=lst["description"], anchor="w", justify="left", wraplength=300)
-            desc_label.grid(row=row, column=1, sticky="nw", padx=(0, 5), pady=2)
+        self.table.set_columns(
+            ["Liste", "Beschreibung", "Offen", "Erledigt", "Überfällig", "Nächste Deadline"],
+            wrap_column=1,
+            on_click=self.on_list_left_click,
+            on_right_click=self.on_list_right_click,
+            header_button=("+", self.open_new_list_dialog)
+        )
 
-            row_widgets = [name_label, desc_label]
-            self.visible_indices.append(idx)
-            row_index = len(self.row_widgets)
+        self.visible_items = self.store.lists
 
-            # Linksklick: Liste öffnen
-            for w in row_widgets:
-                w.bind("<Button-1>", lambda e, r=row_index: self.on_list_left_click(r))
-                # Rechtsklick / Touchpad (Button-3 & Button-2)
-                w.bind("<Button-3>", lambda e, r=row_index: self.on_list_right_click(e, r))
-                w.bind("<Button-2>", lambda e, r=row_index: self.on_list_right_click(e, r))
+        # Statistik nur für sichtbare Zeilen, je Liste O(log n) – kein Durchlauf über alle To-Dos
+        def row_source(row):
+            lst = self.store.lists[row]
+            open_count, done_count, overdue, next_deadline = self.store.list_stats(lst["id"], self.today)
+            return (
+                lst["name"], lst["description"], str(open_count), str(done_count),
+                str(overdue) if overdue else "–", format_ordinal(next_deadline) if next_deadline else "–"
+            )
 
-            self.row_widgets.append(row_widgets)
-            row += 1
+        self.table.set_rows(len(self.store.lists), row_source, self.row_bg)
 
     def refresh_todos_view(self):
         self.clear_table()
+        query = self.get_search_query()
 
         # History-Filter nur in History-Ansicht anzeigen
-        if self.show_history:
+        if self.show_history and not query:
             self.history_filter_frame.pack(anchor="w", padx=10, pady=(0, 5))
             self.update_history_filter_options()
         else:
             self.history_filter_frame.pack_forget()
 
-        self.current_list_label_var.set(f"Aktuelle Liste: {self.get_list_name(self.current_list_id)}")
-
-        if self.show_history:
-            headers = ["Liste", "To Do", "Deadline", "Erstellt am"]
-            for c, h in enumerate(headers):
-                tk.Label(
-                    self.table_frame,
-                    text=h,
-                    font=self.header_font,
-                    anchor="w"
-                ).grid(row=0, column=c, sticky="nw", padx=(0, 5), pady=(0, 5))
-            self.table_frame.grid_columnconfigure(1, weight=1)
-        else:
-            tk.Label(self.table_frame, text="Deadline", font=self.header_font, anchor="w").grid(
-                row=0, column=0, sticky="nw", padx=(0, 5), pady=(0, 5)
-            )
-            tk.Label(self.table_frame, text="To Do", font=self.header_font, anchor="w").grid(
-                row=0, column=1, sticky="nw", padx=(0, 0), pady=(0, 5)
-            )
-            self.table_frame.grid_columnconfigure(1, weight=1)
-
-        row = 1
-
-        if self.show_history:
+        self.current_list_label_var.set(f"Aktuelle Liste: {self.store.get_list_name(self.store.current_list_id)}")
+
+        if query:
+            # --- Suche: alle Listen, offene und erledigte ToDos (invertierter Index) ---
+            self.cancel_history_batch()
+            self.table.set_columns(["Liste", "To Do", "Deadline", "Status"], wrap_column=1, on_click=self.on_row_click,
+                                   on_extend=self.on_row_extend)
+
+            # Sucht im bisher aufgebauten Index; der Rest folgt stückweise (build_search_batch)
+            bucket = self.store.search(query, limit=SEARCH_LIMIT, complete=False)
+            label = f"Suche „{query}“: {bucket.total} Treffer"
+            if len(bucket) < bucket.total:
+                label += f" (die neuesten {len(bucket)})"
+            if not self.store.search_complete:
+                label += " – Index wird aufgebaut …"
+                self.schedule_search_batch()
+            self.current_list_label_var.set(label)
+
+            def row_source(row):
+                todo = bucket[row]
+                list_name = self.store.get_list_name(todo.list_id)
+                return (list_name, todo.text, todo.deadline_text, "erledigt" if todo.done else "offen")
+
+        elif self.show_history:
             # --- History: erledigte ToDos, optional nach Liste gefiltert, nach Deadline sortiert ---
-            filtered = []
+            self.cancel_search_batch()
+            self.table.set_columns(["Liste", "To Do", "Deadline", "Erstellt am"], wrap_column=1, on_click=self.on_row_click,
+                                   on_extend=self.on_row_extend)
+
             filter_name = self.history_filter_var.get()
-            filter_list_id = None
+            filter_list_id = ALL_LISTS
             if filter_name and filter_name != "Alle":
-                filter_list_id = self.get_list_id_by_name(filter_name)
-
-            for idx, todo in enumerate(self.todos):
-                if not todo.get("done"):
-                    continue
-                list_id = todo.get("list_id", self.current_list_id)
-                if filter_list_id is not None and list_id != filter_list_id:
-                    continue
-                filtered.append((idx, todo))
+                filter_list_id = self.store.get_list_id_by_name(filter_name)
 
-            # Sortieren nach Deadline (aufsteigend)
-            filtered.sort(key=lambda it: self.parse_deadline_date(it[1]))
+            # Bucket ist bereits nach Deadline sortiert – kein Scan, keine Sortierung.
+            # Noch nicht geladene erledigte To-Dos kommen stückweise hinzu (load_history_batch).
+            bucket = self.store.done_todos(filter_list_id)
+            self.schedule_history_batch()
 
-            for idx, todo in filtered:
-                text = todo["text"]
-                deadline = todo["deadline"]
-                created = todo["created_at"]
-                list_id = todo.get("list_id", self.current_list_id)
-                list_name = self.get_list_name(list_id)
-
-                self.visible_indices.append(idx)
-                row_widgets = []
-
-                list_label = tk.Label(self.table_frame, text=list_name, anchor="w")
-                list_label.grid(row=row, column=0, sticky="nw", padx=(0, 5), pady=2)
-
-                todo_label = tk.Label(self.table_frame, text=text, anchor="w", justify="left", wraplength=300)
-                todo_label.grid(row=row, column=1, sticky="nw", padx=(0, 5), pady=2)
-
-                deadline_label = tk.Label(self.table_frame, text=deadline, anchor="w")
-                deadline_label.grid(row=row, column=2, sticky="nw", padx=(0, 5), pady=2)
-
-                created_label = tk.Label(self.table_frame, text=created, anchor="w")
-                created_label.grid(row=row, column=3, sticky="nw", padx=(0, 0), pady=2)
-
-                row_widgets = [todo_label, list_label, deadline_label, created_label]
-
-                row_index = len(self.row_widgets)
-                for w in row_widgets:
-                    w.bind("<Button-1>", lambda e, r=row_index: self.on_row_click(r))
-
-                self.row_widgets.append(row_widgets)
-                row += 1
+            def row_source(row):
+                todo = bucket[row]
+                list_name = self.store.get_list_name(todo.list_id)
+                return (list_name, todo.text, todo.deadline_text, todo.created_text)
 
         else:
             # --- Offene ToDos: nur aktuelle Liste, nach Deadline sortiert ---
-            filtered = []
-            for idx, todo in enumerate(self.todos):
-                list_id = todo.get("list_id", self.current_list_id)
-                if todo.get("done"):
-                    continue
-                if list_id != self.current_list_id:
-                    continue
-                filtered.append((idx, todo))
-
-            filtered.sort(key=lambda it: self.parse_deadline_date(it[1]))
+            self.cancel_history_batch()
+            self.cancel_search_batch()
+            self.table.set_columns(["Deadline", "To Do"], wrap_column=1, on_click=self.on_row_click,
+                                   on_extend=self.on_row_extend)
 
-            for idx, todo in filtered:
-                text = todo["text"]
-                deadline = todo["deadline"]
+            bucket = self.store.open_todos(self.store.current_list_id)
 
-                self.visible_indices.append(idx)
-                row_widgets = []
+            def row_source(row):
+                todo = bucket[row]
+                return (todo.deadline_text, todo.text)
 
-                deadline_label = tk.Label(self.table_frame, text=deadline, anchor="w")
-                deadline_label.grid(row=row, column=0, sticky="nw", padx=(0, 5), pady=2)
+        self.visible_items = bucket
+        # Nur die sichtbaren Pool-Zeilen werden befüllt
+        self.table.set_rows(len(bucket), row_source, self.row_bg)
 
-                todo_label = tk.Label(self.table_frame, text=text, anchor="w", justify="left", wraplength=300)
-                todo_label.grid(row=row, column=1, sticky="nw", padx=(0, 0), pady=2)
+        # Spaltenbreite hängt von der Ansicht ab; Breite ist bekannt, kein Layout-Durchlauf nötig
+        self.update_wraplength()
 
-                row_widgets = [todo_label, deadline_label]
+    # --- History stückweise nachladen ---
 
-                row_index = len(self.row_widgets)
-                for w in row_widgets:
-                    w.bind("<Button-1>", lambda e, r=row_index: self.on_row_click(r))
+    def schedule_history_batch(self):
+        """Nächstes Stück erst einplanen, wenn die Oberfläche nichts anderes zu tun hat."""
+        self.cancel_history_batch()
+        if not self.store.done_loaded:
+            self.history_job = self.root.after_idle(self.load_history_batch)
 
-                self.row_widgets.append(row_widgets)
-                row += 1
+    def cancel_history_batch(self):
+        # Filterwechsel oder Verlassen der History: laufendes Nachladen abbrechen
+        if self.history_job is not None:
+            self.root.after_cancel(self.history_job)
+            self.history_job = None
 
-        self.table_frame.update_idletasks()
-        fake_event = type("Event", (), {"width": self.table_frame.winfo_width()})
-        self.on_table_resize(fake_event)
+    def load_history_batch(self):
+        self.history_job = None
+        if self.current_view != "todos" or not self.show_history:
+            return
+        # Auswahl merken, bevor das Nachladen die Zeilen im Bucket verschiebt
+        selected = self.get_selected_todos()
+        cursor = self.get_selected_todo()
+        self.store.load_more_done()
+        self.refresh_keeping_selection(selected, cursor)
+
+    # --- Suchindex stückweise aufbauen ---
+
+    def schedule_search_batch(self):
+        self.cancel_search_batch()
+        self.search_job = self.root.after_idle(self.build_search_batch)
+
+    def cancel_search_batch(self):
+        # Suchfeld geleert: Aufbau ruht, bis wieder gesucht wird (der Index bleibt erhalten)
+        if self.search_job is not None:
+            self.root.after_cancel(self.search_job)
+            self.search_job = None
+
+    def build_search_batch(self):
+        self.search_job = None
+        if self.current_view != "todos" or not self.get_search_query():
+            return
+        selected = self.get_selected_todos()
+        cursor = self.get_selected_todo()
+        self.store.build_search_index()
+        self.refresh_keeping_selection(selected, cursor)
+
+    def refresh_keeping_selection(self, selected, cursor):
+        """
+        Neu zeichnen (nur sichtbare Zeilen; plant das nächste Stück ein) und die vorher gemerkten
+        To-Dos wieder markieren. selected/cursor müssen vor der Änderung der Daten ermittelt
+        werden – danach zeigen die alten Zeilennummern auf andere To-Dos.
+        """
+        self.refresh_view()
+        # Auswahl auf die neuen Zeilennummern übertragen (Bucket: O(log n) je markiertem To-Do)
+        rows = [self.visible_items.index(todo) for todo in selected]
+        self.selected_rows = {row for row in rows if row is not None}
+        if cursor is not None:
+            self.selected_row = self.anchor_row = self.visible_items.index(cursor)
+        self.table.render()
 
     # --- Zeilenauswahl ---
 
     def select_row(self, row_idx):
-        if row_idx < 0 or row_idx >= len(self.visible_indices):
+        if row_idx < 0 or row_idx >= len(self.visible_items):
             return
-        self.selected_index = self.visible_indices[row_idx]
+        previous = self.selected_rows
+        self.selected_row = self.anchor_row = row_idx
+        self.selected_rows = {row_idx}
+        # Nur die bisher und die neu markierten Zeilen werden neu gezeichnet
+        if len(previous) > 1:
+            self.table.render()
+        else:
+            self.table.render_rows(*previous, row_idx)
 
-        for i, widgets in enumerate(self.row_widgets):
-            bg = "#d9ead3" if i == row_idx else self.default_row_bg
-            for w in widgets:
-                try:
-                    w.configure(bg=bg)
-                except tk.TclError:
-                    pass
+    def extend_selection(self, row_idx, mode):
+        """Shift ("range"): Bereich ab der Startzeile markieren; Strg ("toggle"): Zeile hinzufügen/entfernen."""
+        if row_idx < 0 or row_idx >= len(self.visible_items):
+            return
+        if mode == "range" and self.anchor_row is not None:
+            first, last = sorted((self.anchor_row, row_idx))
+            self.selected_rows = set(range(first, last + 1))
+        else:
+            self.anchor_row = row_idx
+            self.selected_rows ^= {row_idx}
+        self.selected_row = row_idx
+        # Nur sichtbare Zeilen werden neu gezeichnet, egal wie groß die Auswahl ist
+        self.table.render()
+
+    def select_all(self):
+        if self.current_view == "todos" and len(self.visible_items):
+            self.anchor_row = 0
+            self.extend_selection(len(self.visible_items) - 1, "range")
+        return "break"
+
+    def move_selection(self, delta, extend=False):
+        """Auswahl per Pfeil-/Bildtasten verschieben (Aufwand unabhängig von der Listenlänge)."""
+        if not len(self.visible_items):
+            return "break"
+        if self.selected_row is None:
+            row = self.table.offset
+        else:
+            row = max(0, min(self.selected_row + delta, len(self.visible_items) - 1))
+        self.table.ensure_visible(row)
+        if extend and self.current_view == "todos":
+            self.extend_selection(row, "range")
+        else:
+            self.select_row(row)
+        return "break"
+
+    def row_bg(self, row_idx):
+        if row_idx in self.selected_rows:
+            return SELECTED_ROW_BG
+        if self.current_view == "todos":
+            todo = self.visible_items[row_idx]
+            if not todo.done and todo.deadline <= self.today:
+                return OVERDUE_ROW_BG if todo.deadline < self.today else DUE_TODAY_ROW_BG
+        return self.default_row_bg
 
     def on_row_click(self, row_idx):
         self.select_row(row_idx)
+        self.canvas.focus_set()
+
+    def on_row_extend(self, row_idx, mode):
+        self.extend_selection(row_idx, mode)
+        self.canvas.focus_set()
 
     # --- Listen-spezifische Clicks ---
 
@@ -514,8 +1060,8 @@ class ToDoApp:
         """Liste durch Anklicken öffnen."""
         self.select_row(row_idx)
         idx = self.get_selected_list_index()
-        if idx is not None and 0 <= idx < len(self.lists):
-            self.current_list_id = self.lists[idx]["id"]
+        if idx is not None and 0 <= idx < len(self.store.lists):
+            self.store.set_current_list(self.store.lists[idx]["id"])
             self.current_view = "todos"
             self.update_buttons_for_view()
             self.refresh_view()
@@ -531,7 +1077,18 @@ class ToDoApp:
     def get_selected_list_index(self):
         if self.current_view != "lists":
             return None
-        return self.selected_index
+        return self.selected_row
+
+    def get_selected_todo(self):
+        if self.current_view != "todos" or self.selected_row is None:
+            return None
+        return self.visible_items[self.selected_row]
+
+    def get_selected_todos(self):
+        """Alle markierten To-Dos in Anzeigereihenfolge."""
+        if self.current_view != "todos":
+            return []
+        return [self.visible_items[row] for row in sorted(self.selected_rows)]
 
     # --- To-Do-Aktionen ---
 
@@ -540,71 +1097,136 @@ class ToDoApp:
 
     def add_todo(self):
         text = self.entry.get().strip()
-        if not text:
+        if not text or not self.data_loaded:
             return
 
         deadline_text = self.deadline_entry.get().strip()
-        if deadline_text:
-            try:
-                datetime.strptime(deadline_text, "%d.%m.%Y")
-            except ValueError:
-                messagebox.showerror(
-                    "Ungültiges Datum",
-                    "Bitte die Deadline im Format TT.MM.JJJJ eingeben (z.B. 05.11.2025)."
-                )
-                return
-
         list_name = self.list_selector_var.get().strip()
-        list_id = self.get_list_id_by_name(list_name) if list_name else self.current_list_id
-        if list_id is None:
-            list_id = self.current_list_id
-
-        self.save_state()
-
-        self.todos.append({
-            "text": text,
-            "done": False,
-            "created_at": datetime.now().strftime("%d.%m.%Y"),
-            "deadline": deadline_text,
-            "list_id": list_id
-        })
+        list_id = self.store.get_list_id_by_name(list_name) if list_name else None
+
+        try:
+            todo = self.store.add_todo(text, deadline_text, list_id)
+        except ValueError:
+            messagebox.showerror(
+                "Ungültiges Datum",
+                "Bitte die Deadline im Format TT.MM.JJJJ eingeben (z.B. 05.11.2025)."
+            )
+            return
 
         self.entry.delete(0, tk.END)
-        self.deadline_entry.set_date(datetime.today())
+        self.reset_deadline()
 
-        self.current_list_id = list_id
+        self.store.set_current_list(todo.list_id)
         self.update_list_selector()
         self.update_history_filter_options()
         self.refresh_view()
+        self.schedule_reminder()
+
+    # Alle Aktionen gelten für die ganze Auswahl: ein Undo-Schritt, eine Aktualisierung der Anzeige
 
     def toggle_done(self):
         if self.current_view == "lists":
             return
-        idx = self.selected_index
-        if idx is None:
+        todos = self.get_selected_todos()
+        if not todos:
             messagebox.showinfo("Hinweis", "Bitte ein To-Do auswählen.")
             return
-        self.save_state()
-        self.todos[idx]["done"] = not self.todos[idx]["done"]
+        self.store.toggle_done_many([todo.id for todo in todos])
         self.refresh_view()
+        self.schedule_reminder()
 
     def delete_todo(self):
         if self.current_view == "lists":
             return
-        idx = self.selected_index
-        if idx is None:
+        todos = self.get_selected_todos()
+        if not todos:
             messagebox.showinfo("Hinweis", "Bitte ein To-Do auswählen.")
             return
-        self.save_state()
-        del self.todos[idx]
+        self.store.delete_many([todo.id for todo in todos])
+        self.refresh_view()
+
+    def open_move_menu(self):
+        """Menü mit den Ziel-Listen unter dem Move-Button öffnen."""
+        if not self.get_selected_todos():
+            messagebox.showinfo("Hinweis", "Bitte ein To-Do auswählen.")
+            return
+        self.move_menu.delete(0, tk.END)
+        for lst in self.store.lists:
+            self.move_menu.add_command(label=lst["name"], command=lambda list_id=lst["id"]: self.move_todos(list_id))
+        try:
+            self.move_menu.tk_popup(self.move_btn.winfo_rootx(), self.move_btn.winfo_rooty())
+        finally:
+            self.move_menu.grab_release()
+
+    def move_todos(self, list_id):
+        todos = self.get_selected_todos()
+        if not todos:
+            return
+        self.store.move_many([todo.id for todo in todos], list_id)
         self.refresh_view()
 
     def undo(self):
-        if not self.history:
+        op = self.store.undo()
+        if op is None:
             messagebox.showinfo("Hinweis", "Keine Aktionen zum Rückgängig machen.")
             return
-        self.todos = self.history.pop()
+        if self.store.current_list_id not in self.store.list_by_id:
+            # z.B. Import rückgängig gemacht, der die aktuelle Liste angelegt hatte
+            self.store.set_current_list(self.store.lists[0]["id"])
+        ops = op[1] if op[0] == "batch" else [op]
+        if any(sub_op[0] in LIST_OPS for sub_op in ops):
+            self.update_list_selector()
+            self.update_history_filter_options()
         self.refresh_view()
+        self.schedule_reminder()
+
+    # --- Import / Export ---
+
+    def import_file(self):
+        """To-Dos aus CSV / JSON Lines / iCalendar übernehmen (ein Undo-Schritt)."""
+        if not self.data_loaded:
+            return
+        path = filedialog.askopenfilename(title="To-Dos importieren", filetypes=IMPORT_FILETYPES)
+        if not path:
+            return
+        list_name = self.list_selector_var.get().strip()
+        list_id = self.store.get_list_id_by_name(list_name) if list_name else None
+        try:
+            count, errors = self.store.import_todos(read_todos(path), list_id)
+        except Exception as e:
+            print("Fehler beim Importieren:", e)
+            messagebox.showerror("Import fehlgeschlagen", str(e))
+            return
+
+        self.update_list_selector()
+        self.update_history_filter_options()
+        self.refresh_view()
+        self.schedule_reminder()
+
+        message = f"{count} To-Dos importiert."
+        if errors:
+            details = "\n".join(f"Eintrag {number}: {error}" for number, error in errors[:10])
+            more = f"\n… und {len(errors) - 10} weitere" if len(errors) > 10 else ""
+            message += f"\n{len(errors)} Einträge übersprungen:\n{details}{more}"
+        messagebox.showinfo("Import", message)
+
+    def export_file(self):
+        """Alle To-Dos (offen und erledigt) als CSV / JSON Lines / iCalendar speichern."""
+        if not self.data_loaded:
+            return
+        path = filedialog.asksaveasfilename(
+            title="To-Dos exportieren", filetypes=IMPORT_FILETYPES, defaultextension=".csv"
+        )
+        if not path:
+            return
+        self.store.ensure_done_loaded()
+        try:
+            count = write_todos(path, todo_records(self.store, self.store.todos.values()))
+        except Exception as e:
+            print("Fehler beim Exportieren:", e)
+            messagebox.showerror("Export fehlgeschlagen", str(e))
+            return
+        messagebox.showinfo("Export", f"{count} To-Dos exportiert.")
 
     # --- Listenverwaltung ---
 
@@ -612,6 +1234,8 @@ class ToDoApp:
         self.open_list_dialog(mode="new")
 
     def open_list_dialog(self, mode="new"):
+        if not self.data_loaded:
+            return
         dialog = tk.Toplevel(self.root)
         dialog.title("Neue Liste" if mode == "new" else "Liste bearbeiten")
         dialog.transient(self.root)
@@ -630,11 +1254,11 @@ class ToDoApp:
         idx = None
         if mode == "edit":
             idx = self.get_selected_list_index()
-            if idx is None or idx < 0 or idx >= len(self.lists):
+            if idx is None or idx < 0 or idx >= len(self.store.lists):
                 messagebox.showinfo("Hinweis", "Bitte eine Liste auswählen.")
                 dialog.destroy()
                 return
-            lst = self.lists[idx]
+            lst = self.store.lists[idx]
             name_entry.insert(0, lst["name"])
             desc_entry.insert(0, lst["description"])
 
@@ -645,13 +1269,9 @@ class ToDoApp:
                 messagebox.showerror("Fehler", "Bitte einen Listennamen eingeben.")
                 return
             if mode == "new":
-                new_list = {"id": self.next_list_id, "name": name, "description": desc}
-                self.next_list_id += 1
-                self.lists.append(new_list)
-                self.current_list_id = new_list["id"]
+                self.store.add_list(name, desc)
             else:
-                self.lists[idx]["name"] = name
-                self.lists[idx]["description"] = desc
+                self.store.edit_list(self.store.lists[idx]["id"], name, desc)
             dialog.destroy()
             self.update_list_selector()
             self.update_history_filter_options()
@@ -670,23 +1290,18 @@ class ToDoApp:
 
     def delete_selected_list(self):
         idx = self.get_selected_list_index()
-        if idx is None or idx < 0 or idx >= len(self.lists):
+        if idx is None or idx < 0 or idx >= len(self.store.lists):
             messagebox.showinfo("Hinweis", "Bitte eine Liste auswählen.")
             return
-        if len(self.lists) == 1:
+        if len(self.store.lists) == 1:
             messagebox.showinfo("Hinweis", "Es muss mindestens eine Liste existieren.")
             return
 
-        lst = self.lists[idx]
+        lst = self.store.lists[idx]
         if not messagebox.askyesno("Liste löschen", f"Soll die Liste '{lst['name']}' wirklich gelöscht werden?"):
             return
 
-        list_id = lst["id"]
-        del self.lists[idx]
-        self.todos = [t for t in self.todos if t.get("list_id") != list_id]
-
-        if self.current_list_id == list_id:
-            self.current_list_id = self.lists[0]["id"]
+        self.store.delete_list(lst["id"])
 
         self.update_list_selector()
         self.update_history_filter_options()
@@ -694,12 +1309,72 @@ class ToDoApp:
 
 
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = ToDoApp(root)
+    parser = argparse.ArgumentParser(description="To-Do Liste")
+    parser.add_argument(
+        "--sqlite", action="store_true",
+        help="Daten in einer SQLite-Datenbank neben der JSON-Datei speichern (übernimmt vorhandene JSON-Daten)"
+    )
+    parser.add_argument(
+        "--binary", action="store_true",
+        help="Kompakten Binär-Snapshot statt JSON verwenden (übernimmt vorhandene JSON-Daten)"
+    )
+    parser.add_argument(
+        "--shards", action="store_true",
+        help="Eine Datei pro Liste statt eines Snapshots – Speichern schreibt nur geänderte Listen (übernimmt vorhandene JSON-Daten)"
+    )
+    parser.add_argument(
+        "--connect", nargs="?", const="", metavar="HOST:PORT",
+        help="Als Client eines laufenden todo_server.py arbeiten (Standard: 127.0.0.1:8765)"
+    )
+    parser.add_argument(
+        "--profile-startup", action="store_true",
+        help="Dauer der Startphasen (Imports, Laden, erstes Rendern) ausgeben"
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="Laufzeit kritischer Aktionen messen; F12 bzw. Beenden schreibt die Messwerte als JSON-Zeilen"
+    )
+    args = parser.parse_args()
+
+    startup_timer = None
+    if args.profile_startup:
+        startup_timer = StartupTimer(STARTUP_START)
+        startup_timer.mark("Imports")
 
-    # Beim Schließen Daten speichern
+    root = tk.Tk()
+    if startup_timer:
+        startup_timer.mark("Tk starten")
+
+    lock = None
+    store = None
+    if args.connect is not None:
+        # Client-Modus: Die Daten (und die Dateisperre) hält der Server
+        from todo_server import RemoteTodoStore, parse_address
+        try:
+            store = RemoteTodoStore(*parse_address(args.connect))
+        except (OSError, ValueError) as e:
+            root.withdraw()
+            messagebox.showerror("To-Do Liste", f"Keine Verbindung zum Server: {e}")
+            root.destroy()
+            sys.exit(1)
+    else:
+        # Nicht gleichzeitig mit einem zweiten Fenster oder todo_cli.py schreiben
+        lock = StorageLock()
+        if not lock.acquire(timeout=2):
+            root.withdraw()
+            messagebox.showerror("To-Do Liste", "Die Daten werden gerade von einem anderen Fenster oder Skript verwendet.")
+            root.destroy()
+            sys.exit(1)
+
+    kind = "sqlite" if args.sqlite else "binary" if args.binary else "shards" if args.shards else "json"
+    storage = None if store else open_storage(kind)
+    app = ToDoApp(root, storage, startup_timer, Profiler() if args.profile else None, store)
+
+    # Beim Schließen nur das Journal schließen (Änderungen sind bereits gesichert)
     def on_close():
-        app.save_data()
+        app.close_data()
+        if lock:
+            lock.release()
         root.destroy()
 
     root.protocol("WM_DELETE_WINDOW", on_close)